@@ -0,0 +1,321 @@
+# cli.py
+"""
+命令行批处理入口（不导入 Qt，可放进计划任务夜间执行）
+
+    python cli.py import families 花名册.csv
+    python cli.py export records 发放记录.xlsx --year 2025
+    python cli.py disburse 发放测算.csv --workers 8 --chunk-size 2000
+    python cli.py snapshot 快照/2025
+    python cli.py disburse 发放测算.csv --snapshot 快照/2025
+    python cli.py scan --all --hash --gc
+    python cli.py report proj_3 --out 归档统计.csv
+    python cli.py serve --port 8765 --cache-ttl 30
+
+--workers 控制并行进程数（默认 CPU 核数，1 为单进程），--chunk-size 控制分块 / 分页行数，
+进度输出到 stderr，--quiet 关闭；disburse --snapshot 从列式快照读取家庭与成员，不访问数据库；
+serve 启动本地只读查询接口（services/api_server.py）；
+数据库备份另见 services/backup_service.py
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+IMPORT_KINDS = ("subsidies", "families", "persons", "lands")
+EXPORT_KINDS = ("subsidies", "families", "persons", "lands", "records")
+
+
+# ---------------- 进度 ---------------- #
+class Progress:
+    """stderr 单行进度，至多每 0.5 秒刷新一次"""
+
+    def __init__(self, label: str, total: Optional[int] = None, enabled: bool = True):
+        self.label = label
+        self.total = total
+        self.enabled = enabled
+        self.done = 0
+        self._started = time.monotonic()
+        self._shown = 0.0
+
+    def advance(self, n: int = 1) -> None:
+        self.done += n
+        now = time.monotonic()
+        if self.enabled and now - self._shown >= 0.5:
+            self._shown = now
+            self._write()
+
+    def _write(self, end: str = "") -> None:
+        total = f"/{self.total}" if self.total else ""
+        sys.stderr.write(f"\r{self.label}: {self.done}{total}  {time.monotonic() - self._started:.1f}s{end}")
+        sys.stderr.flush()
+
+    def finish(self) -> None:
+        if self.enabled:
+            self._write("\n")
+
+
+# ---------------- 并行 ---------------- #
+def _pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    # spawn：子进程不继承父进程的 SQLite 连接（DatabaseManager 单例）
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def ordered_map(pool: Optional[ProcessPoolExecutor], fn: Callable, items: Iterable,
+                window: int) -> Iterator[Tuple[tuple, object]]:
+    """
+    按输入顺序产出 (参数, fn(*参数))；同时在途的任务不超过 window 个，
+    输入可以是惰性的分页游标，内存占用与总量无关
+    """
+    if pool is None:
+        for item in items:
+            yield item, fn(*item)
+        return
+    pending = deque()
+    for item in items:
+        pending.append((item, pool.submit(fn, *item)))
+        if len(pending) >= window:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+
+# ---------------- 子命令 ---------------- #
+def cmd_import(args) -> int:
+    from services.import_service import ImportService
+
+    service = ImportService(args.db, chunk_size=args.chunk_size)
+    result = getattr(service, f"import_{args.kind}")(args.file, args.reject)
+    print(f"导入 {result['imported']} 行，拒绝 {result['rejected']} 行")
+    if result["reject_file"]:
+        print(f"拒绝报告: {result['reject_file']}")
+    return 0 if not result["rejected"] else 2
+
+
+def cmd_export(args) -> int:
+    from services.export_service import ExportService
+
+    service = ExportService(args.db, page_size=args.chunk_size)
+    if args.kind in ("lands", "records"):
+        count = getattr(service, f"export_{args.kind}")(args.file, year=args.year)
+    else:
+        count = getattr(service, f"export_{args.kind}")(args.file)
+    print(f"导出 {count} 行 → {args.file}")
+    return 0
+
+
+def cmd_snapshot(args) -> int:
+    from services.snapshot_service import SnapshotService
+
+    service = SnapshotService(args.db, chunk_size=args.chunk_size)
+    manifest = service.export_snapshot(args.out_dir, args.tables, fmt=args.format,
+                                       compression=None if args.compression == "none" else args.compression)
+    for table, info in manifest["tables"].items():
+        print(f"{table}: {info['rows']} 行 → {os.path.join(args.out_dir, info['file'])}")
+    return 0
+
+
+def _snapshot_pages(snapshot_dir: str, config_dir: str, page_size: int):
+    """从列式快照分页产出 (家庭页, {家庭id: [年龄, ...]}, 配置目录)，供 plan_families"""
+    import pandas as pd
+    from services.snapshot_service import SnapshotService
+
+    service = SnapshotService()
+    families = service.load_table(snapshot_dir, "family")
+    persons = service.load_table(snapshot_dir, "person", columns=["familyid", "age"])
+    ages = {}
+    for family_id, age in zip(persons["familyid"].tolist(), persons["age"].tolist()):
+        if not pd.isna(family_id):
+            ages.setdefault(family_id, []).append(None if pd.isna(age) else age)
+
+    records = families.astype(object).where(families.notna(), None).to_dict("records")
+    for start in range(0, len(records), page_size):
+        page = records[start:start + page_size]
+        yield page, {f["id"]: ages.get(f["id"], []) for f in page}, config_dir
+
+
+def cmd_disburse(args) -> int:
+    from engine.disbursement import PLAN_COLUMNS, plan_chunk, plan_families
+
+    if args.snapshot:
+        from services.snapshot_service import SnapshotService
+
+        total_families = SnapshotService.read_manifest(args.snapshot)["tables"]["family"]["rows"]
+        fn, jobs = plan_families, _snapshot_pages(args.snapshot, args.config, args.chunk_size)
+        page_at = 0
+    else:
+        from models.dbManager import DatabaseManager
+        from models.family_model import FamilyDAO
+
+        family_dao = FamilyDAO(DatabaseManager(args.db))
+        total_families = family_dao.count_families()
+        fn, page_at = plan_chunk, 1
+        jobs = ((args.db, page, args.config) for page in family_dao.iter_families(page_size=args.chunk_size))
+    progress = Progress("测算家庭", total_families, not args.quiet)
+
+    rows = total = 0
+    pool = _pool(args.workers)
+    try:
+        with open(args.out, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=PLAN_COLUMNS)
+            writer.writeheader()
+            for job, plan in ordered_map(pool, fn, jobs, args.workers * 2):
+                writer.writerows(plan)
+                rows += len(plan)
+                total += sum(row["amount"] for row in plan)
+                progress.advance(len(job[page_at]))
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    progress.finish()
+    print(f"发放明细 {rows} 行，合计 {total:.2f} 元 → {args.out}")
+    return 0
+
+
+def cmd_scan(args) -> int:
+    from engine.archive_manager import ProjectManager, scan_project
+
+    manager = ProjectManager()
+    projects = _select_projects(manager, args)
+    if projects is None:
+        return 1
+    progress = Progress("扫描项目", len(projects), not args.quiet)
+    pool = _pool(min(args.workers, len(projects)))
+    try:
+        for _, (project_id, villages) in ordered_map(pool, scan_project,
+                                                     ((p, args.hash) for p in projects), args.workers):
+            # tasks.db 的项目表只在主进程写
+            manager.update_project_villages(project_id, villages)
+            progress.advance()
+            if args.quiet:
+                continue
+            archived = sum(1 for v in villages.values() if v['archived'])
+            sys.stderr.write(f"\n{manager.get_project(project_id)['name']}: "
+                             f"{len(villages)} 个村庄，已归档 {archived}\n")
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    progress.finish()
+    if args.gc:
+        from engine.blob_store import BlobStore
+
+        for project in projects:
+            removed, freed = BlobStore(project['work_folder']).gc()
+            print(f"{project['name']}: 回收 {removed} 个存储对象，释放 {freed / 1024 / 1024:.1f} MB")
+    return 0
+
+
+def cmd_report(args) -> int:
+    from engine.archive_manager import ProjectManager, project_report
+
+    manager = ProjectManager()
+    projects = _select_projects(manager, args)
+    if projects is None:
+        return 1
+    pool = _pool(min(args.workers, len(projects)))
+    try:
+        with open(args.out, "w", newline="", encoding="utf-8-sig") as f:
+            writer = None
+            for (project,), rows in ordered_map(pool, project_report,
+                                                ((p,) for p in projects), args.workers):
+                for row in rows:
+                    row = {'项目': project['name'], **row}
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(row))
+                        writer.writeheader()
+                    writer.writerow(row)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    print(f"归档统计 → {args.out}")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from services.api_server import run
+
+    return run(args)
+
+
+def _select_projects(manager, args):
+    if args.all:
+        return manager.get_all_projects()
+    missing = [pid for pid in args.projects if manager.get_project(pid) is None]
+    if missing or not args.projects:
+        print(f"找不到项目: {', '.join(missing)}" if missing else "请指定项目编号或 --all",
+              file=sys.stderr)
+        return None
+    return [manager.get_project(pid) for pid in args.projects]
+
+
+# ---------------- 入口 ---------------- #
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="补贴管理批处理（无界面）")
+    parser.add_argument("--db", default="family_subsidies.db", help="业务数据库文件")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="并行进程数，1 为单进程（默认 CPU 核数）")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="分块 / 分页行数")
+    parser.add_argument("--quiet", action="store_true", help="不输出进度")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="CSV 批量导入")
+    p_import.add_argument("kind", choices=IMPORT_KINDS)
+    p_import.add_argument("file")
+    p_import.add_argument("--reject", help="拒绝报告路径（默认 <文件名>_rejects.csv）")
+    p_import.set_defaults(func=cmd_import)
+
+    p_export = sub.add_parser("export", help="流式导出 Excel")
+    p_export.add_argument("kind", choices=EXPORT_KINDS)
+    p_export.add_argument("file")
+    p_export.add_argument("--year", type=int, help="年份（用地 / 发放记录）")
+    p_export.set_defaults(func=cmd_export)
+
+    p_disburse = sub.add_parser("disburse", help="按补贴规则测算全部家庭的发放明细")
+    p_disburse.add_argument("out", help="输出 CSV")
+    p_disburse.add_argument("--config", default="config", help="规则配置目录")
+    p_disburse.add_argument("--snapshot", help="从列式快照目录读取家庭与成员（见 snapshot 子命令）")
+    p_disburse.set_defaults(func=cmd_disburse)
+
+    p_snapshot = sub.add_parser("snapshot", help="导出列式快照（Feather / Parquet）供分析与测算")
+    p_snapshot.add_argument("out_dir")
+    p_snapshot.add_argument("--tables", nargs="+", help="只导出指定表（默认全部）")
+    p_snapshot.add_argument("--format", choices=("feather", "parquet"), default="feather")
+    p_snapshot.add_argument("--compression", default="zstd", help="压缩算法，none 为不压缩")
+    p_snapshot.set_defaults(func=cmd_snapshot)
+
+    for name, func, help_text in (("scan", cmd_scan, "扫描归档目录并更新索引 / 台账"),
+                                  ("report", cmd_report, "输出各村庄归档统计")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("projects", nargs="*", help="项目编号（如 proj_3）")
+        p.add_argument("--all", action="store_true", help="全部项目")
+        if name == "scan":
+            p.add_argument("--hash", action="store_true", help="等待文件哈希补算完成")
+            p.add_argument("--gc", action="store_true", help="扫描后回收不再被引用的归档存储对象")
+        else:
+            p.add_argument("--out", default="archive_report.csv", help="输出 CSV")
+        p.set_defaults(func=func)
+
+    from services.api_server import add_arguments
+
+    p_serve = sub.add_parser("serve", help="启动本地只读 HTTP/JSON 查询接口")
+    add_arguments(p_serve)
+    p_serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    args.workers = max(1, args.workers)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -105,12 +105,13 @@ def init_database(db_path='family_subsidies.db'):
     conn.commit()
     conn.close()
 
-def get_db_connection():
+def get_db_connection(db_path=None):
     """
     获取数据库连接
+    :param db_path: 数据库文件，默认 DB_PATH
     :return: 数据库连接对象
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path or DB_PATH)
     conn.row_factory = sqlite3.Row  # 允许以字典形式访问查询结果
     return conn
 
@@ -135,4 +136,20 @@ def execute_query(db_path, query, params=None, fetch_all=False):
     except sqlite3.Error as e:
         return None
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+def iter_query(db_path, query, params=None, page_size=1000):
+    """分页游标：逐页返回 dict 列表，适合大表导出"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(query, params or ())
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+    finally:
+        conn.close()
@@ -1,11 +1,17 @@
 import sys
 import os
 import json
-import shutil
 from pathlib import Path
-from datetime import datetime
 import pandas as pd
 
+from engine.archive_manager import ArchiveManager, ProjectManager
+from engine.archive_watcher import ArchiveWatcher
+from engine.completeness import stage_names
+from engine.qt_copy_engine import CopyTask
+from engine.thumbnail_cache import can_preview
+from engine.qt_thumbnailer import ThumbnailLoader
+from engine.qt_query_runner import QueryRunner
+
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout, QPushButton, QLabel, QFileDialog, 
                               QListWidget, QListWidgetItem, QTextEdit, 
@@ -13,14 +19,35 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                               QFrame, QSplitter, QScrollArea, QGroupBox,
                               QLineEdit, QDateEdit, QMessageBox, QMenu,
                               QAbstractItemView)
-from PySide6.QtCore import Qt, QMimeData, QTimer, QDate, Signal
-from PySide6.QtGui import QFont, QColor, QDragEnterEvent, QDropEvent, QAction
+from PySide6.QtCore import Qt, QMimeData, QTimer, QDate, Signal, QObject, QUrl
+from PySide6.QtGui import (QFont, QColor, QDragEnterEvent, QDropEvent, QAction,
+                           QPixmap, QDesktopServices)
 from qfluentwidgets import (FluentWindow, PrimaryPushButton, PushButton,
                            CardWidget, StrongBodyLabel, BodyLabel, InfoBar,
                            InfoBarPosition, LineEdit, ComboBox, CheckBox,
                            ToolButton, Icon, ProgressBar)
 
     
+# 每张村庄卡片最多显示的预览数
+PREVIEW_LIMIT = 4
+PREVIEW_SIZE = 56
+
+
+class PreviewThumb(QLabel):
+    """卡片上的扫描件缩略图，双击用系统程序打开原文件"""
+    def __init__(self, file_path, thumb_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.setFixedSize(PREVIEW_SIZE, PREVIEW_SIZE)
+        self.setAlignment(Qt.AlignCenter)
+        self.setToolTip(os.path.basename(file_path))
+        self.setStyleSheet("border: 1px solid #e0e0e0; border-radius: 2px;")
+        self.setPixmap(QPixmap(thumb_path).scaled(PREVIEW_SIZE, PREVIEW_SIZE,
+                                                  Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def mouseDoubleClickEvent(self, event):
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.file_path))
+
 class VillageCard(CardWidget):
     """村庄卡片"""
     file_dropped = Signal(str, list)  # 村庄名, 文件路径列表
@@ -67,8 +94,18 @@ class VillageCard(CardWidget):
         drop_layout.addWidget(self.drop_area_label)
         drop_layout.setContentsMargins(0, 0, 0, 0)
         
+        # 已归档扫描件预览（缩略图由后台生成）
+        self.preview_area = QWidget()
+        self.preview_layout = QHBoxLayout(self.preview_area)
+        self.preview_layout.setContentsMargins(0, 0, 0, 0)
+        self.preview_layout.setSpacing(4)
+        self.preview_layout.addStretch()
+        self.preview_area.setVisible(False)
+        self.previews = {}
+        
         layout.addWidget(self.name_label)
         layout.addWidget(self.status_label)
+        layout.addWidget(self.preview_area)
         layout.addWidget(self.drop_area)
         
         # 初始化状态
@@ -88,6 +125,24 @@ class VillageCard(CardWidget):
         self.archived = archived
         self.update_status()
         
+    def set_preview(self, file_path, thumb_path):
+        """添加或替换一个文件的缩略图"""
+        old = self.previews.pop(file_path, None)
+        if old:
+            old.deleteLater()
+        elif len(self.previews) >= PREVIEW_LIMIT:
+            return
+        thumb = PreviewThumb(file_path, thumb_path)
+        self.preview_layout.insertWidget(self.preview_layout.count() - 1, thumb)
+        self.previews[file_path] = thumb
+        self.preview_area.setVisible(True)
+        
+    def clear_previews(self):
+        for thumb in self.previews.values():
+            thumb.deleteLater()
+        self.previews = {}
+        self.preview_area.setVisible(False)
+        
     def mousePressEvent(self, event):
         super().mousePressEvent(event)
         self.clicked.emit(self.village_name)
@@ -110,234 +165,12 @@ class VillageCard(CardWidget):
             self.file_dropped.emit(self.village_name, files)
             event.acceptProposedAction()
 
-class ProjectManager:
-    """项目管理器"""
-    def __init__(self):
-        self.projects_file = "projects.json"
-        self.projects = self.load_projects()
-        self.current_project = None
-        
-    def load_projects(self):
-        if os.path.exists(self.projects_file):
-            try:
-                with open(self.projects_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-        
-    def save_projects(self):
-        with open(self.projects_file, 'w', encoding='utf-8') as f:
-            json.dump(self.projects, f, ensure_ascii=False, indent=2)
-            
-    def create_project(self, name, work_folder, excel_file):
-        project_id = f"proj_{len(self.projects) + 1}"
-        project = {
-            'id': project_id,
-            'name': name,
-            'work_folder': work_folder,
-            'excel_file': excel_file,
-            'created_time': datetime.now().isoformat(),
-            'status': '进行中',
-            'villages': {},
-            'tasks': {}
-        }
-        self.projects[project_id] = project
-        self.save_projects()
-        return project_id
-        
-    def get_project(self, project_id):
-        return self.projects.get(project_id)
-        
-    def get_all_projects(self):
-        return list(self.projects.values())
-        
-    def set_current_project(self, project_id):
-        self.current_project = project_id
-        return self.projects.get(project_id)
-        
-    def update_project_village(self, project_id, village_name, data):
-        if project_id in self.projects:
-            self.projects[project_id]['villages'][village_name] = data
-            self.save_projects()
-            
-    def mark_village_archived(self, project_id, village_name):
-        if project_id in self.projects and village_name in self.projects[project_id]['villages']:
-            self.projects[project_id]['villages'][village_name]['archived'] = True
-            self.projects[project_id]['villages'][village_name]['archive_time'] = datetime.now().isoformat()
-            self.save_projects()
-            
-    def add_task(self, project_id, village_name, due_date, notes=""):
-        if project_id in self.projects:
-            task_id = f"task_{len(self.projects[project_id].get('tasks', {})) + 1}"
-            if 'tasks' not in self.projects[project_id]:
-                self.projects[project_id]['tasks'] = {}
-            self.projects[project_id]['tasks'][task_id] = {
-                'id': task_id,
-                'village_name': village_name,
-                'due_date': due_date,
-                'notes': notes,
-                'completed': False,
-                'created_time': datetime.now().isoformat()
-            }
-            self.save_projects()
-            return task_id
-    def validate_project_paths(self, work_folder, excel_file):
-        """验证项目路径"""
-        errors = []
-        
-        # 检查工作文件夹
-        if work_folder and not os.path.exists(work_folder):
-            errors.append("工作文件夹不存在")
-            
-        # 检查Excel文件（如果指定了路径）
-        if excel_file and os.path.exists(excel_file):
-            try:
-                pd.read_excel(excel_file)
-            except Exception as e:
-                errors.append(f"Excel文件格式错误: {str(e)}")
-                
-        return len(errors) == 0, errors
+class ArchiveWatchBridge(QObject):
+    """把后台监听线程的回调转成 Qt 信号，在界面线程处理"""
+    villages_changed = Signal(list, bool)  # 变化的村庄名, Excel 是否变化
 
-class ArchiveManager:
-    """归档管理器"""
-    def __init__(self, work_folder, excel_file):
-        self.work_folder = work_folder
-        self.excel_file = excel_file
-        self.ensure_folders()
-        
-    def ensure_folders(self):
-        """确保工作文件夹存在"""
-        Path(self.work_folder).mkdir(parents=True, exist_ok=True)
-        
-    def scan_villages(self):
-        """扫描文件夹中的村庄"""
-        villages = {}
-        work_path = Path(self.work_folder)
-        
-        # 首先确保工作文件夹存在
-        if not work_path.exists():
-            work_path.mkdir(parents=True, exist_ok=True)
-            return villages
-        
-        # 从Excel中读取所有村庄（如果Excel存在）
-        all_villages_from_excel = set()
-        village_archived_status = {}
-        
-        if os.path.exists(self.excel_file):
-            try:
-                df = pd.read_excel(self.excel_file)
-                if '村庄名称' in df.columns:
-                    all_villages_from_excel = set(df['村庄名称'].dropna().tolist())
-                    # 读取归档状态
-                    for _, row in df.iterrows():
-                        village_name = row['村庄名称']
-                        archived_status = row.get('归档状态', '未归档')
-                        village_archived_status[village_name] = str(archived_status) == '已归档'
-            except Exception as e:
-                print(f"读取Excel时出错: {e}")
-        
-        # 查找所有包含"村"的文件夹
-        existing_folders = {}
-        if work_path.exists():
-            for item in work_path.iterdir():
-                if item.is_dir() and '村' in item.name:
-                    village_name = item.name
-                    files = [f.name for f in item.iterdir() if f.is_file()]
-                    existing_folders[village_name] = {
-                        'folder_path': str(item),
-                        'files': files
-                    }
-                    all_villages_from_excel.add(village_name)  # 确保文件夹中的村庄也被包含
-        
-        # 为每个村庄创建记录
-        for village_name in all_villages_from_excel:
-            # 检查是否已归档
-            archived = village_archived_status.get(village_name, False)
-            archive_time = None
-            
-            # 获取文件夹信息
-            folder_path = existing_folders.get(village_name, {}).get('folder_path', '')
-            files = existing_folders.get(village_name, {}).get('files', [])
-            
-            villages[village_name] = {
-                'name': village_name,
-                'folder_path': folder_path,
-                'archived': archived,
-                'files': files,
-                'archive_time': archive_time
-            }
-            
-        return villages
-            
-    def create_excel_if_not_exists(self):
-        """创建Excel文件（如果不存在）"""
-        if not os.path.exists(self.excel_file):
-            df = pd.DataFrame(columns=['村庄名称', '归档状态', '文件数量', '归档时间', '备注'])
-            df.to_excel(self.excel_file, index=False)
-            
-    def update_excel_record(self, village_name, archived=True):
-        """更新Excel记录"""
-        self.create_excel_if_not_exists()
-        
-        try:
-            df = pd.read_excel(self.excel_file)
-            
-            # 确保必要的列存在
-            required_columns = ['村庄名称', '归档状态', '文件数量', '归档时间', '备注']
-            for col in required_columns:
-                if col not in df.columns:
-                    df[col] = ''
-            
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 如果村庄已存在，更新记录
-            if village_name in df['村庄名称'].values:
-                df.loc[df['村庄名称'] == village_name, '归档状态'] = '已归档' if archived else '未归档'
-                df.loc[df['村庄名称'] == village_name, '归档时间'] = current_time if archived else ''
-                # 更新文件数量
-                village_folder = Path(self.work_folder) / village_name
-                if village_folder.exists():
-                    file_count = len([f for f in village_folder.iterdir() if f.is_file()])
-                    df.loc[df['村庄名称'] == village_name, '文件数量'] = file_count
-            else:
-                # 添加新记录
-                village_folder = Path(self.work_folder) / village_name
-                file_count = 0
-                if village_folder.exists():
-                    file_count = len([f for f in village_folder.iterdir() if f.is_file()])
-                    
-                new_row = {
-                    '村庄名称': village_name,
-                    '归档状态': '已归档' if archived else '未归档',
-                    '文件数量': file_count,
-                    '归档时间': current_time if archived else '',
-                    '备注': ''
-                }
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                
-            df.to_excel(self.excel_file, index=False)
-        except Exception as e:
-            print(f"更新Excel时出错: {e}")
-            
-    def archive_files(self, village_name, file_paths):
-        """归档文件到指定村庄文件夹"""
-        village_folder = Path(self.work_folder) / village_name
-        village_folder.mkdir(exist_ok=True)
-        
-        success_count = 0
-        for file_path in file_paths:
-            try:
-                src_path = Path(file_path)
-                # 保持原文件名
-                dst_path = village_folder / src_path.name
-                if src_path.exists():
-                    shutil.copy2(file_path, str(dst_path))
-                    success_count += 1
-            except Exception as e:
-                print(f"复制文件 {file_path} 时出错: {e}")
-                
-        return success_count
+    def notify(self, villages, excel_changed):
+        self.villages_changed.emit(sorted(villages), excel_changed)
 
 class DocumentArchiverWidget(QWidget):
     """文档归档主界面"""
@@ -348,6 +181,17 @@ class DocumentArchiverWidget(QWidget):
         self.project_manager = ProjectManager()
         self.archive_manager = None
         self.current_project = None
+        self.village_cards = {}
+        self.copy_tasks = {}  # 村庄名 -> CopyTask
+        self.watcher = None
+        self.watch_bridge = ArchiveWatchBridge(self)
+        self.watch_bridge.villages_changed.connect(self.on_archive_changed)
+        # 目录扫描 / Excel 读取在后台单线程执行，扫描之间彼此串行
+        self.scan_runner = QueryRunner(parent=self)
+        self._pending_changes = set()
+        self._pending_excel_changed = False
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        self.thumbnail_loader.ready.connect(self.on_thumbnail_ready)
         
         self.setup_ui()
         self.refresh_project_list()
@@ -426,6 +270,20 @@ class DocumentArchiverWidget(QWidget):
         right_layout.addWidget(QLabel("村庄状态:"))
         right_layout.addWidget(self.villages_scroll)
         
+        # 归档拷贝进度
+        self.copy_panel = QFrame()
+        copy_layout = QHBoxLayout(self.copy_panel)
+        copy_layout.setContentsMargins(0, 0, 0, 0)
+        self.copy_label = BodyLabel("")
+        self.copy_progress = ProgressBar()
+        self.copy_cancel_btn = PushButton("取消")
+        self.copy_cancel_btn.clicked.connect(self.cancel_copy_tasks)
+        copy_layout.addWidget(self.copy_label)
+        copy_layout.addWidget(self.copy_progress, 1)
+        copy_layout.addWidget(self.copy_cancel_btn)
+        self.copy_panel.setVisible(False)
+        right_layout.addWidget(self.copy_panel)
+        
         # 未归档提醒区域
         self.unarchived_group = QGroupBox("未归档提醒")
         unarchived_layout = QVBoxLayout(self.unarchived_group)
@@ -478,10 +336,44 @@ class DocumentArchiverWidget(QWidget):
         main_layout.addWidget(splitter)
         
     def setup_timer(self):
-        """设置定时器"""
+        """设置定时器（仅在目录监听不可用时启用轮询）"""
         self.timer = QTimer()
         self.timer.timeout.connect(self.auto_refresh)
-        self.timer.start(60000)  # 1分钟自动刷新一次
+        
+        # Excel 写回防抖：最后一次归档后 3 秒统一写一次
+        self.excel_sync_timer = QTimer(self)
+        self.excel_sync_timer.setSingleShot(True)
+        self.excel_sync_timer.setInterval(3000)
+        self.excel_sync_timer.timeout.connect(self.sync_excel)
+
+    def schedule_excel_sync(self):
+        """有待写回的 Excel 变更时启动防抖写回"""
+        if self.archive_manager and self.archive_manager.excel_writer.has_pending:
+            self.excel_sync_timer.start()
+
+    def sync_excel(self):
+        """立即写回缓冲的Excel状态变更"""
+        self.excel_sync_timer.stop()
+        if self.archive_manager:
+            self.archive_manager.sync_excel()
+
+    def start_watching(self):
+        """监听当前项目目录，失败时退回 1 分钟轮询"""
+        self.stop_watching()
+        self.watcher = ArchiveWatcher(self.current_project['work_folder'],
+                                      self.current_project['excel_file'],
+                                      self.watch_bridge.notify)
+        if self.watcher.start():
+            self.timer.stop()
+        else:
+            self.watcher = None
+            self.timer.start(60000)  # 1分钟自动刷新一次
+
+    def stop_watching(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        self.timer.stop()
     
     def show_project_context_menu(self, position):
         """显示项目右键菜单"""
@@ -577,9 +469,12 @@ class DocumentArchiverWidget(QWidget):
         excel_layout.addWidget(excel_edit)
         excel_layout.addWidget(excel_btn)
         
+        stage_combo = self._stage_combo(project.get('stage'))
+        
         form_layout.addRow("项目名称:", name_edit)
         form_layout.addRow("工作文件夹:", folder_layout)
         form_layout.addRow("Excel文件:", excel_layout)
+        form_layout.addRow("项目阶段:", stage_combo)
         
         # 显示当前统计信息
         stats_group = QGroupBox("当前项目统计")
@@ -678,18 +573,19 @@ class DocumentArchiverWidget(QWidget):
             old_work_folder = project.get('work_folder', '')
             old_excel_file = project.get('excel_file', '')
             
-            project['name'] = name_edit.text().strip()
-            project['work_folder'] = work_folder.strip()
-            project['excel_file'] = excel_file.strip()
-            
             # 保存更新
-            self.project_manager.save_projects()
+            self.project_manager.update_project(
+                project_id, name_edit.text().strip(), work_folder.strip(), excel_file.strip(),
+                stage=stage_combo.currentData() or ''
+            )
             
             # 如果是当前项目，更新界面
             if self.current_project and self.current_project['id'] == project_id:
                 self.current_project = project
                 self.project_title.setText(project['name'])
-                self.archive_manager = ArchiveManager(project['work_folder'], project['excel_file'])
+                self.sync_excel()
+                self.archive_manager = ArchiveManager(project['work_folder'], project['excel_file'], project_id,
+                                                      project['name'], project.get('stage'))
                 self.refresh_current_project()
             
             self.refresh_project_list()
@@ -707,25 +603,25 @@ class DocumentArchiverWidget(QWidget):
     def auto_refresh(self):
         """自动刷新"""
         if self.current_project:
-            self.refresh_current_project()
+            self.refresh_current_project(force=False)
             
     def create_new_project(self):
         """创建新项目"""
         # 获取项目信息
-        project_name, work_folder, excel_file = self.get_project_info()
+        project_name, work_folder, excel_file, stage = self.get_project_info()
         if not all([project_name, work_folder, excel_file]):
             return
             
         # 创建项目
-        project_id = self.project_manager.create_project(project_name, work_folder, excel_file)
+        project_id = self.project_manager.create_project(project_name, work_folder, excel_file, stage)
         
         # 初始化归档管理器
-        self.archive_manager = ArchiveManager(work_folder, excel_file)
+        self.sync_excel()
+        self.archive_manager = ArchiveManager(work_folder, excel_file, project_id, project_name, stage)
         
         # 扫描村庄
         villages = self.archive_manager.scan_villages()
-        for village_name, village_data in villages.items():
-            self.project_manager.update_project_village(project_id, village_name, village_data)
+        self.project_manager.update_project_villages(project_id, villages)
             
         # 刷新界面
         self.refresh_project_list()
@@ -788,9 +684,12 @@ class DocumentArchiverWidget(QWidget):
         excel_layout.addWidget(excel_edit)
         excel_layout.addWidget(excel_btn)
         
+        stage_combo = self._stage_combo()
+        
         form_layout.addRow("项目名称:", name_edit)
         form_layout.addRow("工作文件夹:", folder_layout)
         form_layout.addRow("Excel文件:", excel_layout)
+        form_layout.addRow("项目阶段:", stage_combo)
         
         button_box = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel
@@ -802,8 +701,21 @@ class DocumentArchiverWidget(QWidget):
         layout.addWidget(button_box)
         
         if dialog.exec() == QDialog.Accepted:
-            return name_edit.text(), folder_edit.text(), excel_edit.text()
-        return None, None, None
+            return name_edit.text(), folder_edit.text(), excel_edit.text(), stage_combo.currentData()
+        return None, None, None, None
+
+    @staticmethod
+    def _stage_combo(current=None):
+        """项目阶段下拉框：阶段决定必需材料清单，“默认”用项目 / 默认配置"""
+        combo = ComboBox()
+        combo.addItem("默认", userData=None)
+        for name in stage_names():
+            combo.addItem(name, userData=name)
+        if current:
+            if current not in stage_names():
+                combo.addItem(current, userData=current)
+            combo.setCurrentIndex(combo.findData(current))
+        return combo
         
     def refresh_project_list(self):
         """刷新项目列表"""
@@ -824,22 +736,39 @@ class DocumentArchiverWidget(QWidget):
             self.project_title.setText(self.current_project['name'])
             work_folder = self.current_project['work_folder']
             excel_file = self.current_project['excel_file']
-            self.archive_manager = ArchiveManager(work_folder, excel_file)
+            self.sync_excel()
+            # 丢弃上一个项目尚未返回的增量扫描
+            self.scan_runner.cancel("changes")
+            self._pending_changes.clear()
+            self._pending_excel_changed = False
+            self.archive_manager = ArchiveManager(work_folder, excel_file, project_id,
+                                                  self.current_project['name'],
+                                                  self.current_project.get('stage'))
             self.refresh_current_project()
+            self.start_watching()
             
-    def refresh_current_project(self):
-        """刷新当前项目"""
+    def refresh_current_project(self, force=True):
+        """刷新当前项目（后台扫描）；force=False 时扫描结果无变化则跳过界面重建"""
         if not self.current_project:
             return
         
-        # 重新扫描村庄（包括Excel中的所有村庄）
-        villages = self.archive_manager.scan_villages()
+        # 重新扫描村庄（包括Excel中的所有村庄），连续刷新时只应用最后一次
+        manager = self.archive_manager
+        self.scan_runner.submit("scan", manager.scan_villages,
+                                on_result=lambda villages: self.apply_scan(manager, villages, force),
+                                on_error=lambda error: print(f"扫描村庄时出错: {error}"))
         
-        # 更新项目数据
-        for village_name, village_data in villages.items():
-            self.project_manager.update_project_village(
-                self.current_project['id'], village_name, village_data
-            )
+    def apply_scan(self, manager, villages, force=True):
+        """在界面线程应用扫描结果"""
+        # 扫描期间切换了项目
+        if manager is not self.archive_manager or not self.current_project:
+            return
+        if not force and not manager.scan_cache.changed:
+            return
+        
+        # 更新项目数据（批量写入，一次提交）
+        self.project_manager.update_project_villages(self.current_project['id'], villages)
+        self.schedule_excel_sync()
             
         # 更新界面
         self.update_village_cards()
@@ -855,6 +784,7 @@ class DocumentArchiverWidget(QWidget):
             widget = self.villages_layout.itemAt(i).widget()
             if widget:
                 widget.setParent(None)
+        self.village_cards = {}
                 
         # 添加村庄卡片
         if not self.current_project:
@@ -862,17 +792,87 @@ class DocumentArchiverWidget(QWidget):
             
         villages = self.current_project.get('villages', {})
         for village_name, village_data in villages.items():
-            archived = village_data.get('archived', False)
-            card = VillageCard(village_name, archived)
-            card.file_dropped.connect(self.on_files_dropped)
-            card.clicked.connect(self.on_village_clicked)
-            self.villages_layout.addWidget(card)
+            self.add_village_card(village_name, village_data.get('archived', False))
             
         # 更新任务下拉框
         self.task_village_combo.clear()
         for village_name in villages.keys():
             self.task_village_combo.addItem(village_name)
             
+    def add_village_card(self, village_name, archived):
+        card = VillageCard(village_name, archived)
+        card.file_dropped.connect(self.on_files_dropped)
+        card.clicked.connect(self.on_village_clicked)
+        self.villages_layout.addWidget(card)
+        self.village_cards[village_name] = card
+        self.request_previews(village_name)
+        return card
+
+    def request_previews(self, village_name):
+        """为村庄的前几个图片 / PDF 文件请求缩略图，缓存命中的直接显示"""
+        card = self.village_cards.get(village_name)
+        manager = self.archive_manager
+        if not card or not manager or not manager.document_dao:
+            return
+        card.clear_previews()
+        files = manager.document_dao.village_files(manager.task_id, village_name)
+        previewable = [(path, digest) for path, digest in files.items() if can_preview(path)]
+        for file_path, digest in previewable[:PREVIEW_LIMIT]:
+            thumb_path = self.thumbnail_loader.request(village_name, file_path, digest)
+            if thumb_path:
+                card.set_preview(file_path, thumb_path)
+
+    def on_thumbnail_ready(self, village_name, file_path, thumb_path):
+        card = self.village_cards.get(village_name)
+        if card:
+            card.set_preview(file_path, thumb_path)
+
+    def on_archive_changed(self, village_names, excel_changed):
+        """目录事件：后台增量扫描，只更新受影响的村庄卡片、统计与提醒"""
+        if not self.current_project or not self.archive_manager:
+            return
+        
+        # 前一次增量扫描尚未返回时合并事件，新请求会作废旧请求
+        self._pending_changes.update(village_names)
+        self._pending_excel_changed |= excel_changed
+        manager = self.archive_manager
+        self.scan_runner.submit("changes", manager.scan_villages,
+                                on_result=lambda scanned: self.apply_changes(manager, scanned),
+                                on_error=lambda error: print(f"扫描村庄时出错: {error}"))
+        
+    def apply_changes(self, manager, scanned):
+        village_names, self._pending_changes = self._pending_changes, set()
+        excel_changed, self._pending_excel_changed = self._pending_excel_changed, False
+        if manager is not self.archive_manager or not self.current_project:
+            return
+        
+        # 材料完整性变化也要写回 Excel
+        self.schedule_excel_sync()
+        known = self.current_project.get('villages', {})
+        affected = {name for name in village_names if name in scanned}
+        affected |= set(scanned) - set(known)
+        if excel_changed:
+            affected |= {name for name, data in scanned.items()
+                         if known.get(name, {}).get('archived') != data['archived']}
+        if not affected:
+            return
+        
+        self.project_manager.update_project_villages(
+            self.current_project['id'], {name: scanned[name] for name in affected}
+        )
+        for village_name in sorted(affected):
+            data = scanned[village_name]
+            card = self.village_cards.get(village_name)
+            if card:
+                card.set_archived(data['archived'])
+                self.request_previews(village_name)
+            else:
+                self.add_village_card(village_name, data['archived'])
+                self.task_village_combo.addItem(village_name)
+        
+        self.update_statistics()
+        self.update_unarchived_reminder()
+
     def update_statistics(self):
         """更新统计信息"""
         if not self.current_project:
@@ -890,24 +890,36 @@ class DocumentArchiverWidget(QWidget):
         self.completion_label.setText(f"完成率: {completion:.1f}%")
         
     def update_unarchived_reminder(self):
-        """更新未归档提醒"""
+        """更新未归档提醒（缺少的材料来自完整性检查）"""
         if not self.current_project:
             self.unarchived_text.setPlainText("请先选择项目")
             return
             
         villages = self.current_project.get('villages', {})
+        checker = self.archive_manager.completeness if self.archive_manager else None
+        incomplete = checker.incomplete() if checker else {}
         unarchived_villages = [name for name, data in villages.items() if not data.get('archived', False)]
+        # 已归档但材料仍不齐全的村庄
+        incomplete_archived = [name for name, data in villages.items()
+                               if data.get('archived', False) and name in incomplete]
         
-        if not unarchived_villages:
+        if not unarchived_villages and not incomplete_archived:
             self.unarchived_text.setPlainText("🎉 恭喜！所有村庄都已归档完成！")
             return
             
-        reminder_text = "⚠️ 以下村庄尚未归档：\n\n"
-        for village_name in unarchived_villages:
-            reminder_text += f"• {village_name}\n"
-            
-        reminder_text += f"\n共 {len(unarchived_villages)} 个村庄等待归档"
-        self.unarchived_text.setPlainText(reminder_text)
+        reminder_text = ""
+        if unarchived_villages:
+            reminder_text += "⚠️ 以下村庄尚未归档：\n\n"
+            for village_name in unarchived_villages:
+                missing = incomplete.get(village_name)
+                reminder_text += f"• {village_name}"
+                reminder_text += f"（缺少：{'、'.join(missing)}）\n" if missing else "\n"
+            reminder_text += f"\n共 {len(unarchived_villages)} 个村庄等待归档\n"
+        if incomplete_archived:
+            reminder_text += "\n📋 以下村庄已归档但材料不全：\n\n"
+            for village_name in incomplete_archived:
+                reminder_text += f"• {village_name}（缺少：{'、'.join(incomplete[village_name])}）\n"
+        self.unarchived_text.setPlainText(reminder_text.rstrip("\n"))
         
     def update_task_planning(self):
         """更新任务规划"""
@@ -931,23 +943,82 @@ class DocumentArchiverWidget(QWidget):
             self.tasks_table.setItem(row, 3, status_item)
             
     def on_files_dropped(self, village_name, file_paths):
-        """文件拖拽处理"""
+        """文件拖拽处理：后台线程池拷贝，界面只接收进度信号"""
         if not self.archive_manager:
             return
+        if village_name in self.copy_tasks:
+            InfoBar.warning(
+                title='正在归档',
+                content=f'{village_name} 上一批文件尚未拷贝完成',
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+            return
             
-        # 归档文件
-        success_count = self.archive_manager.archive_files(village_name, file_paths)
+        items = self.archive_manager.plan_archive(village_name, file_paths)
+        if not items:
+            InfoBar.warning(
+                title='归档失败',
+                content='没有可归档的文件',
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+            return
+        task = CopyTask(blob_store=self.archive_manager.blob_store, parent=self)
+        task.progress.connect(self.update_copy_progress)
+        task.file_failed.connect(lambda src, err: print(f"复制文件 {src} 时出错: {err}"))
+        task.finished.connect(
+            lambda ok, failed, cancelled, name=village_name: self.on_copy_finished(name, ok, failed, cancelled)
+        )
+        self.copy_tasks[village_name] = task
+        self.copy_panel.setVisible(True)
+        task.start(items)
+
+    def update_copy_progress(self, *_):
+        """汇总所有进行中拷贝任务的进度"""
+        engines = [task.engine for task in self.copy_tasks.values()]
+        bytes_done = sum(e.bytes_done for e in engines)
+        bytes_total = sum(e.bytes_total for e in engines)
+        files_done = sum(e.files_done for e in engines)
+        files_total = sum(e.files_total for e in engines)
+        self.copy_progress.setValue(int(bytes_done * 100 / bytes_total) if bytes_total else 100)
+        self.copy_label.setText(
+            f"正在归档 {files_done}/{files_total} 个文件 "
+            f"({bytes_done / 1048576:.1f}/{bytes_total / 1048576:.1f} MB)"
+        )
+
+    def cancel_copy_tasks(self):
+        for task in self.copy_tasks.values():
+            task.cancel()
+
+    def on_copy_finished(self, village_name, success_count, failed, cancelled):
+        """拷贝任务结束"""
+        task = self.copy_tasks.pop(village_name, None)
+        if task:
+            task.deleteLater()
+        if not self.copy_tasks:
+            self.copy_panel.setVisible(False)
+        else:
+            self.update_copy_progress()
         
         if success_count > 0:
             # 标记为已归档
             self.project_manager.mark_village_archived(self.current_project['id'], village_name)
             
-            # 更新Excel记录
+            # 登记Excel记录，防抖后统一写回
             self.archive_manager.update_excel_record(village_name, archived=True)
+            self.excel_sync_timer.start()
             
             # 刷新界面
             self.refresh_current_project()
             
+        if success_count > 0 and not failed and not cancelled:
             InfoBar.success(
                 title='归档成功',
                 content=f'成功归档 {success_count} 个文件到 {village_name}',
@@ -958,13 +1029,14 @@ class DocumentArchiverWidget(QWidget):
                 parent=self
             )
         else:
+            detail = '已取消' if cancelled else f'{len(failed)} 个文件重试后仍失败'
             InfoBar.warning(
-                title='归档失败',
-                content='文件归档过程中出现错误',
+                title='归档未完成',
+                content=f'{village_name}: 成功 {success_count} 个，{detail}',
                 orient=Qt.Horizontal,
                 isClosable=True,
                 position=InfoBarPosition.TOP_RIGHT,
-                duration=2000,
+                duration=3000,
                 parent=self
             )
             
@@ -1027,12 +1099,12 @@ class DocumentArchiverWidget(QWidget):
         if reply == QMessageBox.Yes:
             # 从项目列表中删除
             if project_id in self.project_manager.projects:
-                del self.project_manager.projects[project_id]
-                self.project_manager.save_projects()
+                self.project_manager.delete_project(project_id)
                 
                 # 如果删除的是当前项目，清空界面
                 if self.current_project and self.current_project['id'] == project_id:
                     self.current_project = None
+                    self.stop_watching()
                     self.project_title.setText("请选择项目")
                     self.clear_project_view()
                 
@@ -1055,6 +1127,7 @@ class DocumentArchiverWidget(QWidget):
             widget = self.villages_layout.itemAt(i).widget()
             if widget:
                 widget.setParent(None)
+        self.village_cards = {}
                 
         # 重置统计信息
         self.total_villages_label.setText("总村庄数: 0")
@@ -1081,6 +1154,16 @@ class MainWindow(FluentWindow):
         
         # 设置窗口居中
         self.center_window()
+
+    def closeEvent(self, event):
+        self.archiver_widget.stop_watching()
+        self.archiver_widget.cancel_copy_tasks()
+        self.archiver_widget.thumbnail_loader.shutdown()
+        # 等待进行中的扫描结束，避免其登记的 Excel 变更漏写
+        self.archiver_widget.scan_runner.cancel_all()
+        self.archiver_widget.scan_runner.pool.waitForDone()
+        self.archiver_widget.sync_excel()
+        super().closeEvent(event)
         
     def center_window(self):
         """窗口居中"""
@@ -0,0 +1,340 @@
+# engine/archive_manager.py
+"""
+归档项目与归档目录管理（不依赖 Qt）
+ProjectManager 维护 tasks.db 中的项目 / 村庄 / 任务，ArchiveManager 负责单个项目的
+目录扫描、文档索引、材料完整性与 Excel 台账；界面（demo.py）与命令行（cli.py）共用
+"""
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from engine.blob_store import BlobStore
+from engine.completeness import CompletenessChecker, load_required_materials
+from engine.copy_engine import CopyEngine, plan_copy
+from engine.excel_status_writer import ExcelStatusWriter
+from engine.scan_cache import ScanCache
+from models.document_dao import DocumentDAO
+from models.project_dao import ProjectDAO, project_row_id
+
+
+class ProjectManager:
+    """项目管理器（数据存于 tasks.db，内存中保留一份项目字典供界面读取）"""
+    def __init__(self):
+        self.projects_file = "projects.json"
+        self.dao = ProjectDAO('tasks.db', legacy_json=self.projects_file)
+        self.projects = self.load_projects()
+        self.current_project = None
+        
+    def load_projects(self):
+        return self.dao.load_all()
+            
+    def create_project(self, name, work_folder, excel_file, stage=None):
+        created_time = datetime.now().isoformat()
+        stage = stage or None
+        project_id = self.dao.create_project(name, work_folder, excel_file, created_time, stage=stage)
+        project = {
+            'id': project_id,
+            'name': name,
+            'work_folder': work_folder,
+            'excel_file': excel_file,
+            'created_time': created_time,
+            'status': '进行中',
+            'stage': stage,
+            'villages': {},
+            'tasks': {}
+        }
+        self.projects[project_id] = project
+        return project_id
+        
+    def update_project(self, project_id, name, work_folder, excel_file, stage=None):
+        """stage 为 None 时不修改阶段，空串表示清除"""
+        project = self.projects.get(project_id)
+        if project:
+            project.update(name=name, work_folder=work_folder, excel_file=excel_file)
+            if stage is not None:
+                project['stage'] = stage or None
+            self.dao.update_project(project_id, name, work_folder, excel_file, stage=stage)
+            
+    def delete_project(self, project_id):
+        if self.projects.pop(project_id, None) is not None:
+            self.dao.delete_project(project_id)
+        
+    def get_project(self, project_id):
+        return self.projects.get(project_id)
+        
+    def get_all_projects(self):
+        return list(self.projects.values())
+        
+    def set_current_project(self, project_id):
+        self.current_project = project_id
+        return self.projects.get(project_id)
+        
+    def update_project_village(self, project_id, village_name, data):
+        self.update_project_villages(project_id, {village_name: data})
+            
+    def update_project_villages(self, project_id, villages):
+        """批量更新村庄状态：只写有变化的行，一个事务提交"""
+        if project_id not in self.projects:
+            return
+        current = self.projects[project_id]['villages']
+        changed = {name: data for name, data in villages.items() if current.get(name) != data}
+        if changed:
+            current.update(changed)
+            self.dao.upsert_villages(project_id, changed)
+            
+    def mark_village_archived(self, project_id, village_name):
+        if project_id in self.projects and village_name in self.projects[project_id]['villages']:
+            archive_time = datetime.now().isoformat()
+            self.projects[project_id]['villages'][village_name]['archived'] = True
+            self.projects[project_id]['villages'][village_name]['archive_time'] = archive_time
+            self.dao.mark_village_archived(project_id, village_name, archive_time)
+            
+    def add_task(self, project_id, village_name, due_date, notes=""):
+        if project_id in self.projects:
+            created_time = datetime.now().isoformat()
+            task_id = self.dao.add_task(project_id, village_name, due_date, notes, created_time)
+            self.projects[project_id].setdefault('tasks', {})[task_id] = {
+                'id': task_id,
+                'village_name': village_name,
+                'due_date': due_date,
+                'notes': notes,
+                'completed': False,
+                'created_time': created_time
+            }
+            return task_id
+    def validate_project_paths(self, work_folder, excel_file):
+        """验证项目路径"""
+        errors = []
+        
+        # 检查工作文件夹
+        if work_folder and not os.path.exists(work_folder):
+            errors.append("工作文件夹不存在")
+            
+        # 检查Excel文件（如果指定了路径）
+        if excel_file and os.path.exists(excel_file):
+            try:
+                pd.read_excel(excel_file)
+            except Exception as e:
+                errors.append(f"Excel文件格式错误: {str(e)}")
+                
+        return len(errors) == 0, errors
+
+
+class ArchiveManager:
+    """归档管理器"""
+    def __init__(self, work_folder, excel_file, project_id=None, project_name=None, stage=None):
+        self.work_folder = work_folder
+        self.excel_file = excel_file
+        # 文档索引（tasks.db.documents），未关联项目时不建索引
+        self.task_id = project_row_id(project_id) if project_id else None
+        self.document_dao = DocumentDAO('tasks.db') if self.task_id else None
+        self._hash_thread = None
+        self.scan_cache = ScanCache(work_folder, excel_file)
+        self.excel_writer = ExcelStatusWriter(excel_file)
+        # 必需材料完整性（依赖文档索引）
+        self.completeness = CompletenessChecker(
+            self.document_dao.conn, self.task_id, load_required_materials(project_name, stage),
+            self.document_dao.lock
+        ) if self.document_dao else None
+        self.ensure_folders()
+        # 内容寻址存储放在工作文件夹内，保证与村庄目录同一文件系统可 reflink
+        self.blob_store = BlobStore(work_folder)
+        
+    def ensure_folders(self):
+        """确保工作文件夹存在"""
+        Path(self.work_folder).mkdir(parents=True, exist_ok=True)
+        
+    def scan_villages(self):
+        """扫描文件夹中的村庄（Excel 与未变化的目录走扫描缓存）"""
+        villages = {}
+        work_path = Path(self.work_folder)
+        
+        # 首先确保工作文件夹存在
+        if not work_path.exists():
+            work_path.mkdir(parents=True, exist_ok=True)
+            return villages
+        
+        self.scan_cache.begin_scan()
+        
+        # 从Excel中读取所有村庄（Excel 未修改时直接用缓存）
+        village_archived_status = dict(self.scan_cache.excel_status(self._read_excel_status))
+        # 叠加尚未写回Excel的状态变更
+        village_archived_status.update(self.excel_writer.pending_status())
+        all_villages_from_excel = set(village_archived_status)
+        
+        # 查找所有包含"村"的文件夹（只重新列出 mtime 变化的目录）
+        existing_folders = self.scan_cache.village_dirs()
+        all_villages_from_excel.update(existing_folders)  # 确保文件夹中的村庄也被包含
+        self.index_documents(existing_folders)
+        self.scan_cache.save()
+        self.update_completeness(all_villages_from_excel)
+        
+        # 为每个村庄创建记录
+        for village_name in all_villages_from_excel:
+            # 检查是否已归档
+            archived = village_archived_status.get(village_name, False)
+            archive_time = None
+            
+            # 获取文件夹信息
+            folder_path = existing_folders.get(village_name, {}).get('folder_path', '')
+            files = existing_folders.get(village_name, {}).get('files', [])
+            
+            villages[village_name] = {
+                'name': village_name,
+                'folder_path': folder_path,
+                'archived': archived,
+                'files': files,
+                'archive_time': archive_time
+            }
+            
+        return villages
+
+    def index_documents(self, folders):
+        """把本次重新列出的村庄目录同步到文档索引，哈希在后台线程补算"""
+        if not self.document_dao:
+            return
+        full = not self.document_dao.has_documents(self.task_id)
+        for village_name, info in folders.items():
+            if full or village_name in self.scan_cache.relisted:
+                self.document_dao.sync_village(self.task_id, village_name,
+                                               info['folder_path'], info['files'])
+        for village_name in self.scan_cache.removed:
+            self.document_dao.remove_village(self.task_id, village_name)
+        self._start_hashing()
+
+    def update_completeness(self, villages):
+        """
+        重算本次目录有变化的村庄（首次为全部村庄）的材料完整性，
+        结果有变化的登记到 Excel 的 必需材料 / 已收材料 / 缺少材料 列
+        """
+        if not self.completeness:
+            return {}
+        known = self.completeness.results
+        targets = {name for name in villages
+                   if name not in known
+                   or name in self.scan_cache.relisted
+                   or name in self.scan_cache.removed}
+        self.completeness.forget(set(known) - set(villages))
+        changed = self.completeness.compute(sorted(targets))
+        for village_name, result in changed.items():
+            self.excel_writer.queue(village_name, CompletenessChecker.excel_values(result))
+        return changed
+
+    def _start_hashing(self):
+        if self._hash_thread and self._hash_thread.is_alive():
+            return
+
+        def run():
+            dao = DocumentDAO('tasks.db')
+            try:
+                last_id = dao.fill_hashes(self.task_id)
+                while last_id:
+                    last_id = dao.fill_hashes(self.task_id, after_id=last_id)
+            finally:
+                dao.close()
+
+        self._hash_thread = threading.Thread(target=run, name="document-hash", daemon=True)
+        self._hash_thread.start()
+
+    def wait_hashing(self, timeout=None):
+        """等待后台补算哈希结束（命令行退出前调用，界面不需要）"""
+        if self._hash_thread:
+            self._hash_thread.join(timeout)
+
+    def _read_excel_status(self):
+        """读取Excel中的村庄及归档状态，读取失败返回 None"""
+        status = {}
+        try:
+            df = pd.read_excel(self.excel_file, usecols=lambda c: c in ('村庄名称', '归档状态'))
+            if '村庄名称' in df.columns:
+                df = df.dropna(subset=['村庄名称'])
+                archived = (df['归档状态'].astype(str) == '已归档') if '归档状态' in df.columns \
+                    else pd.Series(False, index=df.index)
+                status = dict(zip(df['村庄名称'].astype(str), archived.tolist()))
+        except Exception as e:
+            print(f"读取Excel时出错: {e}")
+            return None
+        return status
+            
+    def create_excel_if_not_exists(self):
+        """创建Excel文件（如果不存在）"""
+        if not os.path.exists(self.excel_file):
+            df = pd.DataFrame(columns=['村庄名称', '归档状态', '文件数量', '归档时间', '备注'])
+            df.to_excel(self.excel_file, index=False)
+            
+    def update_excel_record(self, village_name, archived=True):
+        """登记Excel记录变更（缓冲，由 sync_excel 统一写回）"""
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.excel_writer.queue(village_name, {
+            '归档状态': '已归档' if archived else '未归档',
+            '归档时间': current_time if archived else '',
+            '文件数量': len(self.scan_cache.village_files(village_name)),
+        })
+
+    def sync_excel(self):
+        """把缓冲的状态变更一次性写回Excel"""
+        try:
+            return self.excel_writer.flush()
+        except Exception as e:
+            print(f"更新Excel时出错: {e}")
+            return 0
+            
+    def plan_archive(self, village_name, file_paths):
+        """待归档的 (源, 目标, 字节数) 列表，拖入的文件夹按原结构拷入"""
+        village_folder = Path(self.work_folder) / village_name
+        village_folder.mkdir(exist_ok=True)
+        return plan_copy(file_paths, str(village_folder))
+
+    def archive_files(self, village_name, file_paths):
+        """同步归档文件到指定村庄文件夹（线程池并发拷贝），返回成功数"""
+        engine = CopyEngine(blob_store=self.blob_store)
+        success_count, failed, _ = engine.run(self.plan_archive(village_name, file_paths))
+        for src, _, _ in failed:
+            print(f"复制文件 {src} 时出错")
+        return success_count
+
+
+# ---------------- 批量任务（cli.py） ---------------- #
+def scan_project(project, wait_hashing=False):
+    """
+    完整扫描一个项目：目录 → 文档索引 → 材料完整性 → Excel 台账
+    可在子进程中运行（参数与返回值均可 pickle），村庄状态由调用方写回 tasks.db
+    :return: (项目编号, 村庄状态字典)
+    """
+    manager = ArchiveManager(project['work_folder'], project['excel_file'],
+                             project['id'], project['name'], project.get('stage'))
+    villages = manager.scan_villages()
+    manager.sync_excel()
+    if wait_hashing:
+        manager.wait_hashing()
+    return project['id'], villages
+
+
+def project_report(project):
+    """项目各村庄的归档统计：[{村庄, 归档状态, 文件数, 字节数, 最近归档, 缺少材料}]"""
+    task_id = project_row_id(project['id'])
+    dao = DocumentDAO('tasks.db')
+    try:
+        summary = dao.village_summary(task_id)
+        checker = CompletenessChecker(dao.conn, task_id,
+                                      load_required_materials(project['name'], project.get('stage')),
+                                      dao.lock)
+        villages = sorted(set(project['villages']) | set(summary))
+        checker.compute(villages)
+        rows = []
+        for name in villages:
+            stats = summary.get(name, {})
+            rows.append({
+                '村庄名称': name,
+                '归档状态': '已归档' if project['villages'].get(name, {}).get('archived') else '未归档',
+                '文件数量': stats.get('files', 0),
+                '文件大小': stats.get('bytes', 0),
+                '最近归档': stats.get('last_archived') or '',
+                '缺少材料': '、'.join(checker.missing(name)),
+            })
+        return rows
+    finally:
+        dao.close()
@@ -0,0 +1,128 @@
+# engine/archive_watcher.py
+"""
+归档目录文件事件监听
+watchdog 监听项目 work_folder（以及不在其中的 Excel 所在目录），
+把事件路径映射为村庄名，短时间内的多次事件合并为一次回调
+本模块不依赖 Qt，回调在后台线程执行
+"""
+import os
+import threading
+from typing import Callable, Optional, Set
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+# 回调签名：(变化的村庄名集合, Excel 是否变化)
+ChangeCallback = Callable[[Set[str], bool], None]
+
+
+class ArchiveEventHandler(FileSystemEventHandler):
+    """把文件事件路径归类为 村庄目录 / Excel"""
+
+    def __init__(self, watcher: "ArchiveWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path:
+                self.watcher.classify(os.fsdecode(path))
+
+
+class ArchiveWatcher:
+    """单个项目的目录监听器"""
+
+    def __init__(self, work_folder: str, excel_file: str, callback: ChangeCallback,
+                 delay: float = 0.5):
+        """
+        :param delay: 合并窗口（秒），拷贝大批文件时只触发一次回调
+        """
+        self.work_folder = os.path.abspath(work_folder)
+        self.excel_file = os.path.abspath(excel_file) if excel_file else ""
+        self.callback = callback
+        self.delay = delay
+        self._observer: Optional[Observer] = None
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._excel_changed = False
+        self._timer: Optional[threading.Timer] = None
+
+    # -------------------------------------------------
+    # 启停
+    # -------------------------------------------------
+    def start(self) -> bool:
+        """开始监听，失败（目录不存在、inotify 句柄耗尽等）返回 False"""
+        self.stop()
+        try:
+            observer = Observer()
+            handler = ArchiveEventHandler(self)
+            observer.schedule(handler, self.work_folder, recursive=True)
+            excel_dir = os.path.dirname(self.excel_file)
+            if excel_dir and not self._inside_work_folder(excel_dir) and os.path.isdir(excel_dir):
+                observer.schedule(handler, excel_dir, recursive=False)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            print(f"目录监听启动失败: {e}")
+            return False
+        self._observer = observer
+        return True
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+            self._excel_changed = False
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+
+    @property
+    def running(self) -> bool:
+        return self._observer is not None and self._observer.is_alive()
+
+    # -------------------------------------------------
+    # 事件归类与合并
+    # -------------------------------------------------
+    def _inside_work_folder(self, path: str) -> bool:
+        """path 是否位于工作文件夹内（不含工作文件夹本身），按 normcase 后的绝对路径比较"""
+        folder = os.path.normcase(os.path.abspath(self.work_folder))
+        path = os.path.normcase(os.path.abspath(path))
+        try:
+            # Windows 下不同盘符的路径没有公共前缀，commonpath 抛 ValueError
+            return path != folder and os.path.commonpath([folder, path]) == folder
+        except ValueError:
+            return False
+
+    def classify(self, path: str) -> None:
+        path = os.path.abspath(path)
+        village = None
+        excel = bool(self.excel_file) and os.path.normcase(path) == os.path.normcase(self.excel_file)
+        if not excel and self._inside_work_folder(path):
+            top = os.path.relpath(path, self.work_folder).split(os.sep, 1)[0]
+            if '村' in top:
+                village = top
+        if village is None and not excel:
+            return
+
+        with self._lock:
+            if village:
+                self._pending.add(village)
+            self._excel_changed = self._excel_changed or excel
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            villages, excel = self._pending, self._excel_changed
+            self._pending, self._excel_changed = set(), False
+            self._timer = None
+        if villages or excel:
+            self.callback(villages, excel)
@@ -0,0 +1,270 @@
+# engine/blob_store.py
+"""
+内容寻址归档存储
+文件按 sha256 存入 <根目录>/.archive_store/objects/ab/abcdef...，
+村庄 / 阶段目录中的文件是可编辑的工作文件，以 reflink（写时复制）从存储对象克隆；
+不用硬链接，否则编辑工作文件会改坏存储对象和其他村庄的副本。
+目标卷不支持 reflink（NTFS / ext4 / SMB 等）时存储只会让每个文件存两份，
+调用方应先用 supports_clone 探测（每个卷只探测一次），不支持时直接拷贝、不经过存储；
+源文件 (路径, 大小, mtime) 对应的哈希记在 index.sqlite 中，
+重复归档同一文件不再读取源文件，直接从对象克隆；
+每个放置出去的工作文件记为对象的一个引用，gc 清理不再被引用的对象
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import stat
+import sys
+import threading
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+STORE_DIR = ".archive_store"
+CHUNK_SIZE = 4 * 1024 * 1024
+# Linux FICLONE ioctl（btrfs / xfs 等支持 reflink 的文件系统）
+FICLONE = 0x40049409
+
+
+def file_digest(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except (ImportError, OSError):
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def _replace_readonly(src: str, dst: str, blob: str) -> None:
+    """
+    os.replace(src, dst)；dst 只读时先去掉只读（Windows 下不能覆盖只读文件）
+    旧版本归档的工作文件是指向存储对象的只读硬链接，去掉只读会连带对象，替换后恢复对象只读
+    """
+    if os.path.exists(dst) and not os.access(dst, os.W_OK):
+        shared = os.path.exists(blob) and os.path.samefile(blob, dst)
+        os.chmod(dst, os.stat(dst).st_mode | stat.S_IWRITE)
+        os.replace(src, dst)
+        if shared:
+            os.chmod(blob, 0o444)
+        return
+    os.replace(src, dst)
+
+
+class BlobStore:
+    """一个归档根目录下的对象存储（与目标目录在同一文件系统时才能 reflink）"""
+
+    def __init__(self, root: str):
+        self.root = os.path.join(root, STORE_DIR)
+        self.objects = os.path.join(self.root, "objects")
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.index_path = os.path.join(self.root, "index.sqlite")
+        self._local = threading.local()
+        # 卷（st_dev）→ 是否支持从存储 reflink
+        self._clone_ok: Dict[int, bool] = {}
+        self._probe_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    path     TEXT PRIMARY KEY,
+                    size     INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest   TEXT    NOT NULL
+                );
+
+                -- 放置出去的工作文件 → 对象；工作文件被删除或改动后引用失效
+                CREATE TABLE IF NOT EXISTS refs (
+                    path     TEXT PRIMARY KEY,
+                    digest   TEXT    NOT NULL,
+                    size     INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_refs_digest ON refs(digest);
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # 拷贝引擎多线程调用，每个线程一条连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], digest)
+
+    # -------------------------------------------------
+    # reflink 探测
+    # -------------------------------------------------
+    def supports_clone(self, directory: str) -> bool:
+        """
+        directory 所在卷能否从存储对象 reflink；结果按卷缓存
+        不在存储所在的卷上时一律不能（reflink 不能跨文件系统）
+        """
+        while not os.path.exists(directory):
+            parent = os.path.dirname(directory)
+            if not parent or parent == directory:
+                return False
+            directory = parent
+        dev = os.stat(directory).st_dev
+        with self._probe_lock:
+            if dev not in self._clone_ok:
+                self._clone_ok[dev] = dev == os.stat(self.objects).st_dev and self._probe_reflink()
+            return self._clone_ok[dev]
+
+    def _probe_reflink(self) -> bool:
+        src = os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}.probe")
+        dst = src + ".clone"
+        try:
+            with open(src, "wb") as f:
+                f.write(b"reflink probe")
+            return _reflink(src, dst)
+        except OSError:
+            return False
+        finally:
+            for path in (src, dst):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    # -------------------------------------------------
+    # 入库
+    # -------------------------------------------------
+    def known_digest(self, src: str) -> Optional[str]:
+        """源文件未变（大小、mtime 相同）且对象仍在时返回缓存的哈希"""
+        st = os.stat(src)
+        row = self._conn().execute(
+            "SELECT digest FROM sources WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (os.path.abspath(src), st.st_size, st.st_mtime_ns)).fetchone()
+        if row and os.path.exists(self.blob_path(row[0])):
+            return row[0]
+        return None
+
+    def put(self, src: str, on_chunk: Optional[Callable[[int], None]] = None) -> Tuple[str, bool]:
+        """
+        源文件入库，返回 (哈希, 是否新写入对象)
+        未知文件边拷贝边计算哈希，只读一遍；on_chunk(字节数) 可抛异常中止
+        """
+        digest = self.known_digest(src)
+        if digest:
+            if on_chunk:
+                on_chunk(os.path.getsize(src))
+            return digest, False
+
+        st = os.stat(src)
+        tmp = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        h = hashlib.sha256()
+        try:
+            with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+                for chunk in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+                    h.update(chunk)
+                    fdst.write(chunk)
+                    if on_chunk:
+                        on_chunk(len(chunk))
+            digest = h.hexdigest()
+            blob = self.blob_path(digest)
+            created = not os.path.exists(blob)
+            if created:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                shutil.copystat(src, tmp)
+                # 对象只在存储目录中只读，工作文件都是独立的克隆 / 副本
+                os.chmod(tmp, 0o444)
+                os.replace(tmp, blob)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO sources (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                         (os.path.abspath(src), st.st_size, st.st_mtime_ns, digest))
+        return digest, created
+
+    # -------------------------------------------------
+    # 出库到目录结构
+    # -------------------------------------------------
+    def materialize(self, digest: str, dst: str) -> str:
+        """
+        在 dst 放置对象内容（可写的独立文件），返回方式：reflink / copy
+        """
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        tmp = f"{dst}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            if _reflink(blob, tmp):
+                shutil.copystat(blob, tmp)
+                method = "reflink"
+            else:
+                shutil.copy2(blob, tmp)
+                method = "copy"
+            os.chmod(tmp, 0o644)
+            _replace_readonly(tmp, dst, blob)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        st = os.stat(dst)
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO refs (path, digest, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                         (os.path.abspath(dst), digest, st.st_size, st.st_mtime_ns))
+        return method
+
+    def store_file(self, src: str, dst: str,
+                   on_chunk: Optional[Callable[[int], None]] = None) -> str:
+        """归档一个文件：入库 + 放置到目标路径，返回放置方式（调用前先确认 supports_clone）"""
+        digest, _ = self.put(src, on_chunk)
+        return self.materialize(digest, dst)
+
+    # -------------------------------------------------
+    # 回收
+    # -------------------------------------------------
+    def gc(self) -> Tuple[int, int]:
+        """
+        删除不再被任何工作文件引用的对象，返回 (删除对象数, 释放字节数)
+        工作文件被删除、替换或编辑过（大小 / mtime 变化）即视为不再引用；
+        不要与归档拷贝同时运行，否则刚入库、尚未放置的对象会被当作无引用
+        """
+        conn = self._conn()
+        stale = []
+        for path, size, mtime_ns in conn.execute("SELECT path, size, mtime_ns FROM refs").fetchall():
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((path,))
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                stale.append((path,))
+        with conn:
+            conn.executemany("DELETE FROM refs WHERE path = ?", stale)
+        live = {row[0] for row in conn.execute("SELECT DISTINCT digest FROM refs")}
+
+        removed = freed = 0
+        for prefix in os.scandir(self.objects):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.name in live:
+                    continue
+                size = entry.stat().st_size
+                # 对象只读，Windows 下须先去掉只读才能删除
+                os.chmod(entry.path, stat.S_IREAD | stat.S_IWRITE)
+                os.remove(entry.path)
+                with conn:
+                    conn.execute("DELETE FROM sources WHERE digest = ?", (entry.name,))
+                removed += 1
+                freed += size
+        for entry in os.scandir(self.tmp_dir):
+            if entry.is_file():
+                os.remove(entry.path)
+        return removed, freed
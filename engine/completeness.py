@@ -0,0 +1,167 @@
+# engine/completeness.py
+"""
+必需材料完整性检查
+必需材料按 项目 / 阶段 配置在 config/required_materials.json，每项材料是一组文件名通配符；
+基于 tasks.db.documents 索引，一条 GROUP BY 语句算出所有村庄的 已收 / 缺少，
+文件变化时只对受影响的村庄重算；结果持久化到 tasks.db.village_completeness，
+重新打开项目时只有结果真正变化的村庄才需要写回 Excel 台账；
+compute 在扫描线程运行，results 每次整体替换为新字典，界面线程读到的总是完整的一版
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS village_completeness (
+        task_id      INTEGER NOT NULL,
+        village_name TEXT    NOT NULL,
+        required     TEXT    NOT NULL,
+        received     TEXT    NOT NULL,
+        missing      TEXT    NOT NULL,
+        PRIMARY KEY (task_id, village_name)
+    )
+"""
+
+CONFIG_PATH = Path("config") / "required_materials.json"
+# SQLite IN 查询每批参数个数
+_IN_BATCH = 500
+
+
+def load_required_materials(project_name: Optional[str] = None, stage: Optional[str] = None,
+                            path: Path = CONFIG_PATH) -> List[Dict]:
+    """阶段配置优先，其次项目配置，最后默认配置"""
+    try:
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if stage and stage in config.get("stages", {}):
+        return config["stages"][stage]
+    if project_name and project_name in config.get("projects", {}):
+        return config["projects"][project_name]
+    return config.get("default", [])
+
+
+def stage_names(path: Path = CONFIG_PATH) -> List[str]:
+    """配置中定义了专门材料清单的阶段"""
+    try:
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return list(config.get("stages", {}))
+
+
+class CompletenessChecker:
+    """单个项目的材料完整性结果，results: 村庄 → {required, received, missing}（只读，勿原地修改）"""
+
+    def __init__(self, conn, task_id: int, materials: List[Dict],
+                 lock: Optional[threading.Lock] = None):
+        self.conn = conn
+        # 与共用 conn 的 DocumentDAO 使用同一把锁
+        self.lock = lock or threading.Lock()
+        self.task_id = task_id
+        self.materials = materials
+        self.results: Dict[str, Dict[str, List[str]]] = {}
+
+        # 每项材料一列：该村庄是否有任一文件名匹配其任一通配符（不区分大小写）
+        columns, self._params = [], []
+        for material in materials:
+            patterns = material.get("patterns") or [f"*{material['name']}*"]
+            columns.append("MAX(" + " OR ".join(["lower(filename) GLOB ?"] * len(patterns)) + ")")
+            self._params.extend(p.lower() for p in patterns)
+        self._select = ", ".join(columns)
+        self._load()
+
+    # ---------------- 持久化 ---------------- #
+    def _load(self) -> None:
+        """读出上次的结果；必需材料清单已变（换了阶段 / 改了配置）的行不采用，视为未计算"""
+        with self.lock:
+            with self.conn:
+                self.conn.execute(CREATE_TABLE)
+            rows = self.conn.execute(
+                "SELECT village_name, required, received, missing FROM village_completeness "
+                "WHERE task_id = ?", (self.task_id,)).fetchall()
+        required = self.required
+        for row in rows:
+            if json.loads(row[1]) == required:
+                self.results[row[0]] = {"required": required,
+                                        "received": json.loads(row[2]),
+                                        "missing": json.loads(row[3])}
+
+    def _save(self, results: Dict[str, Dict[str, List[str]]]) -> None:
+        if not results:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO village_completeness "
+                "(task_id, village_name, required, received, missing) VALUES (?, ?, ?, ?, ?)",
+                [(self.task_id, village, *(json.dumps(r[k], ensure_ascii=False)
+                                           for k in ("required", "received", "missing")))
+                 for village, r in results.items()])
+
+    @property
+    def required(self) -> List[str]:
+        return [m["name"] for m in self.materials]
+
+    def compute(self, villages: Iterable[str]) -> Dict[str, Dict[str, List[str]]]:
+        """
+        重算给定村庄，返回结果发生变化的村庄
+        没有任何索引文件的村庄视为全部缺少
+        """
+        villages = list(villages)
+        if not self.materials:
+            return {}
+        found: Dict[str, List[bool]] = {}
+        for i in range(0, len(villages), _IN_BATCH):
+            batch = villages[i:i + _IN_BATCH]
+            sql = (f"SELECT village_name, {self._select} FROM documents "
+                   f"WHERE task_id = ? AND village_name IN ({', '.join(['?'] * len(batch))}) "
+                   f"GROUP BY village_name")
+            with self.lock:
+                rows = self.conn.execute(sql, (*self._params, self.task_id, *batch)).fetchall()
+            for row in rows:
+                found[row[0]] = [bool(v) for v in row[1:]]
+
+        changed = {}
+        required = self.required
+        results = dict(self.results)
+        for village in villages:
+            flags = found.get(village, [False] * len(required))
+            result = {
+                "required": required,
+                "received": [name for name, ok in zip(required, flags) if ok],
+                "missing": [name for name, ok in zip(required, flags) if not ok],
+            }
+            if results.get(village) != result:
+                results[village] = result
+                changed[village] = result
+        self._save(changed)
+        self.results = results
+        return changed
+
+    def forget(self, villages: Iterable[str]) -> None:
+        results = dict(self.results)
+        villages = [v for v in villages if results.pop(v, None) is not None]
+        self.results = results
+        if villages:
+            with self.lock, self.conn:
+                self.conn.executemany(
+                    "DELETE FROM village_completeness WHERE task_id = ? AND village_name = ?",
+                    [(self.task_id, v) for v in villages])
+
+    def missing(self, village: str) -> List[str]:
+        result = self.results.get(village)
+        return result["missing"] if result else []
+
+    def incomplete(self) -> Dict[str, List[str]]:
+        """村庄 → 缺少的材料（只含有缺项的村庄）"""
+        return {name: r["missing"] for name, r in self.results.items() if r["missing"]}
+
+    @staticmethod
+    def excel_values(result: Dict[str, List[str]]) -> Dict[str, str]:
+        """写入 Excel 台账的三列"""
+        return {
+            '必需材料': ','.join(result["required"]),
+            '已收材料': ','.join(result["received"]),
+            '缺少材料': ','.join(result["missing"]),
+        }
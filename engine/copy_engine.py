@@ -0,0 +1,223 @@
+# engine/copy_engine.py
+"""
+并发文件拷贝引擎
+线程池并发拷贝、分块读写并汇报 字节/文件 进度，支持取消与单文件重试；
+先写 .part 临时文件，完成后替换，取消或失败不会留下半截文件
+本模块不依赖 Qt，界面通过 engine/qt_copy_engine.py 的信号使用
+"""
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# (源文件, 目标文件, 字节数)
+CopyItem = Tuple[str, str, int]
+
+CHUNK_SIZE = 4 * 1024 * 1024
+PART_SUFFIX = ".part"
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+def plan_copy(sources: Iterable[str], target_dir: str) -> List[CopyItem]:
+    """展开待拷贝列表：文件直接放入 target_dir，目录按相对路径整体拷入"""
+    items = []
+    for src in sources:
+        src = os.path.abspath(src)
+        name = os.path.basename(src.rstrip(os.sep))
+        if os.path.isdir(src):
+            for root, _, files in os.walk(src):
+                rel = os.path.relpath(root, src)
+                for file_name in files:
+                    path = os.path.join(root, file_name)
+                    dst = os.path.normpath(os.path.join(target_dir, name, rel, file_name))
+                    items.append((path, dst, os.path.getsize(path)))
+        elif os.path.isfile(src):
+            items.append((src, os.path.join(target_dir, name), os.path.getsize(src)))
+    return items
+
+
+class CopyEngine:
+    """
+    回调均在工作线程中调用：
+      on_progress(已拷字节, 总字节, 已完成文件数, 总文件数)  —— 按 progress_interval 节流
+      on_file_done(源, 目标) / on_file_failed(源, 错误信息)
+      on_finished(成功数, 失败列表 [(源, 目标, 字节数)], 是否被取消)
+    """
+
+    def __init__(self, max_workers: int = 4, retries: int = 2, chunk_size: int = CHUNK_SIZE,
+                 progress_interval: float = 0.1, blob_store=None,
+                 on_progress: Optional[Callable[[int, int, int, int], None]] = None,
+                 on_file_done: Optional[Callable[[str, str], None]] = None,
+                 on_file_failed: Optional[Callable[[str, str], None]] = None,
+                 on_finished: Optional[Callable[[int, List[CopyItem], bool], None]] = None):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+        # 可选的 engine.blob_store.BlobStore：相同内容只存一份，目标处 reflink 克隆（卷不支持时直接拷贝）
+        self.blob_store = blob_store
+        self.on_progress = on_progress
+        self.on_file_done = on_file_done
+        self.on_file_failed = on_file_failed
+        self.on_finished = on_finished
+
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._reset([])
+
+    def _reset(self, items: List[CopyItem]):
+        self.bytes_total = sum(size for _, _, size in items)
+        self.files_total = len(items)
+        self.bytes_done = 0
+        self.files_done = 0
+        self.failed: List[CopyItem] = []
+        self._last_report = 0.0
+
+    # -------------------------------------------------
+    # 对外接口
+    # -------------------------------------------------
+    def run(self, items: List[CopyItem]) -> Tuple[int, List[CopyItem], bool]:
+        """同步执行，返回 (成功数, 失败列表, 是否被取消)"""
+        self._cancel.clear()
+        self._reset(items)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers,
+                                    thread_name_prefix="copy") as pool:
+                futures = [pool.submit(self._copy_item, item) for item in items]
+                for future in futures:
+                    future.result()
+            self._report(force=True)
+        finally:
+            # 无论如何都要通知结束，否则界面任务和 copy_tasks 记录会一直停在"进行中"
+            cancelled = self._cancel.is_set()
+            ok = self.files_done - len(self.failed)
+            if self.on_finished:
+                self.on_finished(ok, list(self.failed), cancelled)
+        return ok, list(self.failed), cancelled
+
+    def start(self, items: List[CopyItem]) -> threading.Thread:
+        """后台执行，立即返回"""
+        self._thread = threading.Thread(target=self.run, args=(items,),
+                                        name="copy-engine", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def retry_failed(self) -> threading.Thread:
+        """重新拷贝上一轮失败的文件"""
+        return self.start(list(self.failed))
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    # -------------------------------------------------
+    # 内部实现
+    # -------------------------------------------------
+    def _copy_item(self, item: CopyItem) -> None:
+        src, dst, size = item
+        error = None
+        for attempt in range(self.retries + 1):
+            if self._cancel.is_set():
+                return
+            try:
+                self._copy_file(src, dst)
+                error = None
+                break
+            except CopyCancelled:
+                return
+            except OSError as e:
+                error = str(e)
+                time.sleep(0.2 * (attempt + 1))
+            except Exception as e:
+                # 非 IO 错误（如 blob 索引的 sqlite3.Error）重试无意义，直接记为失败
+                error = f"{type(e).__name__}: {e}"
+                break
+
+        with self._lock:
+            self.files_done += 1
+            if error is not None:
+                self.failed.append(item)
+        if error is None:
+            if self.on_file_done:
+                self.on_file_done(src, dst)
+        elif self.on_file_failed:
+            self.on_file_failed(src, error)
+        self._report(force=True)
+
+    def _copy_file(self, src: str, dst: str) -> int:
+        """分块拷贝单个文件，返回本次计入进度的字节数"""
+        # 目标卷不支持 reflink 时经过存储只会多存一份，直接拷贝
+        if self.blob_store is not None and self.blob_store.supports_clone(os.path.dirname(dst)):
+            return self._store_file(src, dst)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        part = dst + PART_SUFFIX
+        copied = 0
+        try:
+            with open(src, "rb") as fsrc, open(part, "wb") as fdst:
+                while True:
+                    if self._cancel.is_set():
+                        raise CopyCancelled()
+                    chunk = fsrc.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    fdst.write(chunk)
+                    copied += len(chunk)
+                    self._add_bytes(len(chunk))
+            shutil.copystat(src, part)
+            os.replace(part, dst)
+            return copied
+        except BaseException:
+            # 失败或取消：撤回本次进度并删除半截文件
+            self._add_bytes(-copied)
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+
+    def _store_file(self, src: str, dst: str) -> int:
+        """经内容寻址存储归档：已入库的相同文件不再读取源文件"""
+        copied = 0
+
+        def on_chunk(n):
+            nonlocal copied
+            if self._cancel.is_set():
+                raise CopyCancelled()
+            copied += n
+            self._add_bytes(n)
+
+        try:
+            self.blob_store.store_file(src, dst, on_chunk)
+            return copied
+        except BaseException:
+            self._add_bytes(-copied)
+            raise
+
+    def _add_bytes(self, n: int) -> None:
+        if not n:
+            return
+        with self._lock:
+            self.bytes_done += n
+        self._report()
+
+    def _report(self, force: bool = False) -> None:
+        if not self.on_progress:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.progress_interval:
+                return
+            self._last_report = now
+            snapshot = (self.bytes_done, self.bytes_total, self.files_done, self.files_total)
+        self.on_progress(*snapshot)
@@ -0,0 +1,78 @@
+# engine/disbursement.py
+"""
+补贴发放测算（无界面依赖，供 cli.py 批量调用）
+按 config 中的补贴规则逐户计算可享补贴与金额：
+  - 有年龄门槛的补贴按户内符合条件的人数计发，其余按户计发；
+  - 承包面积（family.landarea）视为承包种植地，按亩补贴按面积封顶计算；
+  - 互斥的两项补贴只保留金额较高的一项
+plan_chunk 处理一页家庭，可在子进程中运行，各进程自建数据库连接；
+plan_families 不访问数据库，成员年龄由调用方给出（如从列式快照加载）
+"""
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from engine.rule_loader import RuleLoader
+from engine.subsidy_engine import SubsidyEngine
+
+# family.landarea 对应的土地类型
+FAMILY_LAND_TYPE = "承包种植地"
+
+PLAN_COLUMNS = ["family_id", "family_name", "subsidy_id", "subsidy_name", "persons", "land_area", "amount"]
+
+
+def plan_family(family: Dict, ages: Iterable[Optional[int]]) -> List[Dict]:
+    """单户的发放明细：[{subsidy_id, subsidy_name, persons, amount, ...}]"""
+    land_area = float(family.get("landarea") or 0)
+    ages = list(ages) or [None]
+    # 补贴 id → 符合条件的人数
+    persons: Dict[str, int] = {}
+    rules = {}
+    for age in ages:
+        person = SimpleNamespace(age=age or 0, land_type=FAMILY_LAND_TYPE if land_area > 0 else None)
+        for rule in SubsidyEngine.eligible(person, land_area):
+            persons[rule.id] = persons.get(rule.id, 0) + 1
+            rules[rule.id] = rule
+
+    amounts = {}
+    for rule_id, rule in rules.items():
+        count = persons[rule_id] if rule.age_min else 1
+        amounts[rule_id] = rule.amount(land_area) * count
+
+    # 互斥：反复去掉冲突对中金额较低的一项
+    while True:
+        conflict = SubsidyEngine.conflicts(set(amounts))
+        if conflict is None:
+            break
+        drop = conflict.left if amounts[conflict.left] < amounts[conflict.right] else conflict.right
+        amounts.pop(drop)
+
+    return [{
+        "family_id": family["id"],
+        "family_name": family.get("name", ""),
+        "subsidy_id": rule_id,
+        "subsidy_name": rules[rule_id].name,
+        "persons": persons[rule_id] if rules[rule_id].age_min else "",
+        "land_area": land_area if rules[rule_id].land_require else "",
+        "amount": round(amount, 2),
+    } for rule_id, amount in amounts.items() if amount > 0]
+
+
+def plan_chunk(db_path: str, families: List[Dict], config_dir: str = "config") -> List[Dict]:
+    """一页家庭的发放明细（子进程入口，需可 pickle 的参数）"""
+    from models.dbManager import DatabaseManager
+    from models.family_model import FamilyDAO
+
+    ages = FamilyDAO(DatabaseManager(db_path)).member_ages([f["id"] for f in families])
+    return plan_families(families, ages, config_dir)
+
+
+def plan_families(families: List[Dict], ages: Dict[int, List[Optional[int]]],
+                  config_dir: str = "config") -> List[Dict]:
+    """一页家庭的发放明细，ages 为 {家庭id: [年龄, ...]}"""
+    if not RuleLoader.subsidy_rules():
+        RuleLoader.load(Path(config_dir))
+    rows = []
+    for family in families:
+        rows.extend(plan_family(family, ages.get(family["id"], [])))
+    return rows
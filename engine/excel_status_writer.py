@@ -0,0 +1,99 @@
+# engine/excel_status_writer.py
+"""
+Excel 归档状态缓冲写入
+归档操作只把状态变更记在内存里，由防抖定时器或显式 sync 一次性写回工作簿：
+一次读取、一次保存，先写临时文件再替换；写入失败（如文件被 Excel 占用）时变更保留到下次
+"""
+import os
+import threading
+from typing import Dict, List
+
+from openpyxl import Workbook, load_workbook
+
+EXCEL_COLUMNS = ['村庄名称', '归档状态', '文件数量', '归档时间', '备注']
+NAME_COLUMN = '村庄名称'
+STATUS_COLUMN = '归档状态'
+
+
+class ExcelStatusWriter:
+    """单个 Excel 台账的缓冲写入器"""
+
+    def __init__(self, excel_file: str, columns: List[str] = EXCEL_COLUMNS):
+        self.excel_file = excel_file
+        self.columns = columns
+        self._pending: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def queue(self, village_name: str, values: Dict[str, object]) -> None:
+        """登记一个村庄的列值变更，同一村庄多次变更合并"""
+        with self._lock:
+            self._pending.setdefault(village_name, {}).update(values)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def pending_status(self) -> Dict[str, bool]:
+        """尚未写回的归档状态，扫描时叠加在 Excel 读数之上"""
+        with self._lock:
+            return {name: values[STATUS_COLUMN] == '已归档'
+                    for name, values in self._pending.items() if STATUS_COLUMN in values}
+
+    def flush(self) -> int:
+        """写回全部待写变更，返回写入的村庄数"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            self._write(pending)
+        except Exception:
+            # 写失败：放回队列，新登记的变更优先
+            with self._lock:
+                for name, values in pending.items():
+                    self._pending[name] = {**values, **self._pending.get(name, {})}
+            raise
+        return len(pending)
+
+    def _write(self, pending: Dict[str, Dict[str, object]]) -> None:
+        if os.path.exists(self.excel_file):
+            wb = load_workbook(self.excel_file)
+            ws = wb.worksheets[0]
+        else:
+            wb = Workbook()
+            ws = wb.active
+            ws.append(self.columns)
+
+        header = {str(cell.value).strip(): cell.column for cell in ws[1] if cell.value is not None}
+
+        def column_of(name):
+            if name not in header:
+                header[name] = max(header.values(), default=0) + 1
+                ws.cell(row=1, column=header[name], value=name)
+            return header[name]
+
+        for name in self.columns:
+            column_of(name)
+        name_col = header[NAME_COLUMN]
+
+        rows = {}
+        for row_idx, (value,) in enumerate(
+                ws.iter_rows(min_row=2, min_col=name_col, max_col=name_col, values_only=True), 2):
+            if value is not None:
+                rows.setdefault(str(value).strip(), row_idx)
+
+        next_row = ws.max_row + 1
+        for village_name, values in pending.items():
+            row_idx = rows.get(village_name)
+            if row_idx is None:
+                row_idx = next_row
+                next_row += 1
+                ws.cell(row=row_idx, column=name_col, value=village_name)
+            for col, value in values.items():
+                ws.cell(row=row_idx, column=column_of(col), value=value)
+
+        root, ext = os.path.splitext(self.excel_file)
+        tmp_path = f"{root}.saving{ext or '.xlsx'}"
+        wb.save(tmp_path)
+        wb.close()
+        os.replace(tmp_path, self.excel_file)
@@ -0,0 +1,69 @@
+# engine/kanban_diff.py
+"""
+看板增量更新
+比较看板上现有的卡片与最新查询结果，得出 删除 / 新增 / 移动 / 原地更新 四类操作，
+界面只对这些卡片动手，其余卡片保持不动；
+同一列内保留旧顺序的最长递增子序列，只移动其余卡片
+"""
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence
+
+# 影响卡片显示内容的字段，变化时原地更新卡片
+DISPLAY_FIELDS = ("name", "year", "progress")
+
+
+def _stable_ids(old_order: Dict[Any, int], ids: Sequence[Any]) -> set:
+    """ids 中旧位置构成最长递增子序列的那些 id（这些卡片无需移动）"""
+    tails: List[int] = []      # tails[k]：长度 k+1 的递增子序列的最小结尾位置
+    tail_at: List[int] = []    # tails[k] 对应的 ids 下标
+    prev: List[int] = [-1] * len(ids)
+    for i, item_id in enumerate(ids):
+        pos = old_order[item_id]
+        k = bisect_left(tails, pos)
+        if k == len(tails):
+            tails.append(pos)
+            tail_at.append(i)
+        else:
+            tails[k] = pos
+            tail_at[k] = i
+        prev[i] = tail_at[k - 1] if k else -1
+    stable = set()
+    i = tail_at[-1] if tail_at else -1
+    while i >= 0:
+        stable.add(ids[i])
+        i = prev[i]
+    return stable
+
+
+def diff_board(old_columns: Dict[str, List[Any]], old_items: Dict[Any, Dict],
+               new_items: Iterable[Dict], key: str = "id", column: str = "status") -> Dict:
+    """
+    old_columns: 列名 → 当前卡片 id 顺序；old_items: id → 卡片当前数据
+    new_items:   最新数据（已按列内顺序排好）
+    返回 {deleted, inserted, moved, updated, columns, items}：
+      columns 为各列新的 id 顺序，界面按它把 inserted / moved 的卡片放到对应位置
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in old_columns}
+    items: Dict[Any, Dict] = {}
+    for item in new_items:
+        items[item[key]] = item
+        columns.setdefault(item[column], []).append(item[key])
+
+    old_column_of = {item_id: name for name, ids in old_columns.items() for item_id in ids}
+    deleted = [item_id for item_id in old_column_of if item_id not in items]
+    inserted, moved = [], []
+    for name, ids in columns.items():
+        old_order = {item_id: i for i, item_id in enumerate(old_columns.get(name, []))}
+        staying = [item_id for item_id in ids if item_id in old_order]
+        stable = _stable_ids(old_order, staying)
+        for item_id in ids:
+            if item_id not in old_column_of:
+                inserted.append(item_id)
+            elif item_id not in stable:
+                moved.append(item_id)
+
+    updated = [item_id for item_id, item in items.items()
+               if item_id in old_items
+               and any(old_items[item_id].get(f) != item.get(f) for f in DISPLAY_FIELDS)]
+    return {"deleted": deleted, "inserted": inserted, "moved": moved,
+            "updated": updated, "columns": columns, "items": items}
@@ -0,0 +1,45 @@
+# engine/qt_copy_engine.py
+"""
+CopyEngine 的 Qt 信号封装
+回调在拷贝线程中发射信号，接收方在界面线程通过队列连接处理
+"""
+from typing import List
+
+from PySide6.QtCore import QObject, Signal
+
+from engine.copy_engine import CopyEngine, CopyItem, plan_copy
+
+
+class CopyTask(QObject):
+    """一次拷贝任务"""
+    progress = Signal(object, object, int, int)  # 已拷字节, 总字节, 已完成文件数, 总文件数
+    file_failed = Signal(str, str)               # 源文件, 错误信息
+    finished = Signal(int, list, bool)           # 成功数, 失败列表, 是否被取消
+
+    def __init__(self, max_workers: int = 4, retries: int = 2, blob_store=None, parent=None):
+        super().__init__(parent)
+        self.engine = CopyEngine(
+            max_workers=max_workers,
+            retries=retries,
+            blob_store=blob_store,
+            on_progress=self.progress.emit,
+            on_file_failed=self.file_failed.emit,
+            on_finished=self.finished.emit,
+        )
+
+    @staticmethod
+    def plan(sources, target_dir) -> List[CopyItem]:
+        return plan_copy(sources, target_dir)
+
+    def start(self, items: List[CopyItem]) -> None:
+        self.engine.start(items)
+
+    def retry_failed(self) -> None:
+        self.engine.retry_failed()
+
+    def cancel(self) -> None:
+        self.engine.cancel()
+
+    @property
+    def running(self) -> bool:
+        return self.engine.running
@@ -0,0 +1,142 @@
+# engine/qt_query_runner.py
+"""
+界面查询的后台执行
+服务 / DAO 调用放到 QThreadPool 中执行，结果经信号回到界面线程；
+每个请求键（如 "records"、"family_detail"）有一个代号，同一键的新请求会使旧请求作废：
+排队中的旧任务直接撤下，已在执行的任务结果到达后丢弃，用户快速切换选择时只显示最后一次的结果；
+丢弃的结果若持有资源（如分页游标），由 on_discard 在后台线程中释放
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class _PostedJob(QRunnable):
+    """不关心结果的后台任务（如关闭游标）"""
+
+    def __init__(self, fn: Callable, args: Tuple):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+
+    def run(self):
+        try:
+            self.fn(*self.args)
+        except Exception as e:
+            print(f"后台任务出错: {e}")
+
+
+class _QueryJob(QRunnable):
+    def __init__(self, runner: "QueryRunner", key: str, generation: int,
+                 fn: Callable, args: Tuple, kwargs: Dict):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.runner = runner
+        self.key = key
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.runner._done.emit(self.key, self.generation, None, str(e) or type(e).__name__)
+        else:
+            self.runner._done.emit(self.key, self.generation, result, "")
+
+
+class QueryRunner(QObject):
+    """
+    默认单线程执行：后台线程通过 DatabaseManager 拿到自己的只读连接，
+    该连接（及其上未读完的分页游标）只在这个线程中使用，不与界面线程的主连接交错；
+    线程不回收（否则每个新线程都要新开连接）
+    finished / failed 只对每个键的最新请求发出
+    """
+    finished = Signal(str, object)  # 请求键, 结果
+    failed = Signal(str, str)       # 请求键, 错误信息
+    _done = Signal(str, int, object, str)
+
+    _default: Optional["QueryRunner"] = None
+
+    def __init__(self, max_threads: int = 1, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.pool.setExpiryTimeout(-1)
+        self._generations: Dict[str, int] = {}
+        self._jobs: Dict[str, _QueryJob] = {}
+        self._callbacks: Dict[str, Tuple[Optional[Callable], Optional[Callable]]] = {}
+        # (键, 代号) → 结果作废时的清理函数
+        self._discards: Dict[Tuple[str, int], Callable[[Any], None]] = {}
+        self._done.connect(self._on_done)
+
+    @classmethod
+    def default(cls) -> "QueryRunner":
+        """业务库（family_subsidies.db）页面共用的执行器"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    # ---------------- 对外接口 ---------------- #
+    def submit(self, key: str, fn: Callable, args: Tuple = (), kwargs: Optional[Dict] = None,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None,
+               on_discard: Optional[Callable[[Any], None]] = None) -> int:
+        """
+        后台执行 fn(*args, **kwargs)，返回本次请求的代号
+        on_result / on_error 在界面线程调用，且只在本次请求仍是该键的最新请求时调用；
+        结果被作废时改为在后台线程调用 on_discard(结果)
+        """
+        self._withdraw(key)
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        job = _QueryJob(self, key, generation, fn, tuple(args), kwargs or {})
+        self._jobs[key] = job
+        self._callbacks[key] = (on_result, on_error)
+        if on_discard is not None:
+            self._discards[(key, generation)] = on_discard
+        self.pool.start(job)
+        return generation
+
+    def post(self, fn: Callable, *args) -> None:
+        """在查询线程中执行 fn(*args)，不回调；用于释放只能在该线程使用的资源"""
+        self.pool.start(_PostedJob(fn, args))
+
+    def cancel(self, key: str) -> None:
+        """作废某个键的请求（排队中的撤下，执行中的结果丢弃）"""
+        self._withdraw(key)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._callbacks.pop(key, None)
+
+    def cancel_all(self) -> None:
+        for key in list(self._generations):
+            self.cancel(key)
+
+    def is_current(self, key: str, generation: int) -> bool:
+        return self._generations.get(key) == generation
+
+    # ---------------- 内部实现 ---------------- #
+    def _withdraw(self, key: str) -> None:
+        job = self._jobs.pop(key, None)
+        if job is not None and self.pool.tryTake(job):
+            # 还没执行，不会有结果要清理
+            self._discards.pop((key, job.generation), None)
+
+    def _on_done(self, key: str, generation: int, result, error: str) -> None:
+        on_discard = self._discards.pop((key, generation), None)
+        if not self.is_current(key, generation):
+            if on_discard is not None and not error:
+                self.post(on_discard, result)
+            return
+        self._jobs.pop(key, None)
+        on_result, on_error = self._callbacks.pop(key, (None, None))
+        if error:
+            if on_error:
+                on_error(error)
+            self.failed.emit(key, error)
+        else:
+            if on_result:
+                on_result(result)
+            self.finished.emit(key, result)
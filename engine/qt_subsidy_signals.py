@@ -0,0 +1,38 @@
+# engine/qt_subsidy_signals.py
+"""
+补贴类型 / 互斥规则变化的 Qt 信号
+把 models.subsidy_cache 的回调转成信号；回调一律排队到界面线程（写库可能发生在后台线程），
+送达时版本号已不是最新的直接丢弃，一次保存连续写入多行时界面只刷新一次
+"""
+from typing import Optional
+
+from PySide6.QtCore import QObject, Qt, Signal
+
+from models.subsidy_cache import RULES, SUBSIDIES, subsidy_cache
+
+
+class SubsidySignals(QObject):
+    subsidiesChanged = Signal(int)  # 新版本号
+    rulesChanged = Signal(int)
+    _invalidated = Signal(str, int)
+
+    _instance: Optional["SubsidySignals"] = None
+
+    @classmethod
+    def instance(cls) -> "SubsidySignals":
+        if cls._instance is None:
+            cls._instance = cls()
+            subsidy_cache.subscribe(cls._instance._invalidated.emit)
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._invalidated.connect(self._deliver, Qt.QueuedConnection)
+
+    def _deliver(self, kind: str, version: int) -> None:
+        if version != subsidy_cache.version(kind):
+            return
+        if kind == SUBSIDIES:
+            self.subsidiesChanged.emit(version)
+        elif kind == RULES:
+            self.rulesChanged.emit(version)
@@ -0,0 +1,132 @@
+# engine/qt_thumbnailer.py
+"""
+后台缩略图生成
+低优先级线程池中用 QImageReader 按目标尺寸解码（JPEG 可直接降采样解码，不必解出原图），
+PDF 用 QtPdf 渲染首页；结果存入 ThumbnailCache，通过 ready 信号通知界面线程
+界面线程只加载几十 KB 的缩略图，不解码原始扫描件
+"""
+import os
+import threading
+from typing import Optional
+
+from PySide6.QtCore import (QBuffer, QByteArray, QIODevice, QObject, QRunnable, QSize,
+                            QThread, QThreadPool, Qt, Signal)
+from PySide6.QtGui import QImage, QImageReader, QPainter
+
+from engine.blob_store import file_digest
+from engine.thumbnail_cache import PDF_SUFFIXES, ThumbnailCache, can_preview
+
+try:
+    from PySide6.QtPdf import QPdfDocument
+except ImportError:  # 未安装 QtPdf 时不生成 PDF 预览
+    QPdfDocument = None
+
+
+def render_thumbnail(path: str, size: int) -> QImage:
+    """解码并缩放到 size×size 以内，失败返回空 QImage"""
+    if os.path.splitext(path)[1].lower() in PDF_SUFFIXES:
+        if QPdfDocument is None:
+            return QImage()
+        doc = QPdfDocument()
+        doc.load(path)
+        if doc.pageCount() < 1:
+            return QImage()
+        page = doc.pagePointSize(0).toSize()
+        return doc.render(0, page.scaled(size, size, Qt.KeepAspectRatio))
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    if original.isValid():
+        reader.setScaledSize(original.scaled(QSize(size, size), Qt.KeepAspectRatio))
+    image = reader.read()
+    if not image.isNull() and (image.width() > size or image.height() > size):
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+class _ThumbnailJob(QRunnable):
+    def __init__(self, loader: "ThumbnailLoader", key: str, path: str, digest: Optional[str]):
+        super().__init__()
+        self.loader = loader
+        self.key = key
+        self.path = path
+        self.digest = digest
+
+    def run(self):
+        try:
+            self.loader._generate(self.key, self.path, self.digest)
+        finally:
+            self.loader._done(self.path)
+
+
+class ThumbnailLoader(QObject):
+    """缩略图请求入口，同一文件未完成前的重复请求会被合并"""
+    ready = Signal(str, str, str)  # 请求方标识（如村庄名）, 源文件, 缩略图路径
+
+    def __init__(self, cache: Optional[ThumbnailCache] = None, max_threads: int = 2, parent=None):
+        super().__init__(parent)
+        self.cache = cache or ThumbnailCache()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.pool.setThreadPriority(QThread.LowestPriority)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def cached(self, digest: Optional[str]) -> Optional[str]:
+        """已知哈希时在界面线程直接查缓存"""
+        if not digest:
+            return None
+        path = self.cache.lookup(digest)
+        return str(path) if path else None
+
+    def request(self, key: str, path: str, digest: Optional[str] = None) -> Optional[str]:
+        """缓存命中直接返回缩略图路径，否则排入后台生成并返回 None"""
+        if not can_preview(path):
+            return None
+        hit = self.cached(digest)
+        if hit:
+            return hit
+        with self._lock:
+            if path in self._pending:
+                return None
+            self._pending.add(path)
+        self.pool.start(_ThumbnailJob(self, key, path, digest))
+        return None
+
+    def shutdown(self) -> None:
+        """丢弃排队中的任务（正在生成的会自行结束）"""
+        self.pool.clear()
+        with self._lock:
+            self._pending.clear()
+
+    # ---------------- 工作线程 ---------------- #
+    def _generate(self, key: str, path: str, digest: Optional[str]) -> None:
+        try:
+            digest = digest or file_digest(path)
+        except OSError:
+            return
+        thumb = self.cache.lookup(digest)
+        if thumb is None:
+            image = render_thumbnail(path, self.cache.size)
+            if image.isNull():
+                return
+            if image.hasAlphaChannel():
+                # JPEG 无透明通道，铺白底（PDF 页面默认透明）
+                canvas = QImage(image.size(), QImage.Format_RGB888)
+                canvas.fill(Qt.white)
+                painter = QPainter(canvas)
+                painter.drawImage(0, 0, image)
+                painter.end()
+                image = canvas
+            data = QByteArray()
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.WriteOnly)
+            image.save(buffer, "JPG", 85)
+            buffer.close()
+            thumb = self.cache.store(digest, bytes(data))
+        self.ready.emit(key, path, str(thumb))
+
+    def _done(self, path: str) -> None:
+        with self._lock:
+            self._pending.discard(path)
@@ -0,0 +1,60 @@
+# engine/row_filter.py
+"""
+表格客户端筛选
+行数据建立一次索引：小写的搜索文本列 + 各筛选字段列，筛选时不再逐行拼接 / 转小写；
+关键字在上一次基础上追加输入（且其它条件不变）时，只在上一次的结果中继续缩小范围
+界面侧的按键防抖见 ui/table_models.py 的 DebouncedRowFilter
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+def name_index(items: Iterable[Dict], key: str = "id", value: str = "name") -> Dict[Any, Any]:
+    """id → 名称 字典，替代逐项 next(...) 线性查找"""
+    return {item[key]: item[value] for item in items}
+
+
+class RowFilter:
+    def __init__(self, search_text: Callable[[Dict], str],
+                 fields: Optional[Dict[str, Callable[[Dict], Any]]] = None,
+                 rows: Sequence[Dict] = ()):
+        """
+        search_text: 行 → 参与关键字搜索的文本
+        fields:      筛选字段名 → 取值函数，match(**条件) 按相等比较
+        """
+        self.search_text = search_text
+        self.fields = fields or {}
+        self.set_rows(rows)
+
+    def set_rows(self, rows: Sequence[Dict]) -> None:
+        """行数据变化后重建索引"""
+        self._search = [(self.search_text(row) or "").lower() for row in rows]
+        self._columns = {name: [get(row) for row in rows] for name, get in self.fields.items()}
+        self._last_keyword: Optional[str] = None
+        self._last_criteria: Dict[str, Any] = {}
+        self._last_result: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._search)
+
+    def match(self, keyword: str = "", **criteria) -> List[int]:
+        """返回符合条件的行号；条件值为 None 或空串表示不限"""
+        keyword = keyword.strip().lower()
+        criteria = {k: v for k, v in criteria.items() if v not in (None, "")}
+
+        # 关键字是上一次的延长且其它条件不变：结果必为上一次结果的子集
+        if (self._last_keyword is not None and criteria == self._last_criteria
+                and keyword.startswith(self._last_keyword)):
+            candidates: Iterable[int] = self._last_result
+        else:
+            candidates = range(len(self._search))
+
+        columns = [(self._columns[name], value) for name, value in criteria.items()]
+        search = self._search
+        result = [i for i in candidates
+                  if (not keyword or keyword in search[i])
+                  and all(column[i] == value for column, value in columns)]
+
+        self._last_keyword = keyword
+        self._last_criteria = criteria
+        self._last_result = result
+        return result
@@ -0,0 +1,33 @@
+# engine/rule_models.py
+"""
+补贴规则 / 互斥规则的数据结构，字段与 config/subsidy_rules.json、config/conflict_rules.json 一致
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class SubsidyRule:
+    id: str
+    name: str
+    land_require: Optional[str] = None
+    amount_per_mu: float = 0
+    max_area: Optional[float] = None
+    age_min: Optional[int] = None
+    amount_fixed: float = 0
+    is_exclusive: bool = False
+
+    def amount(self, land_area: float = 0) -> float:
+        """定额补贴直接取定额，按亩补贴按面积（不超过封顶面积）计算"""
+        if self.amount_fixed:
+            return float(self.amount_fixed)
+        area = land_area if self.max_area is None else min(land_area, self.max_area)
+        return round(float(self.amount_per_mu) * max(area, 0), 2)
+
+
+@dataclass
+class ConflictRule:
+    rule_id: str
+    left: str
+    right: str
+    desc: str = ""
@@ -0,0 +1,162 @@
+# engine/scan_cache.py
+"""
+归档目录扫描缓存
+以 (mtime_ns, inode) 作为目录签名、(mtime_ns, size) 作为 Excel 签名持久化到 cache/ 下，
+刷新时只重新列出签名发生变化的目录，Excel 未改动时不再解析
+"""
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+CACHE_VERSION = 1
+
+
+def _dir_signature(stat: os.stat_result) -> list:
+    # 目录增删改名会更新 mtime；inode 变化说明目录被整体替换
+    return [stat.st_mtime_ns, stat.st_ino]
+
+
+def _file_signature(stat: os.stat_result) -> list:
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ScanCache:
+    """单个项目（工作文件夹 + Excel）的扫描缓存"""
+
+    def __init__(self, work_folder: str, excel_file: str, cache_dir: str = "cache"):
+        self.work_folder = work_folder
+        self.excel_file = excel_file
+        key = hashlib.sha1(
+            f"{os.path.abspath(work_folder)}|{os.path.abspath(excel_file)}".encode("utf-8")
+        ).hexdigest()[:16]
+        self.cache_path = os.path.join(cache_dir, f"scan_{key}.json")
+        self.data = self._load()
+        self.dirty = False
+        # 最近一次扫描是否有任何内容被重新读取
+        self.changed = True
+        # 最近一次扫描中重新列出 / 消失的村庄目录
+        self.relisted = set()
+        self.removed = set()
+
+    # -------------------------------------------------
+    # 持久化
+    # -------------------------------------------------
+    def _load(self) -> Dict:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"version": CACHE_VERSION, "excel": None, "root": None, "dirs": {}}
+
+    def save(self) -> None:
+        """有变化时原子写回缓存文件"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+    def invalidate(self, village_name: Optional[str] = None) -> None:
+        """丢弃某个村庄目录（或全部）的缓存，下次扫描强制重新列出"""
+        if village_name is None:
+            self.data.update(excel=None, root=None, dirs={})
+        else:
+            self.data["dirs"].pop(village_name, None)
+        self.dirty = True
+
+    # -------------------------------------------------
+    # 扫描
+    # -------------------------------------------------
+    def begin_scan(self) -> None:
+        self.changed = False
+        self.relisted = set()
+        self.removed = set()
+
+    def excel_status(self, reader: Callable[[], Optional[Dict[str, bool]]]) -> Dict[str, bool]:
+        """
+        村庄 → 是否已归档；Excel 签名未变时直接返回缓存
+        :param reader: 签名变化时调用的实际解析函数，读取失败返回 None
+                       （如文件正被 Excel 占用），此时沿用上次的结果且不记录新签名，下次扫描重读
+        """
+        try:
+            signature = _file_signature(os.stat(self.excel_file))
+        except OSError:
+            if self.data["excel"] is not None:
+                self.data["excel"] = None
+                self.dirty = self.changed = True
+            return {}
+
+        cached = self.data["excel"]
+        if cached and cached["signature"] == signature:
+            return cached["villages"]
+
+        villages = reader()
+        if villages is None:
+            return cached["villages"] if cached else {}
+        self.data["excel"] = {"signature": signature, "villages": villages}
+        self.dirty = self.changed = True
+        return villages
+
+    def village_dirs(self) -> Dict[str, Dict]:
+        """
+        村庄 → {folder_path, files}
+        根目录签名未变时沿用缓存的目录名单，每个村庄目录签名未变时沿用缓存的文件名单
+        """
+        try:
+            root_sig = _dir_signature(os.stat(self.work_folder))
+        except OSError:
+            return {}
+
+        root = self.data["root"]
+        if root and root["signature"] == root_sig:
+            names = root["names"]
+        else:
+            with os.scandir(self.work_folder) as it:
+                names = sorted(e.name for e in it if '村' in e.name and e.is_dir())
+            self.data["root"] = {"signature": root_sig, "names": names}
+            self.dirty = self.changed = True
+
+        dirs = self.data["dirs"]
+        for stale in set(dirs) - set(names):
+            del dirs[stale]
+            self.removed.add(stale)
+            self.dirty = self.changed = True
+
+        result = {}
+        for name in names:
+            files = self._list_village(name)
+            if files is not None:
+                result[name] = {"folder_path": os.path.join(self.work_folder, name), "files": files}
+        return result
+
+    def village_files(self, village_name: str) -> List[str]:
+        """
+        单个村庄目录的文件名单（扫描之外调用，如归档后登记文件数量）
+        目录签名未变时直接返回缓存；有变化时直接列出，但不写回签名、不计入 relisted，
+        变化留给下一次扫描发现，由它重新索引该村庄
+        """
+        return self._list_village(village_name, record=False) or []
+
+    def _list_village(self, village_name: str, record: bool = True) -> Optional[List[str]]:
+        folder_path = os.path.join(self.work_folder, village_name)
+        try:
+            signature = _dir_signature(os.stat(folder_path))
+        except OSError:
+            return None
+        cached = self.data["dirs"].get(village_name)
+        if cached and cached["signature"] == signature:
+            return cached["files"]
+        with os.scandir(folder_path) as it:
+            files = sorted(e.name for e in it if e.is_file())
+        if record:
+            self.data["dirs"][village_name] = {"signature": signature, "files": files}
+            self.relisted.add(village_name)
+            self.dirty = self.changed = True
+        return files
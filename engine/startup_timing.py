@@ -0,0 +1,35 @@
+# engine/startup_timing.py
+"""
+启动耗时记录
+main.py 最先导入本模块作为计时起点，各阶段调用 mark() 打点，
+登录窗口可交互后 report() 输出各阶段耗时；环境变量 STARTUP_TIMING=0 时不输出
+"""
+import os
+import time
+from typing import List, Tuple
+
+_T0 = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+
+def mark(label: str) -> float:
+    """记录一个阶段完成，返回距启动的秒数"""
+    elapsed = time.perf_counter() - _T0
+    _marks.append((label, elapsed))
+    return elapsed
+
+
+def marks() -> List[Tuple[str, float]]:
+    return list(_marks)
+
+
+def report() -> str:
+    """各阶段耗时（毫秒），同时打印到控制台"""
+    lines, last = ["启动耗时:"], 0.0
+    for label, elapsed in _marks:
+        lines.append(f"  {label:<16} +{(elapsed - last) * 1000:7.1f} ms  累计 {elapsed * 1000:7.1f} ms")
+        last = elapsed
+    text = "\n".join(lines)
+    if os.environ.get("STARTUP_TIMING", "1") != "0":
+        print(text)
+    return text
@@ -0,0 +1,101 @@
+# engine/thumbnail_cache.py
+"""
+归档扫描件缩略图磁盘缓存
+缩略图按源文件内容哈希存放在 cache/thumbnails/ab/<哈希>_<尺寸>.jpg，
+同一内容在不同村庄 / 阶段目录中只生成一次；命中时刷新 mtime，
+总大小超过上限时按 mtime 从旧到新淘汰（LRU）
+本模块只负责存取，解码与缩放见 engine/qt_thumbnailer.py
+"""
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+THUMB_DIR = Path("cache") / "thumbnails"
+THUMB_SIZE = 256
+MAX_BYTES = 256 * 1024 * 1024
+# 淘汰到上限的这个比例，避免每次写入都触发淘汰
+EVICT_RATIO = 0.8
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff', '.webp'}
+PDF_SUFFIXES = {'.pdf'}
+PREVIEW_SUFFIXES = IMAGE_SUFFIXES | PDF_SUFFIXES
+
+
+def can_preview(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in PREVIEW_SUFFIXES
+
+
+class ThumbnailCache:
+    def __init__(self, root: Path = THUMB_DIR, max_bytes: int = MAX_BYTES, size: int = THUMB_SIZE):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.size = size
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}_{self.size}.jpg"
+
+    def lookup(self, digest: str) -> Optional[Path]:
+        """命中返回缩略图路径并刷新其 LRU 时间"""
+        path = self.path_for(digest)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def store(self, digest: str, data: bytes) -> Path:
+        """写入编码好的缩略图（先写临时文件再替换），必要时淘汰旧条目"""
+        path = self.path_for(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._total is not None:
+                self._total += len(data)
+        if self.total_bytes() > self.max_bytes:
+            self.evict()
+        return path
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(entry.stat().st_size for entry in self._entries())
+            return self._total
+
+    def evict(self, target: Optional[int] = None) -> int:
+        """按 mtime 从旧到新删除，直到总大小不超过 target，返回删除的条目数"""
+        target = int(self.max_bytes * EVICT_RATIO) if target is None else target
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry))
+            entries.sort(key=lambda e: e[0])
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, entry in entries:
+                if total <= target:
+                    break
+                try:
+                    entry.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total = total
+        return removed
+
+    def clear(self) -> int:
+        return self.evict(target=0)
+
+    def _entries(self):
+        return (p for p in self.root.glob("*/*.jpg") if p.is_file())
@@ -1,10 +1,12 @@
-import pandas as pd
-from datetime import datetime
-import pandas as pd
+import heapq
 import os
+import pickle
 import re
+import tempfile
 from datetime import datetime
 
+import pandas as pd
+
 def excel_to_md_with_images(input_excel, output_md, image_folder='./asset'):
     """
     将Excel数据转换为Markdown格式，包含时间加粗、正文内容和匹配的图片
@@ -95,9 +97,154 @@ def excel_to_md_with_images(input_excel, output_md, image_folder='./asset'):
     print(f"Markdown文件已生成: {output_md}")
     print(f"共处理 {len(df)} 条记录，匹配 {matched_images}/{total_images} 张图片")
 
+# -------------------------------------------------
+# 流式转换（大表格）
+# -------------------------------------------------
+# 图片名：YYYYMMDDT_ID.jpg 或 YYYYMMDDT_ID_序号.jpg
+IMAGE_NAME_RE = re.compile(r'^\d{8}T_(\d+)(?:_(\d+))?\.', re.IGNORECASE)
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif')
+TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%Y/%m/%d %H:%M:%S',
+                '%Y/%m/%d %H:%M', '%Y/%m/%d', '%Y%m%d')
+# 单个排序块的行数，超过则分块排序后落盘归并
+SORT_CHUNK_ROWS = 50000
+WRITE_BUFFER = 1024 * 1024
+
+
+def index_images(image_folder):
+    """一次扫描图片文件夹：ID → [(序号, 文件名)]，已按序号排好"""
+    id_to_images = {}
+    with os.scandir(image_folder) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(IMAGE_SUFFIXES):
+                continue
+            match = IMAGE_NAME_RE.match(entry.name)
+            if match:
+                seq = int(match.group(2)) if match.group(2) else 0
+                id_to_images.setdefault(match.group(1), []).append((seq, entry.name))
+    for images in id_to_images.values():
+        images.sort()
+    return id_to_images
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _iter_records(input_excel, time_idx=8, content_idx=2, id_idx=0):
+    """逐行读取 Excel（只读模式），产出 (时间, 行号, 时间原值, 正文, ID)，跳过时间无法解析的行"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(input_excel, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(min_row=2, values_only=True)
+        for seq, row in enumerate(rows):
+            if len(row) <= time_idx:
+                continue
+            sort_time = _parse_time(row[time_idx])
+            if sort_time is None:
+                continue
+            yield (sort_time, seq, _cell_text(row[time_idx]),
+                   _cell_text(row[content_idx]) if len(row) > content_idx else '',
+                   _cell_text(row[id_idx]) if len(row) > id_idx else '')
+    finally:
+        wb.close()
+
+
+def _spill(chunk, tmp_dir):
+    chunk.sort()
+    fd, path = tempfile.mkstemp(suffix='.chunk', dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as f:
+        for record in chunk:
+            pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_spill(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _sorted_records(records, tmp_dir, chunk_rows=SORT_CHUNK_ROWS):
+    """按时间排序：一个块以内直接内存排序，否则分块排序落盘后 heapq.merge 归并"""
+    chunk, spills = [], []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            spills.append(_spill(chunk, tmp_dir))
+            chunk = []
+    if not spills:
+        chunk.sort()
+        return iter(chunk)
+    if chunk:
+        spills.append(_spill(chunk, tmp_dir))
+    return heapq.merge(*(_read_spill(path) for path in spills))
+
+
+def excel_to_md_streaming(input_excel, output_md, image_folder='./asset', chunk_rows=SORT_CHUNK_ROWS):
+    """
+    excel_to_md_with_images 的流式实现，输出格式相同
+    图片只索引一次；行按块排序归并，Markdown 逐条写入缓冲文件，内存占用与总行数无关
+    返回 (记录数, 匹配图片数, 图片总数)
+    """
+    id_to_images = index_images(image_folder)
+    total_images = sum(len(images) for images in id_to_images.values())
+    matched_ids = set()
+    count = 0
+
+    with tempfile.TemporaryDirectory(prefix='excelmd_') as tmp_dir, \
+            open(output_md, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as out:
+        out.write("# 时间记录与图片\n\n")
+        for _, _, time_value, content, row_id in _sorted_records(
+                _iter_records(input_excel), tmp_dir, chunk_rows):
+            parts = [f"**{time_value}**  \n", f"{content}\n\n"]
+            images = id_to_images.get(row_id)
+            if images:
+                matched_ids.add(row_id)
+                parts.append("### 相关图片\n")
+                for seq, img in images:
+                    img_path = os.path.join(image_folder, img).replace('\\', '/')
+                    alt_text = f"图片 {seq}" if seq > 0 else "主图"
+                    parts.append(f"![{alt_text}]({img_path})\n\n")
+            else:
+                parts.append("> 无匹配图片\n\n")
+            parts.append("---\n\n")
+            out.write(''.join(parts))
+            count += 1
+
+    matched_images = sum(len(id_to_images[i]) for i in matched_ids)
+    print(f"Markdown文件已生成: {output_md}")
+    print(f"共处理 {count} 条记录，匹配 {matched_images}/{total_images} 张图片")
+    return count, matched_images, total_images
+
 # 使用示例
 if __name__ == "__main__":
-    excel_to_md_with_images(
+    excel_to_md_streaming(
         input_excel='./1002568141.xlsx',  # 输入Excel文件名
         output_md='俊哥2.md',      # 输出Markdown文件名
         image_folder='./assets/俊哥'     # 图片文件夹路径
@@ -1,9 +1,13 @@
 import sys
-from PySide6.QtCore import Qt
+from engine import startup_timing  # 最先导入，作为启动计时起点
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QFont
+startup_timing.mark("导入 Qt")
 from ui import LoginWindow
 from database import execute_query
+from services.backup_service import BackupService
+startup_timing.mark("导入登录模块")
 
 def print_database_schema(db_path):
     """打印数据库完整表结构"""
@@ -51,9 +55,17 @@ if __name__ == "__main__":
     font = QFont("Microsoft YaHei", 10)
     app.setFont(font)
     
+    startup_timing.mark("创建 QApplication")
+    
     # 创建登录窗口
     login_window = LoginWindow()
     login_window.show()
+    startup_timing.mark("显示登录窗口")
+    # 事件循环处理完首批事件时登录窗口即可交互
+    QTimer.singleShot(0, lambda: (startup_timing.mark("登录窗口可交互"), startup_timing.report()))
+
+    # 超过一天未备份则在后台补一次在线备份
+    BackupService().backup_if_stale()
     
     # 运行应用
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,15 +1,34 @@
+import os
 import sqlite3
+import threading
+from urllib.parse import quote
 
 class DatabaseManager:
+    """
+    业务库连接（单例）
+    创建单例的线程（界面线程 / 命令行主线程）使用读写主连接；
+    其他线程（engine/qt_query_runner.py 的后台查询）各自使用一条只读连接，
+    连接不跨线程共享，主连接上的写入不会与后台查询交错；WAL 模式下读写互不阻塞
+    """
     _instance = None
 
     def __new__(cls, db_path='family_subsidies.db'):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.connection = sqlite3.connect(db_path)
-            cls._instance.connection.row_factory = sqlite3.Row
-            cls._instance._create_tables()
+            cls._instance._open(db_path)
         return cls._instance
+
+    def _open(self, db_path):
+        self.db_path = db_path
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, timeout=10)
+        self.connection.row_factory = sqlite3.Row
+        if db_path != ':memory:':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
     
     def _create_tables(self):
         cursor = self.connection.cursor()
@@ -51,13 +70,54 @@ class DatabaseManager:
             )
         ''')
         
+        # 行政区域树按 镇 / 村 / 组 分组计数；旧库字段不同时跳过对应索引
+        for ddl in ('CREATE INDEX IF NOT EXISTS idx_village_town ON village(town)',
+                    'CREATE INDEX IF NOT EXISTS idx_family_village_group ON family(villageid, groupid)',
+                    'CREATE INDEX IF NOT EXISTS idx_person_family ON person(familyid)'):
+            try:
+                cursor.execute(ddl)
+            except sqlite3.OperationalError:
+                pass
+        
         self.connection.commit()
     
     def get_connection(self):
-        return self.connection
+        """当前线程可用的连接：单例所属线程为主连接，其他线程为各自的只读连接"""
+        if threading.get_ident() == self._owner:
+            return self.connection
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=10)
+            conn.row_factory = sqlite3.Row
+            self._local.connection = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def iter_pages(self, sql, params=(), page_size=1000):
+        """分页游标：按 page_size 逐页返回 dict 列表，内存占用与总行数无关"""
+        cursor = self.get_connection().cursor()
+        cursor.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+        finally:
+            cursor.close()
     
     def close(self):
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # 只读连接属于仍在运行的查询线程，随线程结束释放
+                pass
         if self.connection:
             self.connection.close()
-            self._instance = None
+            type(self)._instance = None
 
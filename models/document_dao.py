@@ -0,0 +1,199 @@
+# models/document_dao.py
+"""
+归档文档索引（tasks.db.documents）
+扫描器与目录监听只对发生变化的村庄目录做增量同步，记录 大小 / mtime / 哈希，
+“哪些村庄缺少某材料”“本周归档了哪些文件”等查询直接走索引 SQL
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+HASH_CHUNK = 4 * 1024 * 1024
+
+
+class DocumentDAO:
+    def __init__(self, db_path: str = 'tasks.db'):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        # 连接在扫描线程与界面线程间共用，所有语句（含共用连接的 CompletenessChecker）在此锁内执行
+        self.lock = threading.Lock()
+        self._initialize_database()
+
+    # ---------------- 建表 ---------------- #
+    def _initialize_database(self):
+        cursor = self.conn.cursor()
+        # 后台补哈希与界面查询并发，使用 WAL
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                filename TEXT NOT NULL,
+                village_name TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT DEFAULT '未归档',
+                check_time TEXT NOT NULL,
+                FOREIGN KEY (task_id) REFERENCES tasks (id)
+            )
+        """)
+        columns = {row["name"] for row in cursor.execute("PRAGMA table_info(documents)")}
+        for name, ddl in (("size", "INTEGER"), ("mtime_ns", "INTEGER"),
+                          ("hash", "TEXT"), ("archived_at", "TEXT")):
+            if name not in columns:
+                cursor.execute(f"ALTER TABLE documents ADD COLUMN {name} {ddl}")
+        cursor.executescript("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_path ON documents(task_id, file_path);
+            CREATE INDEX IF NOT EXISTS idx_documents_village ON documents(task_id, village_name);
+            CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents(task_id, filename);
+            CREATE INDEX IF NOT EXISTS idx_documents_archived ON documents(task_id, archived_at);
+            CREATE INDEX IF NOT EXISTS idx_documents_hash ON documents(hash);
+        """)
+        self.conn.commit()
+
+    # ---------------- 同步 ---------------- #
+    def has_documents(self, task_id: int) -> bool:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM documents WHERE task_id = ? LIMIT 1", (task_id,)).fetchone() is not None
+
+    def sync_village(self, task_id: int, village_name: str, folder_path: str,
+                     files: Iterable[str]) -> Dict[str, int]:
+        """
+        按目录当前的文件名单同步一个村庄：新增 / 变化的行 UPSERT，消失的文件删除
+        大小或 mtime 变化时清空哈希，由 fill_hashes 在后台补算
+        村庄首次索引（已有存档）时归档时间取文件 mtime，之后新出现的文件取当前时间
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            existing = {row["file_path"]: row for row in self.conn.execute(
+                "SELECT file_path, size, mtime_ns FROM documents WHERE task_id = ? AND village_name = ?",
+                (task_id, village_name))}
+        first_sync = not existing
+
+        upserts, seen = [], set()
+        for filename in files:
+            path = os.path.join(folder_path, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            old = existing.get(path)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                continue
+            archived_at = (datetime.fromtimestamp(st.st_mtime).isoformat(timespec="seconds")
+                           if first_sync else now)
+            upserts.append((task_id, filename, village_name, path, now, st.st_size, st.st_mtime_ns,
+                            archived_at))
+        removed = [(task_id, path) for path in existing if path not in seen]
+
+        with self.lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO documents (task_id, filename, village_name, file_path, status,
+                                       check_time, size, mtime_ns, hash, archived_at)
+                VALUES (?, ?, ?, ?, '已归档', ?, ?, ?, NULL, ?)
+                ON CONFLICT(task_id, file_path) DO UPDATE SET
+                    status = '已归档', check_time = excluded.check_time,
+                    size = excluded.size, mtime_ns = excluded.mtime_ns, hash = NULL
+            """, upserts)
+            self.conn.executemany("DELETE FROM documents WHERE task_id = ? AND file_path = ?", removed)
+        return {"upserted": len(upserts), "removed": len(removed)}
+
+    def remove_village(self, task_id: int, village_name: str) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM documents WHERE task_id = ? AND village_name = ?",
+                              (task_id, village_name))
+
+    def fill_hashes(self, task_id: Optional[int] = None, limit: int = 500, after_id: int = 0) -> int:
+        """
+        按 id 顺序为 after_id 之后缺哈希的行计算 sha256（应在后台线程调用）
+        读不了或计算期间被改过的文件本轮跳过，不会卡住后面的行
+        :return: 本批最后一行的 id，作为下一批的 after_id；没有待处理的行时返回 0
+        """
+        sql = "SELECT id, file_path, size, mtime_ns FROM documents WHERE hash IS NULL AND id > ?"
+        params: tuple = (after_id,)
+        if task_id is not None:
+            sql += " AND task_id = ?"
+            params += (task_id,)
+        with self.lock:
+            rows = self.conn.execute(sql + " ORDER BY id LIMIT ?", (*params, limit)).fetchall()
+
+        for row in rows:
+            try:
+                h = hashlib.sha256()
+                with open(row["file_path"], "rb") as f:
+                    for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                        h.update(chunk)
+                st = os.stat(row["file_path"])
+            except OSError:
+                continue
+            # 哈希算完后的文件状态与索引记录不一致（期间或索引之后被改过），丢弃本次结果，
+            # 留给下次扫描更新大小 / mtime 后重算
+            if (st.st_size, st.st_mtime_ns) != (row["size"], row["mtime_ns"]):
+                continue
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "UPDATE documents SET hash = ? WHERE id = ? AND size = ? AND mtime_ns = ?",
+                    (h.hexdigest(), row["id"], row["size"], row["mtime_ns"]))
+        return rows[-1]["id"] if rows else 0
+
+    # ---------------- 查询 ---------------- #
+    def village_files(self, task_id: int, village_name: str) -> Dict[str, Optional[str]]:
+        """村庄已索引文件 路径 → 哈希（尚未补算的为 None）"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT file_path, hash FROM documents WHERE task_id = ? AND village_name = ? ORDER BY filename",
+                (task_id, village_name)).fetchall()
+        return {row["file_path"]: row["hash"] for row in rows}
+
+    def villages_missing(self, task_id: int, pattern: str) -> List[str]:
+        """项目中没有任何文件名匹配 pattern（SQL LIKE，如 '%身份证%'）的村庄"""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT pv.village_name FROM project_villages pv
+                WHERE pv.task_id = ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM documents d
+                      WHERE d.task_id = pv.task_id AND d.village_name = pv.village_name
+                        AND d.filename LIKE ?
+                  )
+                ORDER BY pv.village_name
+            """, (task_id, pattern)).fetchall()
+        return [row[0] for row in rows]
+
+    def archived_since(self, task_id: int, since: str) -> List[Dict]:
+        """archived_at >= since（ISO 时间字符串）的文件"""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT village_name, filename, file_path, size, archived_at FROM documents
+                WHERE task_id = ? AND archived_at >= ?
+                ORDER BY archived_at DESC
+            """, (task_id, since)).fetchall()
+        return [dict(row) for row in rows]
+
+    def village_summary(self, task_id: int) -> Dict[str, Dict]:
+        """村庄 → {files, bytes, last_archived}"""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT village_name, COUNT(*) AS files, COALESCE(SUM(size), 0) AS bytes,
+                       MAX(archived_at) AS last_archived
+                FROM documents WHERE task_id = ? GROUP BY village_name
+            """, (task_id,)).fetchall()
+        return {row["village_name"]: dict(row) for row in rows}
+
+    def duplicates(self, task_id: int) -> List[Dict]:
+        """同一项目中内容相同（哈希相同）的文件组"""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT hash, COUNT(*) AS copies, GROUP_CONCAT(file_path, '\n') AS paths
+                FROM documents WHERE task_id = ? AND hash IS NOT NULL
+                GROUP BY hash HAVING COUNT(*) > 1
+            """, (task_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.conn.close()
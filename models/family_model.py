@@ -1,6 +1,11 @@
 class FamilyDAO:
     def __init__(self, db_manager):
-        self.db = db_manager.get_connection()
+        self.db_manager = db_manager
+
+    @property
+    def db(self):
+        # 每次按调用线程取连接，后台查询线程拿到的是它自己的只读连接
+        return self.db_manager.get_connection()
     
     def create_family(self, landarea, villageid, groupid, address=None):
         cursor = self.db.cursor()
@@ -21,6 +26,67 @@ class FamilyDAO:
         cursor.execute("SELECT * FROM family")
         return cursor.fetchall()
     
+    def count_families(self):
+        cursor = self.db.cursor()
+        cursor.execute("SELECT COUNT(*) FROM family")
+        return cursor.fetchone()[0]
+
+    def iter_families(self, page_size=1000):
+        """分页游标：逐页返回家庭记录"""
+        cursor = self.db.cursor()
+        cursor.execute("SELECT * FROM family ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+    
+    def iter_family_list(self, village_id=None, group_id=None, town=None, page_size=500):
+        """
+        分页游标：家庭列表（户主姓名 / 身份证号 / 人口数），供表格模型懒加载
+        户主与人口数在 SQL 中关联，不逐户查询
+        """
+        sql = """
+            SELECT f.id, f.name, f.address, f.landarea, f.villageid, f.groupid,
+                   h.name AS householder, h.idcard AS id_card,
+                   (SELECT COUNT(*) FROM person p WHERE p.familyid = f.id) AS members
+            FROM family f
+            LEFT JOIN person h ON h.familyid = f.id AND h.is_head = 1
+            WHERE 1=1
+        """
+        params = []
+        if village_id is not None:
+            sql += " AND f.villageid = ?"
+            params.append(village_id)
+        if group_id is not None:
+            sql += " AND f.groupid = ?"
+            params.append(group_id)
+        if town is not None:
+            sql += " AND f.villageid IN (SELECT id FROM village WHERE town = ?)"
+            params.append(town)
+        sql += " GROUP BY f.id ORDER BY f.id"
+        cursor = self.db.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+    
+    def member_ages(self, family_ids, batch_size=500):
+        """批量取多户成员年龄：{家庭id: [年龄, ...]}，按 IN 分批查询，不逐户查询"""
+        ages = {family_id: [] for family_id in family_ids}
+        ids = list(ages)
+        cursor = self.db.cursor()
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            cursor.execute(
+                f"SELECT familyid, age FROM person WHERE familyid IN ({', '.join(['?'] * len(batch))})",
+                batch)
+            for family_id, age in cursor.fetchall():
+                ages[family_id].append(age)
+        return ages
+
     def update_family(self, family_id, landarea=None, villageid=None, groupid=None, address=None, name=None):
         updates = []
         params = []
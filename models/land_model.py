@@ -1,7 +1,7 @@
 
 
 # models/land.py
-from database import execute_query
+from database import execute_query, iter_query
 
 class LandDAO:
     def __init__(self, db_path='family_subsidies.db'):
@@ -73,6 +73,25 @@ class LandDAO:
             })
         return lands
     
+    def iter_lands(self, family_id=None, year=None, page_size=1000):
+        """分页游标：逐页返回用地记录"""
+        query = "SELECT * FROM land"
+        params = []
+        
+        conditions = []
+        if family_id:
+            conditions.append("family_id = ?")
+            params.append(family_id)
+        if year is not None:
+            conditions.append("year = ?")
+            params.append(year)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY land_id"
+        
+        return iter_query(self.db_path, query, params, page_size=page_size)
+    
     def update_land(self, land_id, area=None, land_type=None, year=None):
         """更新用地信息"""
         # 获取当前用地信息
@@ -3,14 +3,22 @@ from .dbManager import DatabaseManager
 class PersonDAO:
     """
     线程安全（其实是单线程）的 Person 数据访问对象。
-    所有 SQL 都通过 DatabaseManager().get_connection() 拿到同一个连接。
+    默认通过 DatabaseManager() 单例拿到同一个连接，也可传入指定库的 DatabaseManager。
     """
+    def __init__(self, db_manager=None):
+        # 不传时使用进程内的 DatabaseManager 单例
+        self._db_manager = db_manager
+
+    @property
+    def db_manager(self):
+        return self._db_manager or DatabaseManager()
+
     # ---------- 内部工具 ----------
     def _execute(self, sql: str, params=(), *, fetch=False):
         """
         统一封装：增删改用 execute，查询用 fetchall/fetchone
         """
-        conn = DatabaseManager().get_connection()
+        conn = self.db_manager.get_connection()
         cur = conn.cursor()
         cur.execute(sql, params)
         conn.commit()
@@ -70,6 +78,16 @@ class PersonDAO:
         rows = self._execute(sql, params, fetch='all')
         return [dict(r) for r in rows]
 
+    def iter_persons(self, family_id=None, page_size=1000):
+        """分页游标：逐页返回人员记录，供流式导出使用"""
+        sql = "SELECT * FROM person"
+        params = []
+        if family_id:
+            sql += " WHERE familyid = ?"
+            params.append(family_id)
+        sql += " ORDER BY familyid, id"
+        return self.db_manager.iter_pages(sql, tuple(params), page_size=page_size)
+
     def update_person(self, person_id, **kwargs):
         # 获取当前记录
         current = self.get_person(person_id)
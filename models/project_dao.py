@@ -0,0 +1,243 @@
+# models/project_dao.py
+"""
+归档项目存储（tasks.db）
+tasks 表即项目表，新增 project_villages / project_tasks 两张子表，
+所有写操作为行级 UPDATE / UPSERT，批量操作在一个事务内提交；
+首次启动时自动从旧的 projects.json 迁移
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Optional
+
+PROJECT_PREFIX = "proj_"
+TASK_PREFIX = "task_"
+
+
+def _row_id(key: str, prefix: str) -> Optional[int]:
+    """'proj_3' → 3；格式不符返回 None"""
+    if isinstance(key, str) and key.startswith(prefix) and key[len(prefix):].isdigit():
+        return int(key[len(prefix):])
+    return None
+
+
+def project_row_id(project_id: str) -> Optional[int]:
+    """项目编号对应的 tasks.id"""
+    return _row_id(project_id, PROJECT_PREFIX)
+
+
+class ProjectDAO:
+    def __init__(self, db_path: str = 'tasks.db', legacy_json: Optional[str] = 'projects.json'):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._initialize_database()
+        if legacy_json:
+            self.migrate_from_json(legacy_json)
+
+    # ---------------- 建表 ---------------- #
+    def _initialize_database(self):
+        cursor = self.conn.cursor()
+        cursor.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                watch_path TEXT NOT NULL,
+                excel_path TEXT NOT NULL,
+                created_time TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS project_villages (
+                task_id      INTEGER NOT NULL,
+                village_name TEXT    NOT NULL,
+                folder_path  TEXT    DEFAULT '',
+                archived     BOOLEAN DEFAULT 0,
+                files        TEXT    DEFAULT '[]',
+                archive_time TEXT,
+                PRIMARY KEY (task_id, village_name),
+                FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS project_tasks (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id      INTEGER NOT NULL,
+                village_name TEXT    NOT NULL,
+                due_date     TEXT,
+                notes        TEXT    DEFAULT '',
+                completed    BOOLEAN DEFAULT 0,
+                created_time TEXT    NOT NULL,
+                FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_project_tasks_task ON project_tasks(task_id);
+
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER,
+                filename TEXT NOT NULL,
+                village_name TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT DEFAULT '未归档',
+                check_time TEXT NOT NULL,
+                FOREIGN KEY (task_id) REFERENCES tasks (id)
+            );
+
+            -- 材料完整性结果（engine/completeness.py）
+            CREATE TABLE IF NOT EXISTS village_completeness (
+                task_id      INTEGER NOT NULL,
+                village_name TEXT    NOT NULL,
+                required     TEXT    NOT NULL,
+                received     TEXT    NOT NULL,
+                missing      TEXT    NOT NULL,
+                PRIMARY KEY (task_id, village_name)
+            );
+        """)
+        # 旧库的 tasks 表没有状态 / 阶段列；阶段决定必需材料清单（config/required_materials.json）
+        columns = [row["name"] for row in cursor.execute("PRAGMA table_info(tasks)")]
+        if "status" not in columns:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN status TEXT DEFAULT '进行中'")
+        if "stage" not in columns:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN stage TEXT")
+        self.conn.commit()
+
+    # ---------------- 迁移 ---------------- #
+    def migrate_from_json(self, json_path: str) -> int:
+        """tasks 表为空且存在 projects.json 时导入，返回迁移的项目数"""
+        if not os.path.exists(json_path):
+            return 0
+        if self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                projects = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        with self.conn:
+            for key, project in projects.items():
+                cur = self.conn.execute(
+                    "INSERT INTO tasks (id, name, watch_path, excel_path, created_time, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (_row_id(key, PROJECT_PREFIX), project.get('name', ''),
+                     project.get('work_folder', ''), project.get('excel_file', ''),
+                     project.get('created_time') or datetime.now().isoformat(),
+                     project.get('status', '进行中')))
+                project_id = f"{PROJECT_PREFIX}{cur.lastrowid}"
+                self._upsert_villages(project_id, project.get('villages', {}))
+                # 旧任务编号只在项目内唯一（各项目都有 task_1），迁移时由自增主键重新编号
+                for task in project.get('tasks', {}).values():
+                    self.conn.execute(
+                        "INSERT INTO project_tasks (task_id, village_name, due_date, notes, "
+                        "completed, created_time) VALUES (?, ?, ?, ?, ?, ?)",
+                        (cur.lastrowid,
+                         task.get('village_name', ''), task.get('due_date'), task.get('notes', ''),
+                         int(bool(task.get('completed'))),
+                         task.get('created_time') or datetime.now().isoformat()))
+        return len(projects)
+
+    # ---------------- 读取 ---------------- #
+    def load_all(self) -> Dict[str, Dict]:
+        """一次读出全部项目（含村庄与任务），结构与旧 projects.json 相同"""
+        projects = {}
+        for row in self.conn.execute("SELECT * FROM tasks ORDER BY id"):
+            project_id = f"{PROJECT_PREFIX}{row['id']}"
+            projects[project_id] = {
+                'id': project_id,
+                'name': row['name'],
+                'work_folder': row['watch_path'],
+                'excel_file': row['excel_path'],
+                'created_time': row['created_time'],
+                'status': row['status'],
+                'stage': row['stage'],
+                'villages': {},
+                'tasks': {},
+            }
+        for row in self.conn.execute("SELECT * FROM project_villages ORDER BY rowid"):
+            project = projects.get(f"{PROJECT_PREFIX}{row['task_id']}")
+            if project is not None:
+                project['villages'][row['village_name']] = {
+                    'name': row['village_name'],
+                    'folder_path': row['folder_path'],
+                    'archived': bool(row['archived']),
+                    'files': json.loads(row['files'] or '[]'),
+                    'archive_time': row['archive_time'],
+                }
+        for row in self.conn.execute("SELECT * FROM project_tasks ORDER BY id"):
+            project = projects.get(f"{PROJECT_PREFIX}{row['task_id']}")
+            if project is not None:
+                task_id = f"{TASK_PREFIX}{row['id']}"
+                project['tasks'][task_id] = {
+                    'id': task_id,
+                    'village_name': row['village_name'],
+                    'due_date': row['due_date'],
+                    'notes': row['notes'],
+                    'completed': bool(row['completed']),
+                    'created_time': row['created_time'],
+                }
+        return projects
+
+    # ---------------- 项目 ---------------- #
+    def create_project(self, name: str, work_folder: str, excel_file: str,
+                       created_time: str, status: str = '进行中', stage: Optional[str] = None) -> str:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO tasks (name, watch_path, excel_path, created_time, status, stage) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (name, work_folder, excel_file, created_time, status, stage))
+        return f"{PROJECT_PREFIX}{cur.lastrowid}"
+
+    def update_project(self, project_id: str, name: str, work_folder: str,
+                       excel_file: str, status: Optional[str] = None, stage: Optional[str] = None) -> None:
+        """stage 为空串表示清除阶段（用默认材料清单），None 表示不修改"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET name = ?, watch_path = ?, excel_path = ?, "
+                "status = COALESCE(?, status), "
+                "stage = CASE WHEN ? IS NULL THEN stage ELSE NULLIF(?, '') END WHERE id = ?",
+                (name, work_folder, excel_file, status, stage, stage, _row_id(project_id, PROJECT_PREFIX)))
+
+    def delete_project(self, project_id: str) -> None:
+        row_id = _row_id(project_id, PROJECT_PREFIX)
+        with self.conn:
+            self.conn.execute("DELETE FROM project_villages WHERE task_id = ?", (row_id,))
+            self.conn.execute("DELETE FROM project_tasks WHERE task_id = ?", (row_id,))
+            self.conn.execute("DELETE FROM documents WHERE task_id = ?", (row_id,))
+            self.conn.execute("DELETE FROM village_completeness WHERE task_id = ?", (row_id,))
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (row_id,))
+
+    # ---------------- 村庄 ---------------- #
+    def _upsert_villages(self, project_id: str, villages: Dict[str, Dict]) -> None:
+        row_id = _row_id(project_id, PROJECT_PREFIX)
+        self.conn.executemany(
+            "INSERT INTO project_villages (task_id, village_name, folder_path, archived, files, archive_time) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(task_id, village_name) DO UPDATE SET "
+            "folder_path = excluded.folder_path, archived = excluded.archived, "
+            "files = excluded.files, archive_time = excluded.archive_time",
+            [(row_id, name, data.get('folder_path', ''), int(bool(data.get('archived'))),
+              json.dumps(data.get('files', []), ensure_ascii=False), data.get('archive_time'))
+             for name, data in villages.items()])
+
+    def upsert_villages(self, project_id: str, villages: Dict[str, Dict]) -> None:
+        """批量写入村庄状态，一次提交"""
+        with self.conn:
+            self._upsert_villages(project_id, villages)
+
+    def mark_village_archived(self, project_id: str, village_name: str, archive_time: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE project_villages SET archived = 1, archive_time = ? "
+                "WHERE task_id = ? AND village_name = ?",
+                (archive_time, _row_id(project_id, PROJECT_PREFIX), village_name))
+
+    # ---------------- 任务 ---------------- #
+    def add_task(self, project_id: str, village_name: str, due_date: str,
+                 notes: str, created_time: str) -> str:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO project_tasks (task_id, village_name, due_date, notes, created_time) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (_row_id(project_id, PROJECT_PREFIX), village_name, due_date, notes, created_time))
+        return f"{TASK_PREFIX}{cur.lastrowid}"
+
+    def close(self):
+        self.conn.close()
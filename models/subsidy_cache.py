@@ -0,0 +1,72 @@
+# models/subsidy_cache.py
+"""
+补贴类型 / 互斥规则的进程内读穿缓存
+每类数据一个版本号，SubsidyDAO / SubsidyRuleDAO 写库后调用 invalidate 使版本号加一并清掉缓存，
+下次读取时才重新查询；订阅者在版本变化时收到 (类别, 新版本号) 回调
+界面侧的 Qt 信号封装见 engine/qt_subsidy_signals.py
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+SUBSIDIES = "subsidies"
+RULES = "rules"
+
+Listener = Callable[[str, int], None]
+
+
+class SubsidyCache:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versions: Dict[str, int] = {SUBSIDIES: 0, RULES: 0}
+        # (类别, 键) → (版本号, 行列表)
+        self._entries: Dict[Tuple[str, Hashable], Tuple[int, List[Dict]]] = {}
+        self._listeners: List[Listener] = []
+
+    def version(self, kind: str) -> int:
+        with self._lock:
+            return self._versions[kind]
+
+    def get(self, kind: str, key: Hashable, loader: Callable[[], List[Any]]) -> List[Dict]:
+        """
+        读穿：命中且版本未变时直接返回，否则调用 loader 查询并缓存
+        返回行的副本，调用方可以随意修改
+        """
+        with self._lock:
+            version = self._versions[kind]
+            entry = self._entries.get((kind, key))
+        if entry is None or entry[0] != version:
+            rows = [dict(row) for row in loader()]
+            with self._lock:
+                # 查询期间有写入则不缓存这次结果
+                if self._versions[kind] == version:
+                    self._entries[(kind, key)] = (version, rows)
+        else:
+            rows = entry[1]
+        return [dict(row) for row in rows]
+
+    def invalidate(self, kind: str) -> int:
+        """写库后调用：版本号加一、清掉该类缓存并通知订阅者，返回新版本号"""
+        with self._lock:
+            self._versions[kind] += 1
+            version = self._versions[kind]
+            for cache_key in [k for k in self._entries if k[0] == kind]:
+                del self._entries[cache_key]
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(kind, version)
+        return version
+
+    # ---------------- 订阅 ---------------- #
+    def subscribe(self, listener: Listener) -> None:
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+# 进程内共用一份
+subsidy_cache = SubsidyCache()
@@ -11,6 +11,7 @@ import json
 import sqlite3
 # 单例数据库管理器
 from .dbManager import DatabaseManager
+from .subsidy_cache import SUBSIDIES, subsidy_cache
 
 
 class SubsidyDAO:
@@ -47,6 +48,11 @@ class SubsidyDAO:
                 FOREIGN KEY (conflicting_subsidy_id) REFERENCES subsidy_types(id)
             );
         """)
+        # 旧库的 subsidy_types 没有看板所需的状态 / 进度列
+        columns = {row["name"] for row in cursor.execute("PRAGMA table_info(subsidy_types)")}
+        for name, ddl in (("status", "TEXT DEFAULT '草稿'"), ("progress", "INTEGER DEFAULT 0")):
+            if name not in columns:
+                cursor.execute(f"ALTER TABLE subsidy_types ADD COLUMN {name} {ddl}")
         conn.commit()
 
     # ---------------- 通用执行 ---------------- #
@@ -57,13 +63,18 @@ class SubsidyDAO:
         cursor.execute(sql, params)
         if commit:
             conn.commit()
+            # 所有写操作都经过这里，统一作废缓存
+            subsidy_cache.invalidate(SUBSIDIES)
         if fetch_one:
             row = cursor.fetchone()
             return dict(row) if row else None
         if fetch_all:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
-        return cursor.lastrowid or cursor.rowcount
+        # lastrowid 是连接级的上一次插入行号，更新 / 删除必须看 rowcount
+        if sql.lstrip().upper().startswith("INSERT"):
+            return cursor.lastrowid
+        return cursor.rowcount
 
     # ---------------- CRUD ---------------- #
     def create_subsidy_type(self, data: Dict[str, Any]) -> Optional[int]:
@@ -83,8 +94,16 @@ class SubsidyDAO:
         sql += " ORDER BY year DESC, name"
         return self._execute(sql, fetch_all=True)
 
-    def search_subsidies(self, name: str = "", year: Optional[int] = None,
-                         land_type: str = "", active_only: bool = True) -> List[Dict]:
+    def iter_subsidies(self, active_only: bool = True, page_size: int = 1000):
+        """分页游标，供流式导出使用"""
+        sql = "SELECT * FROM subsidy_types"
+        if active_only:
+            sql += " WHERE is_activate = 1"
+        sql += " ORDER BY year DESC, name"
+        return self.db.iter_pages(sql, page_size=page_size)
+
+    def _search_sql(self, name: str = "", year: Optional[int] = None,
+                    land_type: str = "", active_only: bool = True):
         sql = "SELECT * FROM subsidy_types WHERE 1=1"
         params = []
         if name:
@@ -99,7 +118,19 @@ class SubsidyDAO:
         if active_only:
             sql += " AND is_activate = 1"
         sql += " ORDER BY year DESC, name"
-        return self._execute(sql, tuple(params), fetch_all=True)
+        return sql, tuple(params)
+
+    def search_subsidies(self, name: str = "", year: Optional[int] = None,
+                         land_type: str = "", active_only: bool = True) -> List[Dict]:
+        sql, params = self._search_sql(name, year, land_type, active_only)
+        return self._execute(sql, params, fetch_all=True)
+
+    def iter_search_subsidies(self, name: str = "", year: Optional[int] = None,
+                              land_type: str = "", active_only: bool = True,
+                              page_size: int = 1000):
+        """search_subsidies 的分页游标版，供表格模型按需拉取"""
+        sql, params = self._search_sql(name, year, land_type, active_only)
+        return self.db.iter_pages(sql, params, page_size=page_size)
 
     def update_subsidy(self, subsidy_id: int, update_data: Dict[str, Any]) -> bool:
         if not update_data:
@@ -114,6 +145,28 @@ class SubsidyDAO:
         sql = "DELETE FROM subsidy_types WHERE id = ?"
         return self._execute(sql, (subsidy_id,), commit=True) > 0
 
+    # ---------------- 看板 ---------------- #
+    def kanban_items(self, name: str = "", year: Optional[int] = None) -> List[Dict]:
+        """看板卡片所需字段，按 状态列内顺序（年份倒序、名称）排好"""
+        sql = ("SELECT id, name, year, COALESCE(status, '草稿') AS status, "
+               "COALESCE(progress, 0) AS progress FROM subsidy_types WHERE 1=1")
+        params = []
+        if name:
+            sql += " AND name LIKE ?"
+            params.append(f"%{name}%")
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(year)
+        sql += " ORDER BY year DESC, name, id"
+        return self._execute(sql, tuple(params), fetch_all=True)
+
+    def set_status(self, subsidy_id: int, status: str, progress: Optional[int] = None) -> bool:
+        """只改状态（和进度）一行，不动其它字段"""
+        sql = ("UPDATE subsidy_types SET status = ?, progress = COALESCE(?, progress), "
+               "updated_at = ? WHERE id = ?")
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return self._execute(sql, (status, progress, now, subsidy_id), commit=True) > 0
+
     # ---------------- 冲突规则 ---------------- #
     def create_conflict_rule(self, subsidy_id: int, conflicting_subsidy_id: int,
                              description: str = "") -> bool:
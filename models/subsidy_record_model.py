@@ -4,8 +4,8 @@ from database import get_db_connection
 
 
 class SubsidyRecordDAO:
-    def __init__(self):
-        self.conn = get_db_connection()
+    def __init__(self, db_path=None):
+        self.conn = get_db_connection(db_path)
         self.create_table()
 
     def create_table(self):
@@ -96,6 +96,42 @@ class SubsidyRecordDAO:
         columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    def iter_records(self, family_id=None, subsidy_id=None, year=None, page_size=1000):
+        """
+        分页游标：逐页返回补贴发放记录，供流式导出使用
+        :param page_size: 每页行数
+        :return: 生成器，每次产出一页（字典列表）
+        """
+        query = '''
+            SELECT r.id, r.family_id, f.name AS family_name,
+                   r.subsidy_id, s.name AS subsidy_name,
+                   r.amount, r.year, r.发放日期, r.备注
+            FROM subsidy_records r
+            LEFT JOIN family f ON r.family_id = f.id
+            LEFT JOIN subsidy_types s ON r.subsidy_id = s.id
+            WHERE 1=1
+        '''
+        params = []
+
+        if family_id:
+            query += " AND r.family_id = ?"
+            params.append(family_id)
+        if subsidy_id:
+            query += " AND r.subsidy_id = ?"
+            params.append(subsidy_id)
+        if year:
+            query += " AND r.year = ?"
+            params.append(year)
+        query += " ORDER BY r.id"
+
+        cursor = self.conn.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+
     def update_record(self, record_id, **kwargs):
         """
         更新补贴发放记录
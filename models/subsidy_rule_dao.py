@@ -1,5 +1,6 @@
 from typing import List, Dict, Optional
 from .dbManager import DatabaseManager
+from .subsidy_cache import RULES, subsidy_cache
 
 
 class SubsidyRuleDAO:
@@ -57,4 +58,5 @@ class SubsidyRuleDAO:
         cur.execute(sql, params)
         if commit:
             conn.commit()
+            subsidy_cache.invalidate(RULES)
         return cur.fetchall() if fetch_all else cur.lastrowid or cur.rowcount
\ No newline at end of file
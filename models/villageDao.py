@@ -1,6 +1,11 @@
 class VillageDAO:
     def __init__(self, db_manager):
-        self.db = db_manager.get_connection()
+        self.db_manager = db_manager
+
+    @property
+    def db(self):
+        # 每次按调用线程取连接，后台查询线程拿到的是它自己的只读连接
+        return self.db_manager.get_connection()
     
     def create_village(self, name, town):
         cursor = self.db.cursor()
@@ -34,4 +39,35 @@ class VillageDAO:
         cursor = self.db.cursor()
         cursor.execute("DELETE FROM village WHERE id = ?", (village_id,))
         self.db.commit()
-        return cursor.rowcount > 0
\ No newline at end of file
+        return cursor.rowcount > 0
+
+    # ---------------- 行政区域树 ---------------- #
+    def town_counts(self):
+        """镇 → 村数、户数"""
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT v.town, COUNT(DISTINCT v.id) AS villages, COUNT(f.id) AS households
+            FROM village v LEFT JOIN family f ON f.villageid = v.id
+            GROUP BY v.town ORDER BY v.town
+        """)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def village_counts(self, town):
+        """某镇下各村的户数"""
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT v.id, v.name, COUNT(f.id) AS households
+            FROM village v LEFT JOIN family f ON f.villageid = v.id
+            WHERE v.town = ?
+            GROUP BY v.id ORDER BY v.name
+        """, (town,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def group_counts(self, village_id):
+        """某村下各组的户数（组只存在于 family.groupid 中）"""
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT groupid, COUNT(*) AS households FROM family
+            WHERE villageid = ? GROUP BY groupid ORDER BY groupid
+        """, (village_id,))
+        return [dict(row) for row in cursor.fetchall()]
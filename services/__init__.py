@@ -1,14 +1,44 @@
-# models/__init__.py
-from .family_service import FamilyService
-from .person_service import PersonService
-from .land_service import LandService
-from .subsidy_service import SubsidyService
-from .report_service import ReportService
+# services/__init__.py
+"""
+服务层统一入口
+按名称延迟导入（PEP 562）：from services import X 时才加载 X 所在模块，
+避免启动时把 pandas / openpyxl / pyarrow 全部拉进来
+"""
+import importlib
+
+_MODULES = {
+    'FamilyService': '.family_service',
+    'PersonService': '.person_service',
+    'LandService': '.land_service',
+    'SubsidyService': '.subsidy_service',
+    'ReportService': '.report_service',
+    'ExportService': '.export_service',
+    'ImportService': '.import_service',
+    'RosterImportService': '.roster_import_service',
+    'SnapshotService': '.snapshot_service',
+}
 
 __all__ = [
     'FamilyService', 
     'PersonService', 
     'LandService', 
     'SubsidyService', 
-    'ReportService'
-]
\ No newline at end of file
+    'ReportService',
+    'ExportService',
+    'ImportService',
+    'RosterImportService',
+    'SnapshotService',
+]
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,451 @@
+# services/api_server.py
+"""
+本地只读 HTTP/JSON 查询接口（可选组件，仅依赖标准库）
+基于 asyncio 的最小 HTTP/1.1 服务，默认只监听 127.0.0.1：
+
+    GET /api/health
+    GET /api/families?name=&village_id=&group_id=&town=&limit=&offset=
+    GET /api/families/<id>
+    GET /api/families/<id>/eligibility     按补贴规则测算可享补贴（同 cli.py disburse）
+    GET /api/payouts?family_id=&subsidy_id=&year=&limit=&offset=
+
+    python -m services.api_server --db family_subsidies.db --port 8765
+
+- 查询在线程池中执行，每个线程从只读连接池（mode=ro + query_only）借用连接，不会写库；
+- 同时处理的请求数受 --max-concurrency 限制，排队超过 --queue-timeout 秒返回 503；
+- 成功响应按 (路径, 参数) 缓存 --cache-ttl 秒，相同请求并发到达时只查询一次
+"""
+import argparse
+import asyncio
+import json
+import queue
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlsplit
+
+MAX_LIMIT = 500
+DEFAULT_LIMIT = 50
+
+
+class ApiError(Exception):
+    """以指定状态码返回给客户端的错误"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------- 只读连接池 ---------------- #
+class ReadOnlyPool:
+    """固定数量的只读连接；线程借用后归还，连接数与查询线程数一致，借用不会阻塞"""
+
+    def __init__(self, db_path: str, size: int = 4):
+        if not Path(db_path).is_file():
+            raise FileNotFoundError(db_path)
+        self.size = size
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        uri = f"file:{quote(str(Path(db_path).resolve()))}?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = 1")
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        for _ in range(self.size):
+            self._idle.get().close()
+
+
+# ---------------- 响应缓存 ---------------- #
+class ResponseCache:
+    """TTL + LRU 的响应缓存，只在事件循环线程中访问，不加锁"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, bytes]]" = OrderedDict()
+        # 正在查询的键 → Future，相同请求并发到达时共用一次查询
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key: Tuple, loader: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, bool]:
+        """返回 (响应体, 是否命中)；loader 抛出的异常不缓存"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1], True
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(body)
+        if self.ttl > 0:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, False
+
+
+# ---------------- 查询 ---------------- #
+def _int_param(params: Dict[str, str], name: str, default: Optional[int] = None) -> Optional[int]:
+    value = params.get(name, "")
+    if value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"参数 {name} 必须是整数")
+
+
+def _page(params: Dict[str, str]) -> Tuple[int, int]:
+    limit = _int_param(params, "limit", DEFAULT_LIMIT)
+    offset = _int_param(params, "offset", 0)
+    if limit <= 0 or offset < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "limit 必须大于 0，offset 不能为负")
+    return min(limit, MAX_LIMIT), offset
+
+
+def search_families(conn: sqlite3.Connection, params: Dict[str, str]) -> Dict:
+    """家庭检索，字段与 FamilyDAO.iter_family_list 一致，另支持按户名 / 户主姓名模糊查询"""
+    limit, offset = _page(params)
+    sql = """
+        SELECT f.id, f.name, f.address, f.landarea, f.villageid, f.groupid,
+               h.name AS householder, h.idcard AS id_card,
+               (SELECT COUNT(*) FROM person p WHERE p.familyid = f.id) AS members
+        FROM family f
+        LEFT JOIN person h ON h.familyid = f.id AND h.is_head = 1
+        WHERE 1=1
+    """
+    args: List = []
+    for name, column in (("village_id", "f.villageid"), ("group_id", "f.groupid")):
+        value = _int_param(params, name)
+        if value is not None:
+            sql += f" AND {column} = ?"
+            args.append(value)
+    if params.get("town"):
+        sql += " AND f.villageid IN (SELECT id FROM village WHERE town = ?)"
+        args.append(params["town"])
+    if params.get("name"):
+        sql += " AND (f.name LIKE ? OR h.name LIKE ?)"
+        args.extend([f"%{params['name']}%"] * 2)
+    # 多取一行判断是否还有下一页，不做 COUNT(*)
+    sql += " GROUP BY f.id ORDER BY f.id LIMIT ? OFFSET ?"
+    rows = [dict(row) for row in conn.execute(sql, args + [limit + 1, offset])]
+    return {
+        "items": rows[:limit],
+        "next_offset": offset + limit if len(rows) > limit else None,
+    }
+
+
+def _family(conn: sqlite3.Connection, family_id: int) -> Dict:
+    row = conn.execute("SELECT * FROM family WHERE id = ?", (family_id,)).fetchone()
+    if row is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"家庭 {family_id} 不存在")
+    return dict(row)
+
+
+def get_family(conn: sqlite3.Connection, family_id: int) -> Dict:
+    family = _family(conn, family_id)
+    family["members"] = [dict(row) for row in conn.execute(
+        "SELECT id, name, gender, age, idcard, relation, is_head FROM person "
+        "WHERE familyid = ? ORDER BY is_head DESC, id", (family_id,))]
+    return family
+
+
+def family_eligibility(conn: sqlite3.Connection, family_id: int) -> Dict:
+    from engine.disbursement import plan_family
+
+    family = _family(conn, family_id)
+    ages = [row[0] for row in conn.execute("SELECT age FROM person WHERE familyid = ?", (family_id,))]
+    items = plan_family(family, ages)
+    return {
+        "family_id": family_id,
+        "family_name": family.get("name", ""),
+        "items": items,
+        "total": round(sum(item["amount"] for item in items), 2),
+    }
+
+
+def search_payouts(conn: sqlite3.Connection, params: Dict[str, str]) -> Dict:
+    """补贴发放记录，字段与 SubsidyRecordDAO.iter_records 一致；库中还没有发放记录表时返回空列表"""
+    limit, offset = _page(params)
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'subsidy_records'").fetchone()
+    if exists is None:
+        return {"items": [], "next_offset": None}
+    sql = """
+        SELECT r.id, r.family_id, f.name AS family_name,
+               r.subsidy_id, s.name AS subsidy_name,
+               r.amount, r.year, r.发放日期, r.备注
+        FROM subsidy_records r
+        LEFT JOIN family f ON r.family_id = f.id
+        LEFT JOIN subsidy_types s ON r.subsidy_id = s.id
+        WHERE 1=1
+    """
+    args: List = []
+    for name in ("family_id", "subsidy_id", "year"):
+        value = _int_param(params, name)
+        if value is not None:
+            sql += f" AND r.{name} = ?"
+            args.append(value)
+    sql += " ORDER BY r.id LIMIT ? OFFSET ?"
+    rows = [dict(row) for row in conn.execute(sql, args + [limit + 1, offset])]
+    return {
+        "items": rows[:limit],
+        "next_offset": offset + limit if len(rows) > limit else None,
+    }
+
+
+# ---------------- 服务 ---------------- #
+class ApiServer:
+    """
+    server = ApiServer("family_subsidies.db", port=0)
+    await server.start()      # server.port 为实际监听端口
+    ...
+    await server.close()
+    """
+
+    def __init__(self, db_path: str = 'family_subsidies.db', host: str = "127.0.0.1", port: int = 8765,
+                 pool_size: int = 4, max_concurrency: int = 16, queue_timeout: float = 5.0,
+                 cache_ttl: float = 30.0, config_dir: str = "config", idle_timeout: float = 15.0):
+        """
+        :param pool_size: 只读连接数（同时也是查询线程数）
+        :param max_concurrency: 同时处理的请求数上限
+        :param queue_timeout: 请求排队等待的最长秒数，超时返回 503
+        :param cache_ttl: 响应缓存秒数，0 为不缓存
+        :param idle_timeout: 长连接空闲多久后断开
+        """
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.queue_timeout = queue_timeout
+        self.config_dir = config_dir
+        self.idle_timeout = idle_timeout
+        self.cache = ResponseCache(cache_ttl)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pool: Optional[ReadOnlyPool] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        from engine.rule_loader import RuleLoader
+
+        RuleLoader.load(Path(self.config_dir))
+        self._pool = ReadOnlyPool(self.db_path, self.pool_size)
+        self._executor = ThreadPoolExecutor(self.pool_size, thread_name_prefix="api-query")
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """start() 之后调用，直到任务被取消"""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
+
+    # -------------------------------------------------
+    # 路由
+    # -------------------------------------------------
+    def _route(self, path: str, params: Dict[str, str]) -> Callable[[sqlite3.Connection], Dict]:
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] != ["api"]:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未知路径 {path}")
+        parts = parts[1:]
+        if parts == ["families"]:
+            return lambda conn: search_families(conn, params)
+        if parts == ["payouts"]:
+            return lambda conn: search_payouts(conn, params)
+        if len(parts) in (2, 3) and parts[0] == "families" and parts[1].isdigit():
+            family_id = int(parts[1])
+            if len(parts) == 2:
+                return lambda conn: get_family(conn, family_id)
+            if parts[2] == "eligibility":
+                return lambda conn: family_eligibility(conn, family_id)
+        raise ApiError(HTTPStatus.NOT_FOUND, f"未知路径 {path}")
+
+    def _query(self, fn: Callable[[sqlite3.Connection], Dict]) -> bytes:
+        """在查询线程中执行：借连接、查询、序列化"""
+        with self._pool.connection() as conn:
+            result = fn(conn)
+        return json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+
+    async def _dispatch(self, method: str, target: str) -> Tuple[int, bytes, Dict[str, str]]:
+        if method not in ("GET", "HEAD"):
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "只支持 GET")
+        url = urlsplit(target)
+        if url.path.rstrip("/") == "/api/health":
+            body = json.dumps({"status": "ok", "pool_size": self.pool_size,
+                               "cached": len(self.cache)}).encode("utf-8")
+            return HTTPStatus.OK, body, {}
+
+        params = dict(parse_qsl(url.query))
+        fn = self._route(url.path, params)
+        key = (url.path.rstrip("/"), tuple(sorted(params.items())))
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "服务繁忙，请稍后重试")
+        try:
+            body, hit = await self.cache.get(key, lambda: loop.run_in_executor(self._executor, self._query, fn))
+        finally:
+            self._slots.release()
+        return HTTPStatus.OK, body, {"X-Cache": "HIT" if hit else "MISS"}
+
+    # -------------------------------------------------
+    # HTTP
+    # -------------------------------------------------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                    if not request_line:
+                        break
+                    headers = await self._read_headers(reader)
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+                    break
+                keep_alive = await self._handle_request(request_line, headers, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _handle_request(self, request_line: bytes, headers: Dict[str, str],
+                              writer: asyncio.StreamWriter) -> bool:
+        """处理一个请求并写出响应，返回是否保持连接"""
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            self._write(writer, HTTPStatus.BAD_REQUEST, _error_body("请求行格式错误"), {}, False, False)
+            return False
+        keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+        # 只接受 GET，带请求体的连接无法复用
+        if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+            keep_alive = False
+        try:
+            status, body, extra = await self._dispatch(method, target)
+        except ApiError as e:
+            status, body, extra = e.status, _error_body(str(e)), {}
+            if e.status == HTTPStatus.SERVICE_UNAVAILABLE:
+                extra["Retry-After"] = "1"
+        except Exception as e:
+            status, body, extra = HTTPStatus.INTERNAL_SERVER_ERROR, _error_body(f"查询失败: {e}"), {}
+        self._write(writer, status, body, extra, keep_alive, method == "HEAD")
+        return keep_alive
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, body: bytes, extra: Dict[str, str],
+               keep_alive: bool, head_only: bool) -> None:
+        status = HTTPStatus(status)
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+# ---------------- 入口 ---------------- #
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """服务参数；cli.py serve 子命令共用（--db 由调用方提供）"""
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认仅本机）")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pool-size", type=int, default=4, help="只读连接数 / 查询线程数")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="同时处理的请求数上限")
+    parser.add_argument("--queue-timeout", type=float, default=5.0, help="排队超时秒数，超时返回 503")
+    parser.add_argument("--cache-ttl", type=float, default=30.0, help="响应缓存秒数，0 为不缓存")
+    parser.add_argument("--config", default="config", help="规则配置目录")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="本地只读查询接口")
+    parser.add_argument("--db", default="family_subsidies.db", help="业务数据库文件")
+    add_arguments(parser)
+    return parser
+
+
+def run(args) -> int:
+    async def serve():
+        server = ApiServer(args.db, args.host, args.port, pool_size=max(1, args.pool_size),
+                           max_concurrency=max(1, args.max_concurrency), queue_timeout=args.queue_timeout,
+                           cache_ttl=args.cache_ttl, config_dir=args.config)
+        await server.start()
+        print(f"查询接口已启动: http://{server.host}:{server.port}/api/health")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+# services/backup_service.py
+"""
+在线增量备份
+基于 sqlite3 在线备份 API 分步拷贝页面，每步之间让出时间片，
+备份在后台线程用独立连接完成，界面不会卡顿；
+每份备份先写 .part，通过 PRAGMA integrity_check 后才转正，并按代数轮换
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+BACKUP_SUFFIX = ".db"
+PART_SUFFIX = ".part"
+
+
+class BackupService:
+    """数据库备份 / 校验 / 还原"""
+
+    def __init__(self, db_path: str = 'family_subsidies.db', backup_dir: str = 'backups',
+                 keep: int = 7, pages: int = 64, step_pause: float = 0.005):
+        """
+        :param keep: 保留的备份代数
+        :param pages: 每步拷贝的页数
+        :param step_pause: 每步之间的停顿（秒），让出写锁给前台连接
+        """
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages = pages
+        self.step_pause = step_pause
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # 备份
+    # -------------------------------------------------
+    def backup(self, on_progress: Optional[Callable[[int, int], None]] = None,
+               rotate: bool = True) -> str:
+        """
+        同步执行一次备份，返回转正后的备份文件路径
+        :param on_progress: 回调 (已拷贝页数, 总页数)
+        :param rotate: 备份后是否按代数轮换（还原前的保险备份不轮换，以免删掉待还原的那一代）
+        """
+        with self._lock:
+            os.makedirs(self.backup_dir, exist_ok=True)
+            stem = os.path.splitext(os.path.basename(self.db_path))[0]
+            stamp = f"{stem}_{datetime.now():%Y%m%d_%H%M%S}"
+            final_path = os.path.join(self.backup_dir, stamp + BACKUP_SUFFIX)
+            seq = 1
+            while os.path.exists(final_path):
+                final_path = os.path.join(self.backup_dir, f"{stamp}_{seq}{BACKUP_SUFFIX}")
+                seq += 1
+            part_path = final_path + PART_SUFFIX
+
+            def progress(status, remaining, total):
+                if on_progress:
+                    on_progress(total - remaining, total)
+                time.sleep(self.step_pause)
+
+            src = sqlite3.connect(self.db_path)
+            dst = sqlite3.connect(part_path)
+            try:
+                src.backup(dst, pages=self.pages, progress=progress)
+            finally:
+                dst.close()
+                src.close()
+
+            if not self.verify(part_path):
+                os.remove(part_path)
+                raise RuntimeError(f"备份校验失败: {part_path}")
+            os.replace(part_path, final_path)
+            if rotate:
+                self.rotate()
+            return final_path
+
+    def backup_async(self, on_done: Optional[Callable[[Optional[str], Optional[Exception]], None]] = None,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> threading.Thread:
+        """后台线程执行备份，完成后回调 on_done(路径, 异常)"""
+        def run():
+            try:
+                path = self.backup(on_progress)
+            except Exception as e:
+                if on_done:
+                    on_done(None, e)
+                else:
+                    print(f"数据库备份失败: {e}")
+                return
+            if on_done:
+                on_done(path, None)
+
+        thread = threading.Thread(target=run, name="db-backup", daemon=True)
+        thread.start()
+        return thread
+
+    def backup_if_stale(self, max_age_hours: float = 24) -> Optional[threading.Thread]:
+        """最新备份早于 max_age_hours 时在后台补一次备份"""
+        backups = self.list_backups()
+        if backups and time.time() - backups[0]["mtime"] < max_age_hours * 3600:
+            return None
+        return self.backup_async()
+
+    # -------------------------------------------------
+    # 校验 / 轮换
+    # -------------------------------------------------
+    @staticmethod
+    def verify(path: str) -> bool:
+        """PRAGMA integrity_check，结果为 ok 才算通过"""
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return False
+        try:
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+        except sqlite3.DatabaseError:
+            return False
+        finally:
+            conn.close()
+        return len(rows) == 1 and rows[0][0] == "ok"
+
+    def list_backups(self) -> List[Dict]:
+        """已转正的备份，按时间倒序"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        result = []
+        for entry in os.scandir(self.backup_dir):
+            if entry.is_file() and entry.name.endswith(BACKUP_SUFFIX):
+                stat = entry.stat()
+                result.append({"path": entry.path, "name": entry.name,
+                               "size": stat.st_size, "mtime": stat.st_mtime})
+        result.sort(key=lambda b: (b["mtime"], b["name"]), reverse=True)
+        return result
+
+    def rotate(self, protect: Iterable[str] = ()) -> None:
+        """
+        只保留最近 keep 代，并清理中断遗留的 .part 文件
+        protect 中的备份既不计入代数也不删除（如刚用于还原的那一份）
+        """
+        protected = {os.path.normcase(os.path.abspath(p)) for p in protect}
+        backups = [b for b in self.list_backups()
+                   if os.path.normcase(os.path.abspath(b["path"])) not in protected]
+        for old in backups[self.keep:]:
+            os.remove(old["path"])
+        for entry in os.scandir(self.backup_dir):
+            if entry.name.endswith(PART_SUFFIX) and time.time() - entry.stat().st_mtime > 3600:
+                os.remove(entry.path)
+
+    # -------------------------------------------------
+    # 还原
+    # -------------------------------------------------
+    def restore(self, backup_path: Optional[str] = None) -> str:
+        """
+        用备份覆盖当前数据库（默认最新一份）
+        通过备份 API 反向拷贝，已打开的连接无需重连即可看到还原后的数据；
+        还原前会先对当前库做一次备份，还原成功后才轮换，轮换时保留还原所用的那一份
+        """
+        if backup_path is None:
+            backups = self.list_backups()
+            if not backups:
+                raise FileNotFoundError("没有可用的备份")
+            backup_path = backups[0]["path"]
+        if not self.verify(backup_path):
+            raise RuntimeError(f"备份文件已损坏: {backup_path}")
+
+        if os.path.exists(self.db_path):
+            self.backup(rotate=False)
+
+        with self._lock:
+            src = sqlite3.connect(f"file:{backup_path}?mode=ro", uri=True)
+            dst = sqlite3.connect(self.db_path)
+            try:
+                src.backup(dst, pages=self.pages)
+            finally:
+                dst.close()
+                src.close()
+            self.rotate(protect=(backup_path,))
+        return backup_path
+
+
+# ---------------- 命令行 ---------------- #
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="数据库备份 / 还原")
+    parser.add_argument("--db", default="family_subsidies.db", help="数据库文件")
+    parser.add_argument("--dir", default="backups", help="备份目录")
+    parser.add_argument("--keep", type=int, default=7, help="保留代数")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backup", help="立即备份")
+    sub.add_parser("list", help="列出备份")
+    p_verify = sub.add_parser("verify", help="校验备份")
+    p_verify.add_argument("path")
+    p_restore = sub.add_parser("restore", help="还原（默认最新一份）")
+    p_restore.add_argument("path", nargs="?")
+    args = parser.parse_args(argv)
+
+    service = BackupService(args.db, args.dir, keep=args.keep)
+    if args.command == "backup":
+        print(f"备份完成: {service.backup()}")
+    elif args.command == "list":
+        for b in service.list_backups():
+            print(f"{b['name']}  {b['size'] / 1024:.1f} KB  "
+                  f"{datetime.fromtimestamp(b['mtime']):%Y-%m-%d %H:%M:%S}")
+    elif args.command == "verify":
+        ok = service.verify(args.path)
+        print("校验通过" if ok else "校验失败")
+        return 0 if ok else 1
+    elif args.command == "restore":
+        print(f"已从 {service.restore(args.path)} 还原")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+# services/export_service.py
+"""
+流式 Excel 导出
+所有导出走 openpyxl write-only 工作簿 + DAO 分页游标，
+行数据边读边写，内存占用与总行数无关
+"""
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from models import SubsidyDAO, FamilyDAO, PersonDAO, LandDAO, SubsidyRecordDAO
+from models.dbManager import DatabaseManager
+
+# (表头, 取值函数)
+Column = Tuple[str, Callable[[Dict], object]]
+
+
+def _yes_no(key: str) -> Callable[[Dict], str]:
+    return lambda r: "是" if r.get(key) else "否"
+
+
+def _field(key: str, default="") -> Callable[[Dict], object]:
+    return lambda r: r.get(key, default)
+
+
+SUBSIDY_COLUMNS: List[Column] = [
+    ("ID", _field("id")),
+    ("名称", _field("name")),
+    ("金额", _field("amount")),
+    ("年份", _field("year")),
+    ("土地类型", _field("land_type")),
+    ("互斥", _yes_no("is_mutual_exclusive")),
+    ("激活", _yes_no("is_activate")),
+    ("描述", _field("description")),
+]
+
+FAMILY_COLUMNS: List[Column] = [
+    ("ID", _field("id")),
+    ("户名", _field("name")),
+    ("土地面积", _field("landarea")),
+    ("村庄ID", _field("villageid")),
+    ("组", _field("groupid")),
+    ("地址", _field("address")),
+]
+
+PERSON_COLUMNS: List[Column] = [
+    ("ID", _field("id")),
+    ("家庭ID", _field("familyid")),
+    ("姓名", _field("name")),
+    ("性别", _field("gender")),
+    ("年龄", _field("age")),
+    ("身份证号", _field("idcard")),
+    ("与户主关系", _field("relation")),
+    ("户主", _yes_no("is_head")),
+]
+
+LAND_COLUMNS: List[Column] = [
+    ("地块ID", _field("land_id")),
+    ("家庭ID", _field("family_id")),
+    ("面积(亩)", _field("area")),
+    ("土地类型", _field("land_type")),
+    ("年份", _field("year")),
+]
+
+RECORD_COLUMNS: List[Column] = [
+    ("ID", _field("id")),
+    ("家庭ID", _field("family_id")),
+    ("家庭", _field("family_name")),
+    ("补贴ID", _field("subsidy_id")),
+    ("补贴类型", _field("subsidy_name")),
+    ("金额", _field("amount")),
+    ("年份", _field("year")),
+    ("发放日期", _field("发放日期")),
+    ("备注", _field("备注")),
+]
+
+
+class ExportService:
+    """
+    流式导出服务：补贴类型 / 家庭 / 人员 / 用地 / 发放记录
+    write-only 工作簿要求列宽在第一行写入前确定，
+    因此列宽取表头 + 首页数据计算，之后的页只写不回看
+    """
+    MAX_COLUMN_WIDTH = 60
+
+    def __init__(self, db_path: str = 'family_subsidies.db', page_size: int = 1000):
+        self.db_path = db_path
+        self.page_size = page_size
+
+    # -------------------------------------------------
+    # 各类数据导出
+    # -------------------------------------------------
+    def export_subsidies(self, file_path: str, active_only: bool = True) -> int:
+        pages = SubsidyDAO(self.db_path).iter_subsidies(active_only, page_size=self.page_size)
+        return self.write_excel(file_path, "补贴类型", SUBSIDY_COLUMNS, pages)
+
+    def export_families(self, file_path: str) -> int:
+        pages = FamilyDAO(DatabaseManager(self.db_path)).iter_families(page_size=self.page_size)
+        return self.write_excel(file_path, "家庭", FAMILY_COLUMNS, pages)
+
+    def export_persons(self, file_path: str, family_id: Optional[int] = None) -> int:
+        pages = PersonDAO(DatabaseManager(self.db_path)).iter_persons(family_id, page_size=self.page_size)
+        return self.write_excel(file_path, "人员", PERSON_COLUMNS, pages)
+
+    def export_lands(self, file_path: str, family_id=None, year: Optional[int] = None) -> int:
+        pages = LandDAO(self.db_path).iter_lands(family_id, year, page_size=self.page_size)
+        return self.write_excel(file_path, "用地", LAND_COLUMNS, pages)
+
+    def export_records(self, file_path: str, family_id=None, subsidy_id=None,
+                       year: Optional[int] = None) -> int:
+        pages = SubsidyRecordDAO(self.db_path).iter_records(family_id, subsidy_id, year,
+                                                            page_size=self.page_size)
+        return self.write_excel(file_path, "发放记录", RECORD_COLUMNS, pages)
+
+    # -------------------------------------------------
+    # 写出引擎
+    # -------------------------------------------------
+    def write_excel(self, file_path: str, title: str, columns: List[Column],
+                    pages: Iterable[List[Dict]]) -> int:
+        """单遍写出：返回数据行数，无数据时抛 ValueError"""
+        pages = iter(pages)
+        first_page = next(pages, [])
+        if not first_page:
+            raise ValueError("无数据可导出")
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title)
+
+        headers = [header for header, _ in columns]
+        widths = [len(header) for header in headers]
+        first_rows = [self._to_row(r, columns) for r in first_page]
+        for row in first_rows:
+            self._track_widths(widths, row)
+        for idx, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, self.MAX_COLUMN_WIDTH)
+
+        bold = Font(bold=True)
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = bold
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        count = 0
+        for row in chain(first_rows, self._rows(pages, columns)):
+            ws.append(row)
+            count += 1
+
+        wb.save(file_path)
+        return count
+
+    @staticmethod
+    def _to_row(record: Dict, columns: List[Column]) -> list:
+        return [getter(record) for _, getter in columns]
+
+    def _rows(self, pages: Iterator[List[Dict]], columns: List[Column]):
+        for page in pages:
+            for record in page:
+                yield self._to_row(record, columns)
+
+    @staticmethod
+    def _track_widths(widths: List[int], row: list) -> None:
+        for idx, value in enumerate(row):
+            length = len(str(value)) if value is not None else 0
+            if length > widths[idx]:
+                widths[idx] = length
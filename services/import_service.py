@@ -0,0 +1,313 @@
+# services/import_service.py
+"""
+批量导入管线
+分块解析 CSV → 按列向量化校验 → 不合格行写入拒绝报告 →
+合格行 executemany，全部分块在同一个事务中提交
+"""
+import csv
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from models.dbManager import DatabaseManager
+from models.subsidy_cache import SUBSIDIES, subsidy_cache
+from models.subsidy_model import SubsidyDAO
+
+TRUE_VALUES = {"是", "true", "1", "yes", "y"}
+FALSE_VALUES = {"否", "false", "0", "no", "n"}
+LAND_TYPES = ('承包种植地', '自留地', '林地')
+
+# SQLite 单条语句的参数上限较保守的取值
+_IN_BATCH = 900
+
+
+def _key_str(value) -> str:
+    """比较键值用的字符串形式：3、3.0、"3" 视为同一个键"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _field(column: str, aliases: List[str], kind: str = "text", required: bool = False,
+           default=None, **rules) -> Dict:
+    """字段规格：column 为库表列名，aliases 为可识别的表头"""
+    return {"column": column, "aliases": aliases, "kind": kind,
+            "required": required, "default": default, **rules}
+
+
+SUBSIDY_SPEC = {
+    "name": "补贴类型",
+    "table": "subsidy_types",
+    "fields": [
+        _field("name", ["name", "名称"], required=True),
+        _field("amount", ["amount", "金额"], "float", required=True, min=0),
+        _field("year", ["year", "年份"], "int", required=True, min=1900, max=2100),
+        _field("land_type", ["land_type", "土地类型"]),
+        _field("description", ["description", "描述"]),
+        _field("is_mutual_exclusive", ["is_mutual_exclusive", "互斥"], "bool", default=False),
+        _field("is_activate", ["is_activate", "激活"], "bool", default=True),
+    ],
+}
+
+FAMILY_SPEC = {
+    "name": "家庭",
+    "table": "family",
+    "fields": [
+        _field("landarea", ["landarea", "土地面积"], "float", required=True, min=0),
+        _field("villageid", ["villageid", "村庄ID"], "int", required=True,
+               exists=("village", "id")),
+        _field("groupid", ["groupid", "组"], "int", required=True, min=1),
+        _field("address", ["address", "地址"]),
+        _field("name", ["name", "户名"], default="家庭户名"),
+    ],
+}
+
+PERSON_SPEC = {
+    "name": "人员",
+    "table": "person",
+    "fields": [
+        _field("familyid", ["familyid", "家庭ID"], "int", required=True,
+               exists=("family", "id")),
+        _field("name", ["name", "姓名"], required=True),
+        _field("gender", ["gender", "性别"], "enum", choices=("男", "女")),
+        _field("age", ["age", "年龄"], "int", min=0, max=150),
+        _field("idcard", ["idcard", "身份证号"], pattern=r"^\d{17}[\dXx]$",
+               unique=("person", "idcard")),
+        _field("relation", ["relation", "与户主关系"], required=True),
+        _field("is_head", ["is_head", "户主"], "bool", default=False),
+    ],
+    # 每户至多一名户主：(分组列, 标记列)
+    "single": ("familyid", "is_head"),
+}
+
+LAND_SPEC = {
+    "name": "用地",
+    "table": "land",
+    "fields": [
+        _field("family_id", ["family_id", "家庭ID"], required=True,
+               exists=("family", "id")),
+        _field("area", ["area", "面积", "面积(亩)"], "float", required=True, min=0),
+        _field("land_type", ["land_type", "土地类型"], "enum", required=True, choices=LAND_TYPES),
+        _field("year", ["year", "年份"], "int", required=True, min=1900, max=2100),
+    ],
+}
+
+
+class ImportService:
+    """批量导入服务：补贴类型 / 家庭花名册 / 人员 / 用地"""
+
+    def __init__(self, db_path: str = 'family_subsidies.db', chunk_size: int = 5000):
+        self.db = DatabaseManager(db_path)
+        SubsidyDAO(db_path)  # 确保 subsidy_types 已建表
+        self.chunk_size = chunk_size
+
+    # -------------------------------------------------
+    # 各类数据导入
+    # -------------------------------------------------
+    def import_subsidies(self, file_path: str, reject_path: Optional[str] = None) -> Dict:
+        return self.import_csv(file_path, SUBSIDY_SPEC, reject_path)
+
+    def import_families(self, file_path: str, reject_path: Optional[str] = None) -> Dict:
+        return self.import_csv(file_path, FAMILY_SPEC, reject_path)
+
+    def import_persons(self, file_path: str, reject_path: Optional[str] = None) -> Dict:
+        return self.import_csv(file_path, PERSON_SPEC, reject_path)
+
+    def import_lands(self, file_path: str, reject_path: Optional[str] = None) -> Dict:
+        return self.import_csv(file_path, LAND_SPEC, reject_path)
+
+    # -------------------------------------------------
+    # 管线
+    # -------------------------------------------------
+    def import_csv(self, file_path: str, spec: Dict, reject_path: Optional[str] = None) -> Dict:
+        """
+        导入一个 CSV 文件
+        :return: {"imported": 成功行数, "rejected": 拒绝行数, "reject_file": 拒绝报告路径或 None}
+        """
+        if reject_path is None:
+            root, _ = os.path.splitext(file_path)
+            reject_path = f"{root}_rejects.csv"
+
+        columns = [f["column"] for f in spec["fields"]]
+        sql = (f"INSERT INTO {spec['table']} ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['?'] * len(columns))})")
+
+        reader = pd.read_csv(file_path, chunksize=self.chunk_size, dtype=str,
+                             keep_default_na=False, encoding='utf-8-sig')
+        conn = self.db.get_connection()
+        seen_unique = {f["column"]: set() for f in spec["fields"] if f.get("unique")}
+        if spec.get("single"):
+            seen_unique[spec["single"][1]] = set()
+        imported = rejected = 0
+        reject_file = reject_writer = None
+
+        try:
+            with conn:
+                for chunk in reader:
+                    values, errors = self.validate_chunk(chunk, spec, seen_unique)
+                    valid = errors == ""
+
+                    rows = self._to_rows(values[valid], spec)
+                    if rows:
+                        conn.executemany(sql, rows)
+                        imported += len(rows)
+
+                    bad = chunk[~valid]
+                    if len(bad):
+                        if reject_writer is None:
+                            reject_file = open(reject_path, 'w', newline='', encoding='utf-8-sig')
+                            reject_writer = csv.writer(reject_file)
+                            reject_writer.writerow(["行号", *chunk.columns, "错误原因"])
+                        line_no = bad.index + 2  # 表头占第 1 行
+                        for no, row, reason in zip(line_no, bad.itertuples(index=False, name=None),
+                                                   errors[~valid]):
+                            reject_writer.writerow([no, *row, reason.rstrip("；")])
+                        rejected += len(bad)
+        finally:
+            if reject_file:
+                reject_file.close()
+        # 直接 executemany 写入，不经过 SubsidyDAO
+        if imported and spec["table"] == "subsidy_types":
+            subsidy_cache.invalidate(SUBSIDIES)
+
+        return {
+            "imported": imported,
+            "rejected": rejected,
+            "reject_file": reject_path if rejected else None,
+        }
+
+    def validate_chunk(self, chunk: pd.DataFrame, spec: Dict, seen_unique: Dict[str, set]):
+        """
+        按列向量化校验一个分块
+        :return: (转换后的值 DataFrame, 每行错误信息 Series，空字符串表示通过)
+        """
+        errors = pd.Series("", index=chunk.index, dtype=object)
+        values = pd.DataFrame(index=chunk.index)
+
+        def flag(mask, message):
+            nonlocal errors
+            errors = errors.mask(mask, errors + message + "；")
+
+        for f in spec["fields"]:
+            header = next((a for a in f["aliases"] if a in chunk.columns), None)
+            if header is None:
+                if f["required"]:
+                    raise ValueError(f"{spec['name']}导入缺少必需列: {f['aliases'][-1]}")
+                values[f["column"]] = f["default"]
+                continue
+
+            label = f["aliases"][-1]
+            raw = chunk[header].str.strip()
+            missing = raw == ""
+            if f["required"]:
+                flag(missing, f"{label}不能为空")
+
+            kind = f["kind"]
+            if kind in ("float", "int"):
+                num = pd.to_numeric(raw, errors="coerce")
+                flag(num.isna() & ~missing, f"{label}不是有效数字")
+                if kind == "int":
+                    flag(num.notna() & (num % 1 != 0), f"{label}必须为整数")
+                if "min" in f:
+                    flag(num < f["min"], f"{label}不能小于{f['min']}")
+                if "max" in f:
+                    flag(num > f["max"], f"{label}不能大于{f['max']}")
+                values[f["column"]] = num
+            elif kind == "bool":
+                lowered = raw.str.lower()
+                known = lowered.isin(TRUE_VALUES | FALSE_VALUES)
+                flag(~known & ~missing, f"{label}只能填写是/否")
+                values[f["column"]] = lowered.isin(TRUE_VALUES).mask(missing, bool(f["default"]))
+            else:
+                if kind == "enum":
+                    flag(~raw.isin(f["choices"]) & ~missing,
+                         f"{label}只能为{'/'.join(f['choices'])}")
+                if "pattern" in f:
+                    flag(~raw.str.match(f["pattern"]) & ~missing, f"{label}格式错误")
+                values[f["column"]] = raw.mask(missing, f["default"])
+
+            if "exists" in f:
+                self._check_exists(values[f["column"]], missing, f, flag)
+            if "unique" in f:
+                self._check_unique(raw, missing, f, seen_unique[f["column"]], flag)
+
+        if spec.get("single"):
+            self._check_single(values, errors == "", spec, seen_unique[spec["single"][1]], flag)
+
+        return values, errors
+
+    # -------------------------------------------------
+    # 内部工具
+    # -------------------------------------------------
+    def _check_exists(self, col: pd.Series, missing: pd.Series, f: Dict, flag) -> None:
+        table, key = f["exists"]
+        keys = col[~missing & col.notna()].unique().tolist()
+        # 文件中的值与库中的键类型可能不同（如 TEXT 的 land.family_id 对 INTEGER 的 family.id），
+        # 两侧统一成字符串再比较
+        found = {_key_str(v) for v in self._lookup(table, key, keys)}
+        flag(~missing & col.notna() & ~col.map(_key_str).isin(found),
+             f"{f['aliases'][-1]}在{table}中不存在")
+
+    def _check_unique(self, raw: pd.Series, missing: pd.Series, f: Dict,
+                      seen: set, flag) -> None:
+        table, key = f["unique"]
+        present = raw[~missing]
+        label = f["aliases"][-1]
+        flag(~missing & raw.duplicated(keep="first"), f"{label}在文件中重复")
+        flag(~missing & raw.isin(seen), f"{label}在文件中重复")
+        flag(~missing & raw.isin(self._lookup(table, key, present.unique().tolist())),
+             f"{label}已存在")
+        seen.update(present.tolist())
+
+    def _check_single(self, values: pd.DataFrame, ok: pd.Series, spec: Dict,
+                      seen: set, flag) -> None:
+        """
+        同一分组内标记列至多一行为真（如每户一名户主）
+        只统计其余校验已通过的行；与文件中前面的行、库中已有的行合并判断
+        """
+        group, marker = spec["single"]
+        marked = ok & values[marker].astype(bool)
+        keys = values.loc[marked, group].map(_key_str)
+        if keys.empty:
+            return
+        existing = {_key_str(v) for v in self._lookup(
+            spec["table"], group, values.loc[marked, group].unique().tolist(),
+            where=f"{marker} = 1")}
+        dup = keys.duplicated(keep="first") | keys.isin(seen) | keys.isin(existing)
+        labels = {f["column"]: f["aliases"][-1] for f in spec["fields"]}
+        flag(dup.reindex(values.index, fill_value=False),
+             f"同一{labels[group]}只能有一个{labels[marker]}")
+        seen.update(keys[~dup].tolist())
+
+    def _lookup(self, table: str, key: str, keys: list, where: str = "") -> set:
+        """分批 IN 查询，返回库中已存在的键；where 为附加过滤条件"""
+        conn = self.db.get_connection()
+        found = set()
+        for i in range(0, len(keys), _IN_BATCH):
+            batch = [k.item() if hasattr(k, "item") else k for k in keys[i:i + _IN_BATCH]]
+            placeholders = ', '.join(['?'] * len(batch))
+            cond = f" AND {where}" if where else ""
+            cur = conn.execute(
+                f"SELECT {key} FROM {table} WHERE {key} IN ({placeholders}){cond}", batch)
+            found.update(row[0] for row in cur.fetchall())
+        return found
+
+    @staticmethod
+    def _to_rows(values: pd.DataFrame, spec: Dict) -> list:
+        """DataFrame → 参数元组列表（转换为 sqlite 可绑定的 Python 原生类型）"""
+        if values.empty:
+            return []
+        cols = []
+        for f in spec["fields"]:
+            series = values[f["column"]]
+            if f["kind"] == "int":
+                cols.append([None if pd.isna(v) else int(v) for v in series.tolist()])
+            elif f["kind"] == "float":
+                cols.append([None if pd.isna(v) else float(v) for v in series.tolist()])
+            elif f["kind"] == "bool":
+                cols.append([int(v) for v in series.tolist()])
+            else:
+                cols.append([None if v is None or (isinstance(v, float) and pd.isna(v)) else v
+                             for v in series.tolist()])
+        return list(zip(*cols))
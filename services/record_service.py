@@ -25,7 +25,7 @@ class RecordService:
         cursor = self.conn.execute('SELECT id, 名称 FROM subsidies')
         return [dict(zip([desc[0] for desc in cursor.description], row)) for row in cursor.fetchall()]
 
-    def search_records(self, family_id=None, subsidy_id=None):
+    def _search_query(self, family_id=None, subsidy_id=None):
         query = '''
             SELECT r.id, f.户主姓名 AS 家庭, s.名称 AS 补贴类型, r.金额, r.发放日期
             FROM records r
@@ -42,10 +42,26 @@ class RecordService:
             query += ' AND r.补贴ID = ?'
             params.append(subsidy_id)
 
+        return query, params
+
+    def search_records(self, family_id=None, subsidy_id=None):
+        query, params = self._search_query(family_id, subsidy_id)
         cursor = self.conn.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    def iter_records(self, family_id=None, subsidy_id=None, page_size=500):
+        """search_records 的分页游标版，逐页产出字典列表"""
+        query, params = self._search_query(family_id, subsidy_id)
+        query += ' ORDER BY r.id'
+        cursor = self.conn.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+
     def add_record(self, 家庭, 补贴类型, 金额, 发放日期):
         try:
             with self.conn:
@@ -0,0 +1,356 @@
+# services/roster_import_service.py
+"""
+村级花名册导入
+openpyxl 只读流式逐行读取 → 按户聚合 → 分块批量写入 village / family / person / land
+dry_run 模式在同一事务中执行后回滚，得到与真实导入完全一致的差异统计
+"""
+import re
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+
+from models.dbManager import DatabaseManager
+
+# 规范字段 → 可识别的表头（表头比较前去掉空白与“(亩)”等单位）
+ROSTER_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "town": ("乡镇", "镇", "所属乡镇"),
+    "village": ("村庄", "村", "村名", "村庄名称", "所属村"),
+    "group": ("组", "组别", "小组", "村民小组"),
+    "household": ("户号", "户编号", "家庭编号"),
+    "address": ("地址", "住址", "家庭住址"),
+    "name": ("姓名",),
+    "gender": ("性别",),
+    "age": ("年龄",),
+    "idcard": ("身份证号", "身份证号码", "公民身份号码"),
+    "relation": ("与户主关系", "关系"),
+    "landarea": ("土地面积", "承包面积", "家庭土地面积"),
+    "承包种植地": ("承包种植地", "承包种植地面积"),
+    "自留地": ("自留地", "自留地面积"),
+    "林地": ("林地", "林地面积"),
+}
+LAND_TYPES = ('承包种植地', '自留地', '林地')
+HEAD_RELATIONS = ("户主", "本人")
+IDCARD_RE = re.compile(r"^\d{17}[\dX]$")
+
+# 表头最多在前几行中查找
+HEADER_SCAN_ROWS = 10
+# SQLite IN 查询每批参数个数
+_IN_BATCH = 900
+
+
+def _normalize_header(value) -> str:
+    text = re.sub(r"\s+", "", str(value or ""))
+    return re.sub(r"[（(].*?[)）]$", "", text)
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _num(value) -> Optional[float]:
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _new_diff() -> Dict:
+    return {
+        "dry_run": False,
+        "rows": 0,
+        "village": {"new": 0, "unchanged": 0},
+        "family": {"new": 0, "updated": 0, "unchanged": 0},
+        "person": {"new": 0, "updated": 0, "unchanged": 0},
+        "land": {"new": 0, "updated": 0, "unchanged": 0},
+        "rejected": [],
+    }
+
+
+class RosterImportService:
+    """花名册导入服务"""
+
+    def __init__(self, db_path: str = 'family_subsidies.db', chunk_size: int = 2000):
+        self.db = DatabaseManager(db_path)
+        self.chunk_size = chunk_size
+
+    # -------------------------------------------------
+    # 对外接口
+    # -------------------------------------------------
+    def preview(self, file_path: str, sheet_name: Optional[str] = None,
+                year: Optional[int] = None) -> Dict:
+        """试导入：返回差异统计，不落库"""
+        return self.import_roster(file_path, sheet_name, year, dry_run=True)
+
+    def import_roster(self, file_path: str, sheet_name: Optional[str] = None,
+                      year: Optional[int] = None, dry_run: bool = False) -> Dict:
+        """
+        导入一个花名册工作表
+        :param year: 用地年份，默认当年
+        :return: 各表 new / updated / unchanged 计数 + rejected [(行号, 原因)]
+        """
+        year = year or datetime.now().year
+        diff = _new_diff()
+        diff["dry_run"] = dry_run
+
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        conn = self.db.get_connection()
+        try:
+            ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header_no, mapping = self._locate_header(rows)
+
+            villages = {row["name"]: row["id"] for row in
+                        conn.execute("SELECT id, name FROM village").fetchall()}
+            seen_villages = set()
+
+            for chunk in self._chunks(self._households(rows, mapping, header_no, diff)):
+                self._apply_chunk(conn, chunk, villages, seen_villages, year, diff)
+
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            wb.close()
+        return diff
+
+    # -------------------------------------------------
+    # 读取
+    # -------------------------------------------------
+    def _locate_header(self, rows: Iterator[tuple]) -> Tuple[int, Dict[str, int]]:
+        """在前几行中找匹配字段最多的一行作为表头，返回 (行号, 字段→列下标)"""
+        lookup = {alias: key for key, aliases in ROSTER_ALIASES.items() for alias in aliases}
+        for row_no, row in enumerate(rows, 1):
+            mapping = {}
+            for idx, cell in enumerate(row):
+                key = lookup.get(_normalize_header(cell))
+                if key and key not in mapping:
+                    mapping[key] = idx
+            if "name" in mapping and len(mapping) >= 2:
+                if "village" not in mapping:
+                    raise ValueError("花名册缺少村庄列")
+                return row_no, mapping
+            if row_no >= HEADER_SCAN_ROWS:
+                break
+        raise ValueError(f"前 {HEADER_SCAN_ROWS} 行中未找到花名册表头（至少需要 姓名、村庄 列）")
+
+    def _households(self, rows: Iterator[tuple], mapping: Dict[str, int],
+                    header_no: int, diff: Dict) -> Iterator[Dict]:
+        """
+        逐行聚合为户：有户号列时按 (村, 组, 户号) 分户，
+        否则以“户主”行开启新户，后续成员行归入当前户
+        """
+        current = None
+        current_key = None
+        for row_no, row in enumerate(rows, header_no + 1):
+            rec = {key: row[idx] if idx < len(row) else None for key, idx in mapping.items()}
+            if not any(_text(v) for v in rec.values()):
+                continue
+            diff["rows"] += 1
+
+            name = _text(rec.get("name"))
+            village = _text(rec.get("village"))
+            relation = _text(rec.get("relation")) or "户主"
+            idcard = _text(rec.get("idcard")).upper()
+            if not name:
+                diff["rejected"].append((row_no, "姓名为空"))
+                continue
+            if idcard and not IDCARD_RE.match(idcard):
+                diff["rejected"].append((row_no, f"身份证号格式错误: {idcard}"))
+                continue
+
+            group = _num(rec.get("group"))
+            if "household" in mapping:
+                key = (village, group, _text(rec.get("household")))
+                starts = key != current_key
+            else:
+                key = None
+                starts = current is None or relation in HEAD_RELATIONS
+
+            if starts:
+                if current and current["members"]:
+                    yield current
+                if not village:
+                    current = current_key = None
+                    diff["rejected"].append((row_no, "村庄为空"))
+                    continue
+                current_key = key
+                current = {
+                    "row_no": row_no,
+                    "village": village,
+                    "town": _text(rec.get("town")),
+                    "group": int(group) if group is not None else 1,
+                    "address": _text(rec.get("address")) or None,
+                    "landarea": _num(rec.get("landarea")),
+                    "lands": {t: _num(rec.get(t)) for t in LAND_TYPES if _num(rec.get(t)) is not None},
+                    "members": [],
+                }
+            elif current is None:
+                diff["rejected"].append((row_no, "成员行之前没有户主行"))
+                continue
+
+            age = _num(rec.get("age"))
+            current["members"].append({
+                "row_no": row_no,
+                "name": name,
+                "gender": _text(rec.get("gender")) or None,
+                "age": int(age) if age is not None else None,
+                "idcard": idcard or None,
+                "relation": relation,
+                "is_head": 1 if relation in HEAD_RELATIONS else 0,
+            })
+        if current and current["members"]:
+            yield current
+
+    def _chunks(self, households: Iterator[Dict]) -> Iterator[List[Dict]]:
+        """按成员行数切块，保证同一户不会被拆到两个块"""
+        chunk, size = [], 0
+        for household in households:
+            chunk.append(household)
+            size += len(household["members"])
+            if size >= self.chunk_size:
+                yield chunk
+                chunk, size = [], 0
+        if chunk:
+            yield chunk
+
+    # -------------------------------------------------
+    # 写入
+    # -------------------------------------------------
+    def _apply_chunk(self, conn, chunk: List[Dict], villages: Dict[str, int],
+                     seen_villages: set, year: int, diff: Dict) -> None:
+        # 村庄
+        for household in chunk:
+            name = household["village"]
+            if name not in villages:
+                cur = conn.execute("INSERT INTO village (name, town) VALUES (?, ?)",
+                                   (name, household["town"]))
+                villages[name] = cur.lastrowid
+                diff["village"]["new"] += 1
+            elif name not in seen_villages:
+                diff["village"]["unchanged"] += 1
+            seen_villages.add(name)
+
+        # 已有人员（按身份证号匹配）
+        idcards = [m["idcard"] for h in chunk for m in h["members"] if m["idcard"]]
+        by_idcard = {row["idcard"]: dict(row) for row in self._fetch_in(
+            conn, "SELECT * FROM person WHERE idcard IN ({})", idcards)}
+
+        # 家庭：任一成员身份证号命中即视为同一户
+        for household in chunk:
+            hits = [by_idcard[m["idcard"]] for m in household["members"] if m["idcard"] in by_idcard]
+            household["family_id"] = next(
+                (p["familyid"] for p in hits if p["is_head"]), hits[0]["familyid"] if hits else None)
+
+        matched_ids = list({h["family_id"] for h in chunk if h["family_id"] is not None})
+        families = {row["id"]: dict(row) for row in self._fetch_in(
+            conn, "SELECT * FROM family WHERE id IN ({})", matched_ids)}
+        by_name = {(row["familyid"], row["name"]): dict(row) for row in self._fetch_in(
+            conn, "SELECT * FROM person WHERE familyid IN ({})", matched_ids)}
+
+        family_updates = []
+        for household in chunk:
+            head = next((m for m in household["members"] if m["is_head"]), household["members"][0])
+            values = {
+                "landarea": household["landarea"] if household["landarea"] is not None
+                else sum(household["lands"].values()),
+                "villageid": villages[household["village"]],
+                "groupid": household["group"],
+                "address": household["address"],
+                "name": head["name"],
+            }
+            existing = families.get(household["family_id"])
+            if existing is None:
+                cur = conn.execute(
+                    "INSERT INTO family (landarea, villageid, groupid, address, name) "
+                    "VALUES (:landarea, :villageid, :groupid, :address, :name)", values)
+                household["family_id"] = cur.lastrowid
+                diff["family"]["new"] += 1
+            elif any(existing[k] != v for k, v in values.items()):
+                family_updates.append({**values, "id": existing["id"]})
+                diff["family"]["updated"] += 1
+            else:
+                diff["family"]["unchanged"] += 1
+        if family_updates:
+            conn.executemany(
+                "UPDATE family SET landarea = :landarea, villageid = :villageid, groupid = :groupid, "
+                "address = :address, name = :name WHERE id = :id", family_updates)
+
+        # 人员
+        person_inserts, person_updates = [], []
+        fields = ("name", "gender", "age", "idcard", "relation", "is_head")
+        for household in chunk:
+            fid = household["family_id"]
+            for member in household["members"]:
+                existing = (by_idcard.get(member["idcard"]) if member["idcard"]
+                            else by_name.get((fid, member["name"])))
+                values = {**member, "familyid": fid}
+                values.pop("row_no")
+                if existing is None:
+                    person_inserts.append(values)
+                    diff["person"]["new"] += 1
+                    if member["idcard"]:
+                        # 占位：同一文件中再次出现该身份证号时拒绝
+                        by_idcard[member["idcard"]] = {**values, "id": None}
+                elif existing["id"] is None:
+                    diff["rejected"].append((member["row_no"], f"身份证号在文件中重复: {member['idcard']}"))
+                elif existing["familyid"] != fid or any(existing[k] != member[k] for k in fields):
+                    person_updates.append({**values, "id": existing["id"]})
+                    diff["person"]["updated"] += 1
+                else:
+                    diff["person"]["unchanged"] += 1
+        if person_inserts:
+            conn.executemany(
+                "INSERT INTO person (familyid, name, gender, age, idcard, relation, is_head) "
+                "VALUES (:familyid, :name, :gender, :age, :idcard, :relation, :is_head)", person_inserts)
+        if person_updates:
+            conn.executemany(
+                "UPDATE person SET familyid = :familyid, name = :name, gender = :gender, age = :age, "
+                "idcard = :idcard, relation = :relation, is_head = :is_head WHERE id = :id", person_updates)
+
+        # 用地（land.family_id 为 TEXT）
+        land_households = [h for h in chunk if h["lands"]]
+        if not land_households:
+            return
+        family_keys = [str(h["family_id"]) for h in land_households]
+        lands = {(row["family_id"], row["land_type"]): dict(row) for row in self._fetch_in(
+            conn, "SELECT * FROM land WHERE year = ? AND family_id IN ({})", family_keys, (year,))}
+        land_inserts, land_updates = [], []
+        for household in land_households:
+            key = str(household["family_id"])
+            for land_type, area in household["lands"].items():
+                existing = lands.get((key, land_type))
+                if existing is None:
+                    land_inserts.append((key, area, land_type, year))
+                    diff["land"]["new"] += 1
+                elif float(existing["area"]) != area:
+                    land_updates.append((area, existing["land_id"]))
+                    diff["land"]["updated"] += 1
+                else:
+                    diff["land"]["unchanged"] += 1
+        if land_inserts:
+            conn.executemany(
+                "INSERT INTO land (family_id, area, land_type, year) VALUES (?, ?, ?, ?)", land_inserts)
+        if land_updates:
+            conn.executemany("UPDATE land SET area = ? WHERE land_id = ?", land_updates)
+
+    @staticmethod
+    def _fetch_in(conn, sql: str, keys: list, params: tuple = ()) -> list:
+        """分批 IN 查询，sql 中以 {} 占位 IN 列表"""
+        rows = []
+        for i in range(0, len(keys), _IN_BATCH):
+            batch = keys[i:i + _IN_BATCH]
+            rows.extend(conn.execute(sql.format(', '.join(['?'] * len(batch))),
+                                     (*params, *batch)).fetchall())
+        return rows
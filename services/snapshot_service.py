@@ -0,0 +1,200 @@
+# services/snapshot_service.py
+"""
+列式快照
+把 family / person / land / subsidy_types / subsidy_records 分块读出，
+按固定类型写成 Arrow IPC（Feather v2）或 Parquet 文件，供年终分析与批处理直接加载
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# 表名 → Arrow 类型化 schema（列顺序即快照列顺序）
+SNAPSHOT_SCHEMAS: Dict[str, pa.Schema] = {
+    "family": pa.schema([
+        ("id", pa.int64()),
+        ("landarea", pa.float64()),
+        ("villageid", pa.int64()),
+        ("groupid", pa.int32()),
+        ("address", pa.string()),
+        ("name", pa.string()),
+    ]),
+    "person": pa.schema([
+        ("id", pa.int64()),
+        ("familyid", pa.int64()),
+        ("name", pa.string()),
+        ("gender", pa.string()),
+        ("age", pa.int32()),
+        ("idcard", pa.string()),
+        ("relation", pa.string()),
+        ("is_head", pa.bool_()),
+    ]),
+    "land": pa.schema([
+        ("land_id", pa.int64()),
+        ("family_id", pa.string()),
+        ("area", pa.float64()),
+        ("land_type", pa.string()),
+        ("year", pa.int32()),
+    ]),
+    "subsidy_types": pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("amount", pa.float64()),
+        ("year", pa.int32()),
+        ("description", pa.string()),
+        ("land_type", pa.string()),
+        ("is_mutual_exclusive", pa.bool_()),
+        ("is_activate", pa.bool_()),
+        ("created_at", pa.timestamp("s")),
+        ("updated_at", pa.timestamp("s")),
+    ]),
+    "subsidy_records": pa.schema([
+        ("id", pa.int64()),
+        ("family_id", pa.int64()),
+        ("subsidy_id", pa.int64()),
+        ("amount", pa.float64()),
+        ("year", pa.int32()),
+        ("发放日期", pa.timestamp("s")),
+        ("备注", pa.string()),
+    ]),
+}
+
+FORMATS = {"feather": ".arrow", "parquet": ".parquet"}
+MANIFEST = "manifest.json"
+
+
+class SnapshotService:
+    """
+    快照导出 / 加载
+    Feather 文件按 RecordBatch 追加写入，读取时 memory_map 打开；
+    不压缩（compression=None）的 Feather 快照读取为零拷贝
+    """
+
+    def __init__(self, db_path: str = 'family_subsidies.db', chunk_size: int = 50000):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+
+    # -------------------------------------------------
+    # 导出
+    # -------------------------------------------------
+    def export_snapshot(self, out_dir: str, tables: Optional[Iterable[str]] = None,
+                        fmt: str = "feather", compression: Optional[str] = "zstd") -> Dict:
+        """
+        导出快照到 out_dir，库中不存在的表跳过
+        :return: manifest 字典 {created_at, format, tables: {表名: {file, rows}}}
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的快照格式: {fmt}")
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "source": os.path.abspath(self.db_path),
+            "format": fmt,
+            "compression": compression,
+            "tables": {},
+        }
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for table in tables or SNAPSHOT_SCHEMAS:
+                existing = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                if not existing:
+                    continue
+                schema = pa.schema([f for f in SNAPSHOT_SCHEMAS[table] if f.name in existing])
+                file_name = table + FORMATS[fmt]
+                rows = self._write_table(conn, table, schema, os.path.join(out_dir, file_name),
+                                         fmt, compression)
+                manifest["tables"][table] = {"file": file_name, "rows": rows}
+        finally:
+            conn.close()
+
+        with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+    def _write_table(self, conn, table: str, schema: pa.Schema, path: str,
+                     fmt: str, compression: Optional[str]) -> int:
+        """分块写出单表，先写临时文件再替换，返回行数"""
+        columns = ", ".join(f'"{name}"' for name in schema.names)
+        chunks = pd.read_sql_query(f"SELECT {columns} FROM {table}", conn,
+                                   chunksize=self.chunk_size)
+        tmp_path = path + ".tmp"
+        rows = 0
+        try:
+            if fmt == "feather":
+                options = ipc.IpcWriteOptions(compression=compression)
+                writer = ipc.new_file(tmp_path, schema, options=options)
+            else:
+                writer = pq.ParquetWriter(tmp_path, schema, compression=compression or "none")
+            try:
+                for chunk in chunks:
+                    batch = pa.RecordBatch.from_pandas(self._coerce(chunk, schema),
+                                                       schema=schema, preserve_index=False)
+                    if fmt == "feather":
+                        writer.write_batch(batch)
+                    else:
+                        writer.write_table(pa.Table.from_batches([batch]))
+                    rows += batch.num_rows
+            finally:
+                writer.close()
+            os.replace(tmp_path, path)
+        finally:
+            # 失败时不留下半截的临时文件
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return rows
+
+    @staticmethod
+    def _coerce(df: pd.DataFrame, schema: pa.Schema) -> pd.DataFrame:
+        """SQLite 列为动态类型，按 schema 先在 pandas 侧统一类型"""
+        for field in schema:
+            col = df[field.name]
+            if pa.types.is_integer(field.type):
+                df[field.name] = pd.to_numeric(col, errors="coerce").astype("Int64")
+            elif pa.types.is_floating(field.type):
+                df[field.name] = pd.to_numeric(col, errors="coerce").astype("float64")
+            elif pa.types.is_boolean(field.type):
+                df[field.name] = pd.to_numeric(col, errors="coerce").astype("Int64").astype("boolean")
+            elif pa.types.is_timestamp(field.type):
+                df[field.name] = pd.to_datetime(col, errors="coerce").dt.floor("s")
+            else:
+                df[field.name] = col.astype("string")
+        return df
+
+    # -------------------------------------------------
+    # 加载
+    # -------------------------------------------------
+    @staticmethod
+    def read_manifest(snapshot_dir: str) -> Dict:
+        with open(os.path.join(snapshot_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_table(self, snapshot_dir: str, table: str,
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """memory_map 方式加载单表为 DataFrame，可只取部分列"""
+        manifest = self.read_manifest(snapshot_dir)
+        if table not in manifest["tables"]:
+            raise KeyError(f"快照中没有表: {table}")
+        path = os.path.join(snapshot_dir, manifest["tables"][table]["file"])
+
+        if manifest["format"] == "parquet":
+            arrow_table = pq.read_table(path, columns=columns, memory_map=True)
+        else:
+            with pa.memory_map(path, "r") as source:
+                arrow_table = ipc.open_file(source).read_all()
+            if columns:
+                arrow_table = arrow_table.select(columns)
+        return arrow_table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def load_snapshot(self, snapshot_dir: str,
+                      tables: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """加载快照中的全部（或指定）表"""
+        manifest = self.read_manifest(snapshot_dir)
+        return {table: self.load_table(snapshot_dir, table)
+                for table in (tables or manifest["tables"])}
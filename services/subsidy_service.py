@@ -5,10 +5,7 @@ from pathlib import Path
 import json
 import csv
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment, Border, Side
-
+from models.subsidy_cache import RULES, SUBSIDIES, subsidy_cache
 from models.subsidy_model import SubsidyDAO
 from models.subsidy_rule_dao import SubsidyRuleDAO
 
@@ -20,6 +17,7 @@ class SubsidyService:
     """
 
     def __init__(self, db_path: str = 'family_subsidies.db'):
+        self.db_path     = db_path
         self.subsidy_dao = SubsidyDAO(db_path)   # 单例
         self.rule_dao    = SubsidyRuleDAO()
 
@@ -50,10 +48,28 @@ class SubsidyService:
         return self.subsidy_dao.get_subsidy_by_id(subsidy_id)
 
     def get_all_subsidies(self, active_only: bool = True) -> List[Dict]:
-        """返回 {id, name} 供下拉框"""
-        rows = self.subsidy_dao.get_all_subsidies(active_only)
+        """返回 {id, name} 供下拉框；走进程内缓存，补贴类型有写入后才重新查询"""
+        rows = subsidy_cache.get(SUBSIDIES, ("all", active_only),
+                                 lambda: self.subsidy_dao.get_all_subsidies(active_only))
         return [{"id": r["id"], "name": r["name"]} for r in rows]
 
+    def subsidy_version(self) -> int:
+        """补贴类型数据版本号，每次写入加一"""
+        return subsidy_cache.version(SUBSIDIES)
+
+    def iter_subsidies(self, name: str = "", active_only: bool = False, page_size: int = 500):
+        """按名称搜索补贴类型，分页返回，供表格模型懒加载"""
+        return self.subsidy_dao.iter_search_subsidies(name=name, active_only=active_only,
+                                                      page_size=page_size)
+
+    def kanban_items(self, name: str = "", year: Optional[int] = None) -> List[Dict]:
+        """看板视图数据：{id, name, year, status, progress}"""
+        return self.subsidy_dao.kanban_items(name=name, year=year)
+
+    def set_subsidy_status(self, subsidy_id: int, status: str,
+                           progress: Optional[int] = None) -> bool:
+        return self.subsidy_dao.set_status(subsidy_id, status, progress)
+
     # -------------------------------------------------
     # 互斥规则 CRUD
     # -------------------------------------------------
@@ -67,8 +83,20 @@ class SubsidyService:
     def delete_rule(self, rule_id: int) -> bool:
         return self.rule_dao.delete_rule(rule_id)
 
-    def list_rules(self, **filters) -> List[Dict]:
-        return self.rule_dao.search_rules(**filters)
+    def list_rules(self, a_id: Optional[str] = None, b_id: Optional[str] = None,
+                   relation: Optional[str] = None, keyword: Optional[str] = None) -> List[Dict]:
+        """全部规则走缓存，筛选条件在内存中过滤（与 SubsidyRuleDAO.search_rules 结果一致）"""
+        rules = subsidy_cache.get(RULES, "all", self.rule_dao.search_rules)
+        keyword = (keyword or "").lower()
+        return [r for r in rules
+                if (not a_id or r["subsidy_a_id"] == a_id)
+                and (not b_id or r["subsidy_b_id"] == b_id)
+                and (not relation or r["relation"] == relation)
+                and (not keyword or keyword in (r["name"] or "").lower()
+                     or keyword in (r["description"] or "").lower())]
+
+    def rule_version(self) -> int:
+        return subsidy_cache.version(RULES)
 
     # -------------------------------------------------
     # 导出/导入
@@ -96,50 +124,11 @@ class SubsidyService:
                 })
 
     def import_subsidies_from_csv(self, file_path: str) -> int:
-        count = 0
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    self.add_subsidy(
-                        name=row["name"],
-                        amount=float(row["amount"]),
-                        year=int(row["year"]),
-                        land_type=row.get("land_type", ""),
-                        description=row.get("description", ""),
-                        is_exclusive=row.get("is_mutual_exclusive", "").lower() == "是",
-                        is_active=row.get("is_activate", "").lower() == "是"
-                    )
-                    count += 1
-                except Exception as e:
-                    print(f"跳过行: {e} {row}")
-        return count
-
-    def export_subsidies_to_excel(self, file_path: str, active_only: bool = True) -> None:
-        subsidies = self.subsidy_dao.get_all_subsidies(active_only)
-        if not subsidies:
-            raise ValueError("无数据可导出")
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "补贴类型"
-        headers = ["ID", "名称", "金额", "年份", "土地类型", "互斥", "激活", "描述"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-
-        for row_idx, r in enumerate(subsidies, 2):
-            ws.cell(row=row_idx, column=1, value=r["id"])
-            ws.cell(row=row_idx, column=2, value=r["name"])
-            ws.cell(row=row_idx, column=3, value=r["amount"])
-            ws.cell(row=row_idx, column=4, value=r["year"])
-            ws.cell(row=row_idx, column=5, value=r.get("land_type", ""))
-            ws.cell(row=row_idx, column=6, value="是" if r.get("is_mutual_exclusive") else "否")
-            ws.cell(row=row_idx, column=7, value="是" if r.get("is_activate") else "否")
-            ws.cell(row=row_idx, column=8, value=r.get("description", ""))
-
-        for col in ws.columns:
-            max_len = max([len(str(cell.value or "")) for cell in col])
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
-
-        wb.save(file_path)
\ No newline at end of file
+        """批量导入补贴类型，不合格行写入 <文件名>_rejects.csv，返回成功行数"""
+        from .import_service import ImportService  # pandas 较重，用到时再导入
+        return ImportService(self.db_path).import_subsidies(file_path)["imported"]
+
+    def export_subsidies_to_excel(self, file_path: str, active_only: bool = True) -> int:
+        """流式导出补贴类型，返回导出行数"""
+        from .export_service import ExportService
+        return ExportService(self.db_path).export_subsidies(file_path, active_only)
@@ -1,14 +1,25 @@
-from .family_manage_ui import FamilyManageUI
-# from .land_manage_ui import LandManageUI
-from .submangeui_ui import SubsidyManageUI
-# from .person_manage_ui import PersonManageUI
-from .main_window import MainWindow  # 注意这里应该是 MainWindow 而不是 MainUI
-from .New_window  import NewWindow
-from .loginUi import LoginWindow
-from .subsidyManageInterface   import SubsidyManagementInterface
-from .familyManageInterface import FamilyManagementInterface
-from .subsidyPopupUi import SubsidyPopup
-from .rule_table_page import RuleTablePage
+# ui/__init__.py
+"""
+界面统一入口
+按名称延迟导入（PEP 562）：启动时 from ui import LoginWindow 只加载登录窗口，
+主窗口及各页面在首次使用时才导入
+"""
+import importlib
+
+_MODULES = {
+    'FamilyManageUI': '.family_manage_ui',
+    # 'LandManageUI': '.land_manage_ui',
+    'SubsidyManageUI': '.submangeui_ui',
+    # 'PersonManageUI': '.person_manage_ui',
+    'MainWindow': '.main_window',  # 注意这里应该是 MainWindow 而不是 MainUI
+    'NewWindow': '.New_window',
+    'LoginWindow': '.loginUi',
+    'SubsidyManagementInterface': '.subsidyManageInterface',
+    'FamilyManagementInterface': '.familyManageInterface',
+    'SubsidyPopup': '.subsidyPopupUi',
+    'RuleTablePage': '.rule_table_page',
+}
+
 __all__ = [
     'FamilyManageUI',
     'SubsidyManageUI',
@@ -20,3 +31,16 @@ __all__ = [
     'NewWindow',  # 确保这里与上面的导入名称一致
     'RuleTablePage'
 ]
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -8,6 +8,7 @@ from qfluentwidgets import (InfoBar, InfoBarPosition, CheckBox, TitleLabel,
 from PySide6.QtCore import Qt, QDate, Signal
 from PySide6.QtGui import QCloseEvent
 from services.subsidy_service import SubsidyService
+from engine.qt_subsidy_signals import SubsidySignals
 
 class SubsidyTypeEditWindow(QWidget):
     """补贴类型创建/编辑窗口"""
@@ -29,11 +30,22 @@ class SubsidyTypeEditWindow(QWidget):
         self.setWindowTitle("创建补贴类型" if subsidy_id is None else "编辑补贴类型")
         self.setMinimumSize(600, 700)
         self.setWindowModality(Qt.ApplicationModal)  # 设置为模态窗口
+        # 每次打开都新建窗口，关闭即销毁
+        self.setAttribute(Qt.WA_DeleteOnClose)
         
         self.init_ui()
         
         if subsidy_id:
             self.load_data(subsidy_id)
+        else:
+            self.load_conflict_options()
+        # 其它窗口修改了补贴类型时刷新互斥选项；关闭时断开（信号是进程级的）
+        SubsidySignals.instance().subsidiesChanged.connect(self.on_subsidies_changed)
+        self._subscribed = True
+
+    def on_subsidies_changed(self, _version):
+        """刷新互斥选项，保留当前选择"""
+        self.load_conflict_options(self.conflict_combo.currentData())
     
     def init_ui(self):
         """初始化UI界面"""
@@ -241,12 +253,12 @@ class SubsidyTypeEditWindow(QWidget):
         self.conflict_combo.clear()
         self.conflict_combo.addItem("无互斥规则", None)
         
-        # 获取所有补贴类型（排除当前编辑的）
-        subsidy_types = self.service.get_all_subsidy_types()
+        # 获取所有补贴类型（排除当前编辑的），读缓存
+        subsidy_types = self.service.get_all_subsidies(active_only=False)
         for st in subsidy_types:
             if self.subsidy_id and st["id"] == self.subsidy_id:
                 continue
-            self.conflict_combo.addItem(f"{st['name']} ({st['code']})", st["id"])
+            self.conflict_combo.addItem(f"{st['name']} ({st['id']})", st["id"])
         
         # 设置选中的项目
         if selected_id:
@@ -340,4 +352,7 @@ class SubsidyTypeEditWindow(QWidget):
     def closeEvent(self, event: QCloseEvent):
         """关闭窗口事件"""
         # 可以在这里添加关闭前的确认逻辑
+        if getattr(self, "_subscribed", False):
+            SubsidySignals.instance().subsidiesChanged.disconnect(self.on_subsidies_changed)
+            self._subscribed = False
         super().closeEvent(event)
\ No newline at end of file
@@ -1,10 +1,17 @@
 import sys
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem, 
-                              QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeView, 
+                              QTableWidget, QTableWidgetItem, QTableView, QHeaderView, QAbstractItemView,
                               QSplitter, QGroupBox, QFormLayout, QLabel, QPushButton, 
                               QTabWidget, QFrame, QToolButton,QGridLayout)
 from PySide6.QtGui import QIcon
+from models.dbManager import DatabaseManager
+from models.family_model import FamilyDAO
+from models.person_model import PersonDAO
+from models.villageDao import VillageDAO
+from engine.qt_query_runner import QueryRunner
+from ui.table_models import ButtonDelegate, PagedTableModel
+from ui.location_tree_model import GROUP, LOCATION_ROLE, TOWN, VILLAGE, LocationTreeModel
 from qfluentwidgets import (CardWidget, FluentIcon, PrimaryPushButton, ToolButton, 
                            TitleLabel, BodyLabel, SearchLineEdit, ComboBox, MessageBox,
                            InfoBar, InfoBarPosition)
@@ -16,9 +23,13 @@ class FamilyManagementInterface(QWidget):
         self.setObjectName("family_interface")
         self.current_family = None
         self.table = None  # 先声明table属性
+        self.family_dao = FamilyDAO(DatabaseManager())
+        self.village_dao = VillageDAO(DatabaseManager())
+        self.person_dao = PersonDAO()
+        self.runner = QueryRunner.default()
         self.setup_ui()
-        self.load_sample_tree_data()
-        self.load_sample_family_data()
+        self.load_location_tree()
+        self.load_family_data()
         self.clear_detail_panel()
     
     def setup_ui(self):
@@ -73,27 +84,34 @@ class FamilyManagementInterface(QWidget):
         layout.addWidget(self.tree_search)
         
         # 树状结构
-        self.tree = QTreeWidget()
+        self.location_model = LocationTreeModel(self.village_dao, icons={
+            TOWN: QIcon(FluentIcon.HOME.icon()),
+            VILLAGE: QIcon(FluentIcon.TAG.icon()),
+            GROUP: QIcon(FluentIcon.PEOPLE.icon()),
+        }, parent=self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.location_model)
         self.tree.setHeaderHidden(True)
         self.tree.setIndentation(15)
+        self.tree.setUniformRowHeights(True)
         self.tree.setStyleSheet("""
-            QTreeWidget {
+            QTreeView {
                 border: 1px solid #e0e0e0;
                 border-radius: 4px;
                 background-color: white;
             }
-            QTreeWidget::item {
+            QTreeView::item {
                 height: 32px;
                 padding: 5px;
             }
-            QTreeWidget::item:selected {
+            QTreeView::item:selected {
                 background-color: #e3f2fd;
                 color: #1976d2;
             }
         """)
         
         # 连接选择信号
-        self.tree.itemSelectionChanged.connect(self.on_location_selected)
+        self.tree.selectionModel().selectionChanged.connect(self.on_location_selected)
         layout.addWidget(self.tree, 1)
         
         # 操作按钮
@@ -145,22 +163,29 @@ class FamilyManagementInterface(QWidget):
         filter_layout.addStretch(1)
         layout.addLayout(filter_layout)
         
-        # 家庭表格
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["户主", "身份证号", "家庭人口", "联系电话", "家庭地址", "操作"])
+        # 家庭表格（分页懒加载，操作按钮由委托绘制）
+        self.family_model = PagedTableModel([
+            ("户主", lambda r: r.get("householder") or r.get("name")),
+            ("身份证号", "id_card"),
+            ("家庭人口", lambda r: f"{r['members']}人"),
+            ("承包面积", "landarea"),
+            ("家庭地址", "address"),
+            ("操作", lambda r: ""),
+        ], parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.family_model)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        for column in range(1, 6):
+            self.table.horizontalHeader().setSectionResizeMode(column, QHeaderView.ResizeToContents)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.action_delegate = ButtonDelegate(["查看", "编辑"], self.table)
+        self.action_delegate.clicked.connect(lambda row, _: self.table.selectRow(row))
+        self.table.setItemDelegateForColumn(5, self.action_delegate)
         
         # 连接选中信号
-        self.table.itemSelectionChanged.connect(self.on_family_selected)
+        self.table.selectionModel().selectionChanged.connect(self.on_family_selected)
         layout.addWidget(self.table, 1)
         
         return container
@@ -522,108 +547,49 @@ class FamilyManagementInterface(QWidget):
             self.subsidy_table.setItem(row, 3, QTableWidgetItem(subsidy.get("amount", "")))
             self.subsidy_table.setItem(row, 4, QTableWidgetItem(subsidy.get("status", "")))
         
-    def load_sample_tree_data(self):
-        """加载示例树状数据"""
-        self.tree.clear()
-        
-        # 添加镇级节点
-        town1 = QTreeWidgetItem(["青阳镇"])
-        town1.setIcon(0, QIcon(FluentIcon.HOME.icon()))
-        
-        # 添加村级节点
-        village1 = QTreeWidgetItem(["青阳村"])
-        village1.setIcon(0, QIcon(FluentIcon.TAG.icon()))
-        
-        village2 = QTreeWidgetItem(["向阳村"])
-        village2.setIcon(0, QIcon(FluentIcon.TAG.icon()))
-        
-        # 添加组级节点
-        group1 = QTreeWidgetItem(["一组"])
-        group1.setIcon(0, QIcon(FluentIcon.PEOPLE.icon()))
-        
-        group2 = QTreeWidgetItem(["二组"])
-        group2.setIcon(0, QIcon(FluentIcon.PEOPLE.icon()))
-        
-        # 构建树状结构
-        town1.addChild(village1)
-        town1.addChild(village2)
-        village1.addChild(group1)
-        village1.addChild(group2)
-        
-        self.tree.addTopLevelItem(town1)
-        self.tree.expandAll()
+    def load_location_tree(self):
+        """加载行政区域树（只查询镇一级，村 / 组在展开时加载）"""
+        self.location_model.refresh()
+        self.location_model.fetchMore()
     
-    def load_sample_family_data(self):
-        """加载示例家庭数据"""
+    def load_family_data(self, village_id=None, group_id=None, town=None):
+        """加载家庭列表（按页从数据库拉取，滚动到底再取下一页）"""
         if not hasattr(self, 'table') or self.table is None:
             return
-            
-        families = [
-            {
-                "householder": "张三", "id_card": "320523198503124512",
-                "members": "4人", "phone": "13800138000",
-                "address": "青阳镇青阳村一组", "status": "正常"
-            },
-            {
-                "householder": "李四", "id_card": "320523197812054215",
-                "members": "3人", "phone": "13900139000",
-                "address": "青阳镇青阳村一组", "status": "正常"
-            }
-        ]
-        
-        self.table.setRowCount(len(families))
-        
-        for row, family in enumerate(families):
-            self.table.setItem(row, 0, QTableWidgetItem(family["householder"]))
-            self.table.setItem(row, 1, QTableWidgetItem(family["id_card"]))
-            self.table.setItem(row, 2, QTableWidgetItem(family["members"]))
-            self.table.setItem(row, 3, QTableWidgetItem(family["phone"]))
-            self.table.setItem(row, 4, QTableWidgetItem(family["address"]))
-            
-            # 操作按钮
-            btn_widget = QWidget()
-            btn_layout = QHBoxLayout(btn_widget)
-            btn_layout.setContentsMargins(0, 0, 0, 0)
-            
-            view_btn = ToolButton(FluentIcon.VIEW)
-            btn_layout.addWidget(view_btn)
-            
-            edit_btn = ToolButton(FluentIcon.EDIT)
-            btn_layout.addWidget(edit_btn)
-            
-            self.table.setCellWidget(row, 5, btn_widget)
+        self.family_model.set_source_async(
+            lambda: self.family_dao.iter_family_list(village_id=village_id, group_id=group_id, town=town),
+            self.runner, "family_list")
     
     def on_location_selected(self):
-        """当选择树状结构中的位置时"""
-        selected_items = self.tree.selectedItems()
-        if selected_items:
-            print(f"选择了: {selected_items[0].text(0)}")
-            # 这里应该根据选择的位置筛选家庭列表
-            self.load_sample_family_data()
+        """当选择树状结构中的位置时，按 镇 / 村 / 组 筛选家庭列表"""
+        indexes = self.tree.selectionModel().selectedIndexes()
+        if indexes:
+            location = indexes[0].data(LOCATION_ROLE) or {}
+            self.load_family_data(**location)
     
     def on_family_selected(self):
         """当家庭被选中时更新详情面板"""
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            self.runner.cancel("family_detail")
             self.clear_detail_panel()
             return
         
-        # 获取选中行的第一列（户主姓名）
-        row = selected_items[0].row()
-        householder = self.table.item(row, 0).text()
+        row = self.family_model.row_data(selected_rows[0].row())
+        householder = row.get("householder") or row.get("name") or ""
         
         # 构造家庭数据字典
         family_data = {
-            "id": "F2023" + str(row+1).zfill(3),
+            "id": str(row["id"]),
             "householder": householder,
-            "id_card": self.table.item(row, 1).text(),
-            "phone": self.table.item(row, 3).text(),
-            "address": self.table.item(row, 4).text(),
+            "id_card": row.get("id_card") or "",
+            "phone": row.get("phone") or "",
+            "address": row.get("address") or "",
             "register_date": "2023-01-15",  # 示例数据
-            "status": self.table.item(row, 2).text().replace("人", ""),  # 从"3人"中提取状态
+            "status": str(row["members"]),
             "members": [
                 {"name": householder, "relation": "户主", "gender": "男", 
-                "birth": "1985-03-12", "id_card": self.table.item(row, 1).text(), "health": "健康"},
+                "birth": "1985-03-12", "id_card": row.get("id_card") or "", "health": "健康"},
                 {"name": "张妻", "relation": "配偶", "gender": "女", 
                 "birth": "1987-05-23", "id_card": "320523198705234512", "health": "健康"}
             ],
@@ -637,7 +603,22 @@ class FamilyManagementInterface(QWidget):
             ]
         }
         
-        # 调用更新方法
+        # 先用列表中已有的信息更新，成员在后台查询；快速切换选择时只保留最后一次的结果
+        self.update_detail_panel(family_data)
+        self.runner.submit("family_detail", self.person_dao.get_persons, args=(row["id"],),
+                           on_result=lambda members: self.on_family_members_loaded(family_data, members))
+    
+    def on_family_members_loaded(self, family_data, members):
+        """后台查询到的家庭成员"""
+        if members:
+            family_data["members"] = [{
+                "name": m.get("name", ""),
+                "relation": m.get("relation", ""),
+                "gender": m.get("gender") or "",
+                "birth": "",
+                "id_card": m.get("idcard") or "",
+                "health": "",
+            } for m in members]
         self.update_detail_panel(family_data)
 
     def clear_detail_panel(self):
@@ -0,0 +1,232 @@
+# ui/kanban_board.py
+"""
+补贴看板
+卡片按补贴 id 常驻，刷新时由 engine.kanban_diff 算出 删除 / 新增 / 移动 / 更新，
+只对变化的卡片操作：状态变化把原卡片挪到新列，进度变化原地改标签，不再整板重建
+"""
+from typing import Any, Dict, Iterable, List
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QMenu, QScrollArea, QVBoxLayout, QWidget
+from qfluentwidgets import CardWidget, FluentIcon, ProgressBar, ToolButton
+
+from engine.kanban_diff import diff_board
+
+# 状态列：(名称, 颜色)
+STATUSES = [
+    ("草稿", "#9e9e9e"),
+    ("审核中", "#2196f3"),
+    ("发放中", "#ff9800"),
+    ("已完成", "#4caf50"),
+    ("已归档", "#607d8b"),
+]
+STATUS_COLORS = dict(STATUSES)
+# 只有这些状态可删除
+DELETABLE = ("草稿", "审核中")
+
+
+class KanbanCard(CardWidget):
+    def __init__(self, board: "KanbanBoard", item: Dict, parent=None):
+        super().__init__(parent)
+        self.board = board
+        self.item: Dict = {}
+        self.setFixedHeight(150)
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        # 补贴名称
+        self.name_label = QLabel()
+        self.name_label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self.name_label.setWordWrap(True)
+        layout.addWidget(self.name_label)
+
+        # 补贴编号和年份
+        meta_layout = QHBoxLayout()
+        self.code_label = QLabel()
+        meta_layout.addWidget(self.code_label)
+        meta_layout.addStretch()
+        self.year_label = QLabel()
+        meta_layout.addWidget(self.year_label)
+        layout.addLayout(meta_layout)
+
+        # 进度条
+        self.progress_bar = ProgressBar()
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.progress_bar)
+
+        # 操作按钮
+        btn_layout = QHBoxLayout()
+        view_btn = ToolButton(FluentIcon.VIEW)
+        view_btn.setToolTip("查看详情")
+        view_btn.setFixedSize(30, 30)
+        btn_layout.addWidget(view_btn)
+
+        edit_btn = ToolButton(FluentIcon.EDIT)
+        edit_btn.setToolTip("编辑")
+        edit_btn.setFixedSize(30, 30)
+        btn_layout.addWidget(edit_btn)
+
+        self.delete_btn = ToolButton(FluentIcon.DELETE)
+        self.delete_btn.setToolTip("删除")
+        self.delete_btn.setFixedSize(30, 30)
+        self.delete_btn.clicked.connect(lambda: board.deleteRequested.emit(dict(self.item)))
+        btn_layout.addWidget(self.delete_btn)
+        btn_layout.addStretch(1)
+
+        # 状态标签
+        self.status_label = QLabel()
+        btn_layout.addWidget(self.status_label)
+        layout.addLayout(btn_layout)
+
+        self.set_item(item)
+
+    def set_item(self, item: Dict) -> None:
+        """按新数据原地刷新，只改变化的部分"""
+        old, self.item = self.item, dict(item)
+        if old.get("name") != item["name"]:
+            self.name_label.setText(item["name"])
+        if old.get("id") != item["id"]:
+            self.code_label.setText(f"编号: {item['id']}")
+        if old.get("year") != item.get("year"):
+            self.year_label.setText(str(item.get("year") or ""))
+        progress = int(item.get("progress") or 0)
+        if old.get("progress") != progress:
+            self.progress_bar.setValue(progress)
+            self.progress_bar.setFormat(f"{progress}%")
+        status = item["status"]
+        if old.get("status") != status:
+            color = STATUS_COLORS.get(status, "#9e9e9e")
+            chunk = "#4caf50" if status == "已归档" else color
+            self.progress_bar.setStyleSheet(f"QProgressBar::chunk {{ background-color: {chunk}; }}")
+            self.status_label.setText(status)
+            self.status_label.setStyleSheet(f"color: {color}; font-weight: bold;")
+            self.delete_btn.setEnabled(status in DELETABLE)
+
+    def contextMenuEvent(self, e):
+        # 右键菜单切换状态
+        menu = QMenu(self)
+        for status, _ in STATUSES:
+            if status != self.item["status"]:
+                action = menu.addAction(f"移至 {status}")
+                action.triggered.connect(
+                    lambda _=False, s=status: self.board.statusRequested.emit(self.item["id"], s))
+        menu.exec(e.globalPos())
+
+
+class KanbanColumn(QWidget):
+    def __init__(self, title: str, color: str, parent=None):
+        super().__init__(parent)
+        self.setObjectName("kanbanColumn")
+        self.setStyleSheet("""
+            #kanbanColumn {
+                background-color: #f5f5f5;
+                border-radius: 8px;
+                padding: 10px;
+            }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        # 列标题
+        self.title = title
+        self.title_label = QLabel(title)
+        self.title_label.setStyleSheet(f"""
+            font-weight: bold;
+            font-size: 14px;
+            color: {color};
+            padding: 5px;
+            border-bottom: 2px solid {color};
+        """)
+        layout.addWidget(self.title_label)
+
+        # 卡片容器
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QScrollArea.NoFrame)
+        container = QWidget()
+        self.card_layout = QVBoxLayout(container)
+        self.card_layout.setSpacing(10)
+        self.card_layout.setContentsMargins(0, 0, 0, 0)
+        self.card_layout.addStretch(1)
+        scroll.setWidget(container)
+        layout.addWidget(scroll)
+
+    def set_count(self, count: int) -> None:
+        self.title_label.setText(f"{self.title}（{count}）")
+
+
+class KanbanBoard(QWidget):
+    """apply(items) 增量同步到最新数据；items 需按列内顺序排好"""
+    deleteRequested = Signal(dict)        # 卡片数据
+    statusRequested = Signal(object, str)  # 补贴 id, 目标状态
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setSpacing(20)
+        layout.setContentsMargins(0, 10, 0, 0)
+
+        self.columns: Dict[str, KanbanColumn] = {}
+        for title, color in STATUSES:
+            column = KanbanColumn(title, color)
+            self.columns[title] = column
+            layout.addWidget(column)
+        self.cards: Dict[Any, KanbanCard] = {}
+        # 列名 → 卡片 id 顺序，与界面上的布局保持一致
+        self._order: Dict[str, List[Any]] = {title: [] for title, _ in STATUSES}
+        for column in self.columns.values():
+            column.set_count(0)
+
+    def items(self) -> List[Dict]:
+        return [self.cards[item_id].item for ids in self._order.values() for item_id in ids]
+
+    def apply(self, items: Iterable[Dict]) -> Dict:
+        """与最新数据比较，只增删 / 移动 / 更新变化的卡片，返回差异"""
+        # 未知状态的补贴放进第一列
+        default = STATUSES[0][0]
+        items = [item if item.get("status") in self.columns else {**item, "status": default}
+                 for item in items]
+        diff = diff_board(self._order, {i: c.item for i, c in self.cards.items()}, items)
+
+        self.setUpdatesEnabled(False)
+        try:
+            for item_id in diff["deleted"]:
+                card = self.cards.pop(item_id)
+                card.parentWidget().layout().removeWidget(card)
+                card.deleteLater()
+            for item_id in diff["moved"]:
+                card = self.cards[item_id]
+                card.parentWidget().layout().removeWidget(card)
+            for item_id in diff["inserted"]:
+                self.cards[item_id] = KanbanCard(self, diff["items"][item_id])
+            for item_id in diff["updated"] + diff["moved"]:
+                self.cards[item_id].set_item(diff["items"][item_id])
+
+            # 按新顺序把新增 / 移动的卡片插到对应位置，其余卡片相对顺序不变
+            placed = set(diff["inserted"]) | set(diff["moved"])
+            for title, ids in diff["columns"].items():
+                column = self.columns[title]
+                for index, item_id in enumerate(ids):
+                    if item_id in placed:
+                        column.card_layout.insertWidget(index, self.cards[item_id])
+                column.set_count(len(ids))
+            self._order = {title: list(ids) for title, ids in diff["columns"].items()}
+        finally:
+            self.setUpdatesEnabled(True)
+        return diff
+
+    def update_item(self, item: Dict) -> Dict:
+        """单张卡片变化（如状态切换），不重新查询"""
+        # 从原位置取出后排到新列末尾（sort 稳定，其余卡片顺序不变）
+        items = [existing for existing in self.items() if existing["id"] != item["id"]] + [item]
+        column_of = {title: i for i, (title, _) in enumerate(STATUSES)}
+        items.sort(key=lambda x: column_of.get(x["status"], 0))
+        return self.apply(items)
+
+    def set_visible_statuses(self, statuses: Iterable[str]) -> None:
+        statuses = set(statuses)
+        for title, column in self.columns.items():
+            column.setVisible(title in statuses)
@@ -0,0 +1,119 @@
+# ui/location_tree_model.py
+"""
+行政区域树（镇 → 村 → 组）的懒加载模型
+只有展开节点时才通过 canFetchMore / fetchMore 查询其下级，查询为分组 COUNT，
+已加载的节点缓存在内存中，再次展开不重复查询；每个节点显示户数
+"""
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+TOWN, VILLAGE, GROUP = "town", "village", "group"
+# 节点筛选条件：{'town': ..., 'village_id': ..., 'group_id': ...}
+LOCATION_ROLE = Qt.UserRole + 1
+
+
+class _Node:
+    __slots__ = ("kind", "label", "households", "filters", "parent", "children", "row")
+
+    def __init__(self, kind: str, label: str, households: int, filters: Dict,
+                 parent: Optional["_Node"], row: int):
+        self.kind = kind
+        self.label = label
+        self.households = households
+        self.filters = filters
+        self.parent = parent
+        self.row = row
+        # None 表示尚未加载下级
+        self.children: Optional[List["_Node"]] = [] if kind == GROUP else None
+
+
+class LocationTreeModel(QAbstractItemModel):
+    def __init__(self, village_dao, icons: Optional[Dict] = None, parent=None):
+        super().__init__(parent)
+        self.village_dao = village_dao
+        # 各级节点图标：{TOWN: QIcon, VILLAGE: QIcon, GROUP: QIcon}
+        self.icons = icons or {}
+        self._root = _Node("root", "", 0, {}, None, 0)
+
+    def refresh(self) -> None:
+        """丢弃缓存，重新从顶层加载（家庭增删后调用）"""
+        self.beginResetModel()
+        self._root.children = None
+        self.endResetModel()
+
+    # ---------------- 加载下级 ---------------- #
+    def _load_children(self, node: _Node) -> List[_Node]:
+        if node is self._root:
+            rows = self.village_dao.town_counts()
+            return [_Node(TOWN, r["town"], r["households"], {"town": r["town"]}, node, i)
+                    for i, r in enumerate(rows)]
+        if node.kind == TOWN:
+            rows = self.village_dao.village_counts(node.label)
+            return [_Node(VILLAGE, r["name"], r["households"], {"village_id": r["id"]}, node, i)
+                    for i, r in enumerate(rows)]
+        if node.kind == VILLAGE:
+            village_id = node.filters["village_id"]
+            rows = self.village_dao.group_counts(village_id)
+            return [_Node(GROUP, f"第{r['groupid']}组", r["households"],
+                          {"village_id": village_id, "group_id": r["groupid"]}, node, i)
+                    for i, r in enumerate(rows)]
+        return []
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return self._node(parent).children is None
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        node = self._node(parent)
+        if node.children is not None:
+            return
+        children = self._load_children(node)
+        node.children = []
+        if not children:
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        node = self._node(parent)
+        if node.children is None:
+            # 未加载时：有户的村 / 镇才显示展开箭头
+            return node is self._root or node.households > 0
+        return bool(node.children)
+
+    # ---------------- QAbstractItemModel ---------------- #
+    def _node(self, index: QModelIndex) -> _Node:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        node = self._node(parent)
+        if column != 0 or not node.children or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return len(self._node(parent).children or [])
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 1
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return f"{node.label}（{node.households}户）"
+        if role == Qt.DecorationRole:
+            return self.icons.get(node.kind)
+        if role == LOCATION_ROLE:
+            return dict(node.filters)
+        return None
@@ -6,7 +6,6 @@ from PySide6.QtGui import QFont, QIcon, QPixmap,QKeyEvent
 from qfluentwidgets import (MSFluentWindow, NavigationItemPosition, setTheme, Theme,
                            PrimaryPushButton, LineEdit, InfoBar, InfoBarPosition,
                            BodyLabel, TitleLabel, FluentIcon, setThemeColor,CheckBox)
-from . import MainWindow
 
 class LoginWindow(QMainWindow):
     """登录窗口"""
@@ -160,9 +159,12 @@ class LoginWindow(QMainWindow):
     
     def login_success(self):
         """登录成功"""
-        # 创建主窗口
+        # 创建主窗口（主窗口及各页面在登录后才导入）
+        from engine import startup_timing
+        from .main_window import MainWindow
         self.main_window = MainWindow()
         self.main_window.show()
+        startup_timing.mark("显示主窗口")
         
         # 关闭登录窗口
         self.close()
@@ -6,8 +6,6 @@ from PySide6.QtGui import QFont, QIcon, QPixmap
 from qfluentwidgets import (MSFluentWindow, NavigationItemPosition, setTheme, Theme,
                            PrimaryPushButton, LineEdit, InfoBar, InfoBarPosition,
                            BodyLabel, TitleLabel, FluentIcon, setThemeColor,CardWidget)
-from .subsidyManageInterface import SubsidyManagementInterface
-from .familyManageInterface import FamilyManagementInterface
 class SimpleCardWidget(CardWidget):
     """ Simple card widget """
 
@@ -36,6 +34,29 @@ class SimpleCardWidget(CardWidget):
         r = self.borderRadius
         painter.drawRoundedRect(self.rect().adjusted(1, 1, -1, -1), r, r)
 
+class LazyPage(QWidget):
+    """
+    导航页占位：首次显示时才调用 factory 构建真正的页面并嵌入
+    页面模块（及其依赖的 pandas 等）也在此时才导入
+    """
+    def __init__(self, object_name, factory, parent=None):
+        super().__init__(parent)
+        self.setObjectName(object_name)
+        self.factory = factory
+        self.page = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_built(self):
+        if self.page is None:
+            self.page = self.factory()
+            self._layout.addWidget(self.page)
+        return self.page
+
+    def showEvent(self, event):
+        self.ensure_built()
+        super().showEvent(event)
+
 class MainWindow(MSFluentWindow):
     """主应用程序窗口"""
     def __init__(self):
@@ -47,10 +68,10 @@ class MainWindow(MSFluentWindow):
         setTheme(Theme.LIGHT)
         setThemeColor("#2b579a")  # 设置主题色为蓝色
         
-        # 创建子界面
+        # 创建子界面（首页立即构建，其余页面首次切换到时才构建）
         self.home_interface = self.create_home_interface()
-        self.subsidy_interface = self.create_subsidy_interface()
-        self.family_interface = self.create_family_interface()
+        self.subsidy_interface = LazyPage("subsidyInterface", self.create_subsidy_interface)
+        self.family_interface = LazyPage("familyInterface", self.create_family_interface)
         # self.report_interface = self.create_report_interface()
         # self.setting_interface = self.create_setting_interface()
         
@@ -212,6 +233,7 @@ class MainWindow(MSFluentWindow):
     def create_subsidy_interface(self):
 
         """创建补贴管理界面"""
+        from .subsidyManageInterface import SubsidyManagementInterface
         subsidy_interface = SubsidyManagementInterface()
         # widget = QWidget()
         # layout = QVBoxLayout(widget)
@@ -231,6 +253,7 @@ class MainWindow(MSFluentWindow):
     
     def create_family_interface(self):
         """创建家庭管理界面"""
+        from .familyManageInterface import FamilyManagementInterface
         return FamilyManagementInterface()
         widget = QWidget()
         layout = QVBoxLayout(widget)
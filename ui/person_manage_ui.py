@@ -1,17 +1,21 @@
 
 
-from PySide6.QtWidgets import QApplication, QFrame, QHBoxLayout
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QAbstractItemView, QApplication, QFrame, QHBoxLayout
 from qfluentwidgets import (NavigationItemPosition, MessageBox, setTheme, Theme, FluentWindow,
                             NavigationAvatarWidget, qrouter, SubtitleLabel, setFont, InfoBadge,
-                            InfoBadgePosition, FluentBackgroundTheme)
+                            InfoBadgePosition, FluentBackgroundTheme, TableView)
 from qfluentwidgets import FluentIcon as FIF
-from services import PersonService
+from engine.qt_query_runner import QueryRunner
+from services import SubsidyService
+from ui.table_models import ButtonDelegate, PagedTableModel
 
 
 class PersonManageUI(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent=parent)
-        self.service = PersonService()
+        self.service = SubsidyService()
+        self.runner = QueryRunner.default()
         self.setObjectName("PersonManageUI")
         self.init_ui()
 
@@ -36,11 +40,22 @@ class PersonManageUI(QFrame):
 
         layout.addLayout(search_layout)
 
-        # 表格
-        self.table = TableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "补贴名称", "金额", "频率", "状态", "操作"])
-        self.table.setSortingEnabled(True)
+        # 表格（分页懒加载，编辑按钮由委托绘制）
+        self.model = PagedTableModel([
+            ("ID", "id"),
+            ("补贴名称", "name"),
+            ("金额", lambda r: f"{r['amount']} 元"),
+            ("频率", "frequency"),
+            ("状态", lambda r: r.get("status") or ("启用" if r.get("is_activate") else "停用")),
+            ("操作", lambda r: ""),
+        ], parent=self)
+        self.table = TableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.edit_delegate = ButtonDelegate(["编辑"], self.table)
+        self.edit_delegate.clicked.connect(
+            lambda row, _: self.show_edit_dialog(self.model.row_data(row)["id"]))
+        self.table.setItemDelegateForColumn(5, self.edit_delegate)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
         layout.addWidget(self.table)
@@ -48,33 +63,19 @@ class PersonManageUI(QFrame):
         self.load_table_data()
 
     def load_table_data(self, keyword=""):
-        subsidies = self.service.search_subsidies(name=keyword)
-
-        self.table.setRowCount(len(subsidies))
-        for row, subsidy in enumerate(subsidies):
-            data = [
-                subsidy["id"],
-                subsidy["name"],
-                f"{subsidy['amount']} 元",
-                subsidy["frequency"],
-                subsidy["status"]
-            ]
-            for col, value in enumerate(data):
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
-
-            edit_btn = PushButton("编辑")
-            edit_btn.clicked.connect(lambda _, s_id=subsidy["id"]: self.show_edit_dialog(s_id))
-            self.table.setCellWidget(row, 5, edit_btn)
+        # 逐字输入时旧关键字的查询会被作废
+        self.model.set_source_async(lambda: self.service.iter_subsidies(name=keyword),
+                                    self.runner, f"{self.objectName()}.subsidies")
 
     def show_context_menu(self, position):
-        indexes = self.table.selectedIndexes()
+        indexes = self.table.selectionModel().selectedRows()
         if len(indexes) > 0:
             menu = MessageBox("操作", "请选择操作", self)
             delete_btn = menu.addButton("删除补贴类型")
             menu.exec_()
             if menu.clickedButton() == delete_btn:
                 selected_row = indexes[0].row()
-                subsidy_id = self.table.item(selected_row, 0).text()
+                subsidy_id = self.model.row_data(selected_row)["id"]
                 self.delete_subsidy(subsidy_id)
 
     def delete_subsidy(self, subsidy_id):
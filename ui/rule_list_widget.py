@@ -8,13 +8,18 @@ from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QApplication, QHeaderView, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QWidget, QFrame, QLineEdit, QComboBox, QTableWidget,
-    QTableWidgetItem, QAbstractItemView,QMainWindow
+    QTableWidgetItem, QTableView, QAbstractItemView,QMainWindow
 )
 from qfluentwidgets import (
     PrimaryPushButton, InfoBar, InfoBarPosition, TitleLabel, BodyLabel
 )
 
 from services import SubsidyService
+from engine.qt_subsidy_signals import SubsidySignals
+from engine.row_filter import RowFilter, name_index
+from ui.table_models import ButtonDelegate, DebouncedRowFilter, PagedTableModel
+
+REL_NAMES = {"conflict": "互斥", "stack": "叠加"}
 
 class ConflictRulePage(QWidget):
     """补贴互斥规则独立页面（可拖动 + 表格 + 搜索）"""
@@ -22,6 +27,12 @@ class ConflictRulePage(QWidget):
         super().__init__(parent)
         self.subsidy_service=SubsidyService()
         self.subsidies = self.subsidy_service.get_all_subsidies(active_only=True)
+        self.subsidy_names = name_index(self.subsidies)
+        self.row_filter = RowFilter(lambda r: r["desc"], {
+            "a": lambda r: r["a"],
+            "b": lambda r: r["b"],
+            "rel": lambda r: REL_NAMES[r["rel"]],
+        })
         self.setWindowTitle("补贴互斥规则")
         self.resize(700, 550)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window)
@@ -29,6 +40,8 @@ class ConflictRulePage(QWidget):
         self.drag_position = QPoint()
         self.build_ui()
         self.load_rules()
+        # 补贴类型变化时才刷新下拉框与名称
+        SubsidySignals.instance().subsidiesChanged.connect(self.reload_subsidies)
 
     # ---------------- 外观框架 ---------------- #
     def build_ui(self):
@@ -55,10 +68,20 @@ class ConflictRulePage(QWidget):
         vbox.addLayout(search_bar)
 
         # 表格
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["补贴A", "补贴B", "关系", "说明", "操作"])
+        self.model = PagedTableModel([
+            ("补贴A", lambda r: self.name_by_id(r["a"])),
+            ("补贴B", lambda r: self.name_by_id(r["b"])),
+            ("关系", lambda r: REL_NAMES[r["rel"]]),
+            ("说明", "desc"),
+            ("操作", lambda r: ""),
+        ], parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.delete_delegate = ButtonDelegate(["删除"], self.table)
+        self.delete_delegate.clicked.connect(lambda row, _: self.delete_row(row))
+        self.table.setItemDelegateForColumn(4, self.delete_delegate)
+        self.debounced_filter = DebouncedRowFilter(self.table, self.row_filter, self.filter_criteria)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         vbox.addWidget(self.table)
 
@@ -101,9 +124,7 @@ class ConflictRulePage(QWidget):
         self.filter_a.addItem("-- 全部 --")
         self.filter_b.addItem("-- 全部 --")
         self.filter_rel.addItems(["-- 全部 --", "互斥", "叠加"])
-        for s in self.subsidies:
-            self.filter_a.addItem(s["name"], s["id"])
-            self.filter_b.addItem(s["name"], s["id"])
+        self.fill_subsidy_filters()
 
         self.search_box.setPlaceholderText("输入说明关键字搜索")
 
@@ -117,7 +138,8 @@ class ConflictRulePage(QWidget):
         self.filter_a.currentTextChanged.connect(self.filter_table)
         self.filter_b.currentTextChanged.connect(self.filter_table)
         self.filter_rel.currentTextChanged.connect(self.filter_table)
-        self.search_box.textChanged.connect(self.filter_table)
+        # 关键字输入防抖
+        self.search_box.textChanged.connect(lambda _: self.debounced_filter.schedule())
         return hbox
 
     # ---------------- 数据 ---------------- #
@@ -127,39 +149,44 @@ class ConflictRulePage(QWidget):
         self.refresh_table()
 
     def refresh_table(self):
-        self.table.setRowCount(len(self.rules))
-        for row, r in enumerate(self.rules):
-            print(r)
-            self.table.setItem(row, 0, QTableWidgetItem(self.name_by_id(r["a"])))
-            self.table.setItem(row, 1, QTableWidgetItem(self.name_by_id(r["b"])))
-            rel = {"conflict": "互斥", "stack": "叠加"}[r["rel"]]
-            self.table.setItem(row, 2, QTableWidgetItem(rel))
-            self.table.setItem(row, 3, QTableWidgetItem(r["desc"]))
-            del_btn = QPushButton("删除")
-            del_btn.clicked.connect(lambda _, r=row: self.delete_row(r))
-            self.table.setCellWidget(row, 4, del_btn)
+        self.model.set_rows(self.rules)
+        self.row_filter.set_rows(self.rules)
+        self.debounced_filter.reset()
+        self.filter_table()
 
     def name_by_id(self, sid):
-        return next((s["name"] for s in self.subsidies if s["id"] == sid), sid)
+        return self.subsidy_names.get(sid, sid)
 
-    def filter_table(self):
-        a_id = self.filter_a.currentData()
-        b_id = self.filter_b.currentData()
+    def filter_criteria(self):
         rel_text = self.filter_rel.currentText()
-        keyword = self.search_box.text().lower()
-        for row, r in enumerate(self.rules):
-            show = True
-            if a_id and r["a"] != a_id:
-                show = False
-            if b_id and r["b"] != b_id:
-                show = False
-            if rel_text != "-- 全部 --":
-                rel = {"conflict": "互斥", "stack": "叠加"}[r["rel"]]
-                if rel != rel_text:
-                    show = False
-            if keyword and keyword not in r["desc"].lower():
-                show = False
-            self.table.setRowHidden(row, not show)
+        return self.search_box.text(), {
+            "a": self.filter_a.currentData(),
+            "b": self.filter_b.currentData(),
+            "rel": None if rel_text == "-- 全部 --" else rel_text,
+        }
+
+    def filter_table(self):
+        self.debounced_filter.apply()
+
+    def fill_subsidy_filters(self):
+        """按 self.subsidies 填充补贴下拉框，保留当前选择"""
+        for combo in (self.filter_a, self.filter_b):
+            current = combo.currentData()
+            combo.blockSignals(True)
+            while combo.count() > 1:
+                combo.removeItem(1)
+            for s in self.subsidies:
+                combo.addItem(s["name"], s["id"])
+            index = combo.findData(current) if current is not None else 0
+            combo.setCurrentIndex(max(index, 0))
+            combo.blockSignals(False)
+
+    def reload_subsidies(self, _version=None):
+        """补贴类型有写入后由 SubsidySignals 触发（读缓存，不重复查询）"""
+        self.subsidies = self.subsidy_service.get_all_subsidies(active_only=True)
+        self.subsidy_names = name_index(self.subsidies)
+        self.fill_subsidy_filters()
+        self.refresh_table()
 
     def add_row(self):
         self.rules.append({"a": "", "b": "", "rel": "conflict", "desc": ""})
@@ -1,19 +1,138 @@
-# ui/matrix_rule_widget.py
-from PySide6.QtWidgets import (QWidget, QTableWidget, QTableWidgetItem,
-                               QHeaderView, QVBoxLayout, QPushButton)
-from PySide6.QtCore import Qt
+# ui/rule_matrix.py
+"""
+补贴关系矩阵编辑器
+RuleMatrixModel 只保存非空单元格 {(行补贴id, 列补贴id): 状态}，不创建 N² 个 QTableWidgetItem；
+单元格由 MatrixCellDelegate 直接绘制，单击在 空 → 互斥 → 叠加 之间切换；
+保存时只把改动过的单元格合并进 config/matrix_rules.json
+"""
 import json
 from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QEvent, QModelIndex, Qt
+from PySide6.QtWidgets import (QWidget, QTableView, QHeaderView, QVBoxLayout, QPushButton,
+                               QStyledItemDelegate, QStyle)
+
+RULES_FILE = Path("config/subsidy_rules.json")
+MATRIX_FILE = Path("config/matrix_rules.json")
+
+STATE_SYMBOLS = {"conflict": "❌", "stack": "✅"}
+STATE_NAMES = {"conflict": "互斥", "stack": "叠加"}
+# 单击切换顺序
+NEXT_STATE = {"": "conflict", "conflict": "stack", "stack": ""}
+STATE_ROLE = Qt.UserRole + 1
+
+Cell = Tuple[str, str]
+
+
+class RuleMatrixModel(QAbstractTableModel):
+    def __init__(self, subsidies: List[Dict], matrix: Dict[str, Dict[str, str]], parent=None):
+        super().__init__(parent)
+        self.subsidies = subsidies
+        self._ids = [s["id"] for s in subsidies]
+        self._names = [s["name"] for s in subsidies]
+        # 只存非空单元格
+        self._cells: Dict[Cell, str] = {
+            (a, b): state
+            for a, row in matrix.items() for b, state in row.items()
+            if state in STATE_SYMBOLS
+        }
+        # 加载后改动过的单元格 → 新状态（"" 表示清空）
+        self._changes: Dict[Cell, str] = {}
+
+    # ---------------- 编辑 ---------------- #
+    def _cell(self, index: QModelIndex) -> Cell:
+        return self._ids[index.row()], self._ids[index.column()]
+
+    def state(self, index: QModelIndex) -> str:
+        return self._cells.get(self._cell(index), "")
+
+    def set_state(self, index: QModelIndex, state: str) -> None:
+        if index.row() == index.column():
+            return
+        cell = self._cell(index)
+        if state:
+            self._cells[cell] = state
+        else:
+            self._cells.pop(cell, None)
+        self._changes[cell] = state
+        self.dataChanged.emit(index, index)
+
+    def cycle(self, index: QModelIndex) -> None:
+        self.set_state(index, NEXT_STATE[self.state(index)])
+
+    def changes(self) -> Dict[Cell, str]:
+        return dict(self._changes)
+
+    def clear_changes(self) -> None:
+        self._changes = {}
+
+    # ---------------- QAbstractTableModel ---------------- #
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid() or index.row() == index.column():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == STATE_ROLE:
+            return self.state(index)
+        if role == Qt.ToolTipRole:
+            state = self.state(index)
+            relation = STATE_NAMES.get(state, "无规则")
+            return f"{self._names[index.row()]} × {self._names[index.column()]}：{relation}"
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._names[section]
+        return None
+
+
+class MatrixCellDelegate(QStyledItemDelegate):
+    """直接绘制状态符号；空单元格只画选中背景，对角线画“—”"""
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        if index.row() == index.column():
+            text = "—"
+        else:
+            text = STATE_SYMBOLS.get(index.data(STATE_ROLE), "")
+        if text:
+            painter.drawText(option.rect, Qt.AlignCenter, text)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and index.row() != index.column()):
+            model.cycle(index)
+            return True
+        return False
+
 
 class MatrixRuleWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.model = None
         self.init_ui()
         self.load_matrix()
 
     def init_ui(self):
         vbox = QVBoxLayout(self)
-        self.table = QTableWidget()
+        self.table = QTableView()
+        self.table.setItemDelegate(MatrixCellDelegate(self.table))
+        # 固定格子大小：Stretch / ResizeToContents 在上百列时每次布局都要遍历全部单元格
+        for header in (self.table.horizontalHeader(), self.table.verticalHeader()):
+            header.setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setDefaultSectionSize(40)
+        self.table.verticalHeader().setDefaultSectionSize(28)
         vbox.addWidget(self.table)
 
         # 底部按钮
@@ -21,58 +140,49 @@ class MatrixRuleWidget(QWidget):
         save_btn.clicked.connect(self.save_matrix)
         vbox.addWidget(save_btn)
 
+    @staticmethod
+    def _read_matrix() -> Dict[str, Dict[str, str]]:
+        if not MATRIX_FILE.exists():
+            return {}
+        return json.loads(MATRIX_FILE.read_text(encoding="utf-8")).get("matrix", {})
+
     def load_matrix(self):
         # 1. 读取补贴列表
-        rules_file = Path("config/subsidy_rules.json")
-        if not rules_file.exists():
+        if not RULES_FILE.exists():
             self.subsidies = []
             return
-        self.subsidies = json.loads(rules_file.read_text(encoding="utf-8"))
-
-        names = [s["name"] for s in self.subsidies]
-        self.table.setColumnCount(len(names))
-        self.table.setRowCount(len(names))
-        self.table.setHorizontalHeaderLabels(names)
-        self.table.setVerticalHeaderLabels(names)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-        # 2. 读取矩阵规则
-        matrix_file = Path("config/matrix_rules.json")
-        matrix = json.loads(matrix_file.read_text(encoding="utf-8")).get("matrix", {}) \
-                 if matrix_file.exists() else {}
-
-        # 3. 填充单元格
-        for r, row_sub in enumerate(self.subsidies):
-            for c, col_sub in enumerate(self.subsidies):
-                if r == c:  # 对角线
-                    item = QTableWidgetItem("—")
-                    item.setFlags(Qt.NoItemFlags)
-                else:
-                    state = matrix.get(row_sub["id"], {}).get(col_sub["id"], "")
-                    text = {"conflict": "❌", "stack": "✅"}.get(state, "")
-                    item = QTableWidgetItem(text)
-                    item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(r, c, item)
+        self.subsidies = json.loads(RULES_FILE.read_text(encoding="utf-8"))
+
+        # 2. 读取矩阵规则，建立稀疏模型
+        self.model = RuleMatrixModel(self.subsidies, self._read_matrix(), self.table)
+        self.table.setModel(self.model)
 
     def save_matrix(self):
-        """把表格写回 JSON 并热加载"""
-        matrix = {}
-        for r, row_sub in enumerate(self.subsidies):
-            for c, col_sub in enumerate(self.subsidies):
-                if r == c:
-                    continue
-                cell = self.table.item(r, c).text()
-                state = {"❌": "conflict", "✅": "stack"}.get(cell, "")
-                if state:
-                    matrix.setdefault(row_sub["id"], {})[col_sub["id"]] = state
-
-        Path("config").mkdir(exist_ok=True)
-        Path("config/matrix_rules.json").write_text(
+        """只把改动过的单元格写回 JSON 并热加载"""
+        if self.model is None:
+            return
+        changes = self.model.changes()
+        if not changes:
+            return
+
+        # 以磁盘上的当前内容为基础合并，未改动的单元格（含列表之外的补贴）原样保留
+        matrix = self._read_matrix()
+        for (a, b), state in changes.items():
+            if state:
+                matrix.setdefault(a, {})[b] = state
+            else:
+                row = matrix.get(a, {})
+                row.pop(b, None)
+                if not row:
+                    matrix.pop(a, None)
+
+        MATRIX_FILE.parent.mkdir(exist_ok=True)
+        MATRIX_FILE.write_text(
             json.dumps({"matrix": matrix}, ensure_ascii=False, indent=2),
             encoding="utf-8"
         )
+        self.model.clear_changes()
 
         # 立即热加载
         from engine.rule_loader import RuleLoader
-        RuleLoader.reload()
\ No newline at end of file
+        RuleLoader.reload()
@@ -14,6 +14,11 @@ from qfluentwidgets import (
     PrimaryPushButton, InfoBar, InfoBarPosition, TitleLabel, BodyLabel
 )
 from services.subsidy_service import SubsidyService
+from engine.qt_subsidy_signals import SubsidySignals
+from engine.row_filter import RowFilter
+from ui.table_models import DebouncedRowFilter
+
+REL_NAMES = {"conflict": "互斥", "stack": "叠加"}
 
 
 class RuleTablePage(QWidget):
@@ -22,6 +27,11 @@ class RuleTablePage(QWidget):
         super().__init__(parent)
         self.service = SubsidyService()
         self.subsidies = self.service.get_all_subsidies(active_only=True)
+        self.row_filter = RowFilter(lambda r: (r["name"] or "") + (r["description"] or ""), {
+            "a": lambda r: r["subsidy_a_id"],
+            "b": lambda r: r["subsidy_b_id"],
+            "rel": lambda r: REL_NAMES.get(r["relation"]),
+        })
         self.setWindowTitle("补贴互斥规则")
         self.resize(780, 550)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window)
@@ -29,6 +39,10 @@ class RuleTablePage(QWidget):
         self.drag_position = QPoint()
         self.build_ui()
         self.load_data()
+        # 写库后由信号驱动刷新，不在每次操作后重新查询
+        signals = SubsidySignals.instance()
+        signals.subsidiesChanged.connect(self.reload_subsidies)
+        signals.rulesChanged.connect(self.load_data)
     # ---------- 外观框架 ----------
     def build_ui(self):
         main = QVBoxLayout(self)
@@ -59,6 +73,7 @@ class RuleTablePage(QWidget):
         self.table.setHorizontalHeaderLabels(["ID", "规则名称", "补贴A", "补贴B", "关系"])
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.debounced_filter = DebouncedRowFilter(self.table, self.row_filter, self.filter_criteria)
         vbox.addWidget(self.table)
 
         # 按钮区
@@ -102,23 +117,23 @@ class RuleTablePage(QWidget):
         self.filter_a.addItem("-- 全部 --")
         self.filter_b.addItem("-- 全部 --")
         self.filter_rel.addItems(["-- 全部 --", "互斥", "叠加"])
-        for s in self.subsidies:
-            self.filter_a.addItem(s["name"], s["id"])
-            self.filter_b.addItem(s["name"], s["id"])
+        self.fill_subsidy_filters()
         self.search_box.setPlaceholderText("搜索规则名称/说明")
 
         self.filter_a.currentTextChanged.connect(self.filter_table)
         self.filter_b.currentTextChanged.connect(self.filter_table)
         self.filter_rel.currentTextChanged.connect(self.filter_table)
-        self.search_box.textChanged.connect(self.filter_table)
+        # 关键字输入防抖
+        self.search_box.textChanged.connect(lambda _: self.debounced_filter.schedule())
         return hbox
 
     # ---------- 数据 ----------
-    def load_data(self):
+    def load_data(self, _version=None):
         self.rules = self.service.list_rules()
         self.refresh_table()
 
     def refresh_table(self):
+        self.table.setRowCount(0)
         self.table.setRowCount(len(self.rules))
         for row, r in enumerate(self.rules):
             self.table.setItem(row, 0, QTableWidgetItem(str(r["id"])))
@@ -130,31 +145,47 @@ class RuleTablePage(QWidget):
             del_btn = QPushButton("删除")
             del_btn.clicked.connect(lambda _, rid=r["id"]: self.delete_row(rid))
             self.table.setCellWidget(row, 4, del_btn)
+        self.row_filter.set_rows(self.rules)
+        self.debounced_filter.reset()
+        self.filter_table()
 
-    def filter_table(self):
-        a_id = self.filter_a.currentData()
-        b_id = self.filter_b.currentData()
+    def filter_criteria(self):
         rel_text = self.filter_rel.currentText()
-        keyword = self.search_box.text().lower()
-        for row, r in enumerate(self.rules):
-            show = True
-            if a_id and r["subsidy_a_id"] != a_id:
-                show = False
-            if b_id and r["subsidy_b_id"] != b_id:
-                show = False
-            if rel_text != "-- 全部 --" and r["relation"] != rel_text.lower():
-                show = False
-            if keyword and keyword not in r["name"].lower() + r["description"].lower():
-                show = False
-            self.table.setRowHidden(row, not show)
+        return self.search_box.text(), {
+            "a": self.filter_a.currentData(),
+            "b": self.filter_b.currentData(),
+            "rel": None if rel_text == "-- 全部 --" else rel_text,
+        }
+
+    def filter_table(self):
+        self.debounced_filter.apply()
+
+    def fill_subsidy_filters(self):
+        """按 self.subsidies 填充补贴下拉框，保留当前选择"""
+        for combo in (self.filter_a, self.filter_b):
+            current = combo.currentData()
+            combo.blockSignals(True)
+            while combo.count() > 1:
+                combo.removeItem(1)
+            for s in self.subsidies:
+                combo.addItem(s["name"], s["id"])
+            index = combo.findData(current) if current is not None else 0
+            combo.setCurrentIndex(max(index, 0))
+            combo.blockSignals(False)
+
+    def reload_subsidies(self, _version=None):
+        """补贴类型有写入后由 SubsidySignals 触发（读缓存，不重复查询）"""
+        self.subsidies = self.service.get_all_subsidies(active_only=True)
+        self.fill_subsidy_filters()
+        self.refresh_table()
 
     def add_row(self):
         self.rules.append({"name": "", "subsidy_a_id": "", "subsidy_b_id": "", "relation": "conflict", "description": ""})
         self.refresh_table()
 
     def delete_row(self, rule_id):
+        # 列表由 rulesChanged 刷新
         self.service.delete_rule(rule_id)
-        self.load_data()
 
     def save_rules(self):
         # 表格 → 数据库
@@ -174,7 +205,6 @@ class RuleTablePage(QWidget):
                 self.service.add_rule(**data)
 
         InfoBar.success("成功", "规则已保存", parent=self, position=InfoBarPosition.TOP)
-        self.load_data()
 
     # ---------- 拖动 ----------
     def mousePressEvent(self, event):
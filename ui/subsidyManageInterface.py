@@ -13,9 +13,15 @@ from qfluentwidgets import (MSFluentWindow, NavigationItemPosition, setTheme, Th
 from PySide6.QtCore import QTimer
 import os,sys,shutil
 
+from engine.qt_copy_engine import CopyTask
+from engine.blob_store import BlobStore
 from .subsidyPopupUi import SubsidyPopup
 from .rule_list_widget import ConflictRulePage
 from .rule_table_page import RuleTablePage
+from .kanban_board import KanbanBoard, STATUSES
+from engine.qt_query_runner import QueryRunner
+from engine.qt_subsidy_signals import SubsidySignals
+from services.subsidy_service import SubsidyService
 class SimpleCardWidget(CardWidget):
     """ Simple card widget """
 
@@ -50,6 +56,8 @@ class ProgressDetailSection(QGroupBox):
         super().__init__("进度详情", parent)
         self.subsidy_data = None
         self.stage_buttons = {}
+        self.copy_task = None
+        self.copy_tip = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -202,34 +210,74 @@ class ProgressDetailSection(QGroupBox):
             # 创建目标文件夹
             os.makedirs(target_dir, exist_ok=True)
 
-            # 复制选中文件夹中的内容到目标路径
-            try:
-                for item in os.listdir(selected_dir):
-                    src_path = os.path.join(selected_dir, item)
-                    dst_path = os.path.join(target_dir, item)
-                    if os.path.isdir(src_path):
-                        shutil.copytree(src_path, dst_path)
-                    else:
-                        shutil.copy2(src_path, dst_path)
-                InfoBar.success(
-                    title="材料已复制",
-                    content=f"已从 '{selected_dir}' 复制材料到 '{target_dir}'",
+            # 后台线程池复制选中文件夹中的内容到目标路径
+            sources = [os.path.join(selected_dir, item) for item in os.listdir(selected_dir)]
+            store = BlobStore(os.path.join(base_dir, "补贴管理"))
+            self.start_copy(CopyTask.plan(sources, target_dir), selected_dir, target_dir, store)
+            return
+
+        # 打开目标文件夹
+        self.open_folder(target_dir)
+
+    def start_copy(self, items, selected_dir, target_dir, blob_store=None):
+        """启动后台拷贝，进度显示在状态提示中，完成后打开目标文件夹"""
+        if self.copy_task and self.copy_task.running:
+            InfoBar.warning(
+                title="正在复制",
+                content="上一批材料尚未复制完成",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=3000
+            )
+            return
+
+        self.copy_task = CopyTask(blob_store=blob_store, parent=self)
+        self.copy_tip = StateToolTip("正在复制材料", "准备中...", self.window())
+        self.copy_tip.closedSignal.connect(self.copy_task.cancel)
+        self.copy_tip.move(self.copy_tip.getSuitablePos())
+        self.copy_tip.show()
+
+        def on_progress(bytes_done, bytes_total, files_done, files_total):
+            self.copy_tip.setContent(
+                f"{files_done}/{files_total} 个文件，"
+                f"{bytes_done / 1048576:.1f}/{bytes_total / 1048576:.1f} MB"
+            )
+
+        def on_finished(success_count, failed, cancelled):
+            if cancelled:
+                self.copy_tip.setContent("已取消")
+            self.copy_tip.setState(True)
+            self.copy_task.deleteLater()
+            self.copy_task = None
+            if cancelled:
+                InfoBar.warning(
+                    title="操作取消",
+                    content=f"已复制 {success_count} 个文件，其余已取消。",
                     parent=self,
                     position=InfoBarPosition.TOP,
                     duration=3000
                 )
-            except Exception as e:
+            elif failed:
                 InfoBar.error(
                     title="复制失败",
-                    content=f"复制材料时出错：{str(e)}",
+                    content=f"{len(failed)} 个文件重试后仍复制失败，例如：{failed[0][0]}",
                     parent=self,
                     position=InfoBarPosition.TOP,
                     duration=5000
                 )
-                return
+            else:
+                InfoBar.success(
+                    title="材料已复制",
+                    content=f"已从 '{selected_dir}' 复制材料到 '{target_dir}'",
+                    parent=self,
+                    position=InfoBarPosition.TOP,
+                    duration=3000
+                )
+                self.open_folder(target_dir)
 
-        # 打开目标文件夹
-        self.open_folder(target_dir)
+        self.copy_task.progress.connect(on_progress)
+        self.copy_task.finished.connect(on_finished)
+        self.copy_task.start(items)
 
     def copy_initial_materials(self, target_dir, stage_name):
         """复制初始材料到目标文件夹"""
@@ -298,7 +346,12 @@ class SubsidyManagementInterface(QWidget):
         super().__init__(parent)
         self.setObjectName("subsidy_interface") 
         self.current_subsidy = None
+        self.subsidy_service = SubsidyService()
+        self.query_runner = QueryRunner.default()
         self.setup_ui()
+        self.refresh_kanban()
+        # 其它界面增删改补贴类型后同步看板（差异更新，未变化的卡片不动）
+        SubsidySignals.instance().subsidiesChanged.connect(lambda _: self.refresh_kanban())
     
     def setup_ui(self):
         # 主布局 - 垂直布局
@@ -693,169 +746,31 @@ class SubsidyManagementInterface(QWidget):
         # 在实际应用中，这里会连接数据库进行筛选
         print(f"筛选条件: 状态={self.status_combo.currentText()}, 年份={self.year_combo.currentText()}, 搜索={self.search_box.text()}")
        
-    def create_kanban_column(self, title, color):
-        """创建看板列"""
-        column = QWidget()
-        column.setObjectName("kanbanColumn")
-        column.setStyleSheet(f"""
-            #kanbanColumn {{
-                background-color: #f5f5f5;
-                border-radius: 8px;
-                padding: 10px;
-            }}
-        """)
-        
-        layout = QVBoxLayout(column)
-        layout.setSpacing(10)
-        
-        # 列标题
-        title_label = QLabel(title)
-        title_label.setStyleSheet(f"""
-            font-weight: bold;
-            font-size: 14px;
-            color: {color};
-            padding: 5px;
-            border-bottom: 2px solid {color};
-        """)
-        layout.addWidget(title_label)
-        
-        # 卡片容器
-        card_container = QWidget()
-        card_layout = QVBoxLayout(card_container)
-        card_layout.setSpacing(10)
-        card_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # 添加示例卡片
-        if title == "草稿":
-            card_layout.addWidget(self.create_kanban_card("农业种植补贴", "AGRI-2023", "草稿", 0))
-            card_layout.addWidget(self.create_kanban_card("渔业发展补贴", "FISH-2023", "草稿", 0))
-        elif title == "审核中":
-            card_layout.addWidget(self.create_kanban_card("林业保护补贴", "FOREST-2023", "审核中", 30))
-            card_layout.addWidget(self.create_kanban_card("农机购置补贴", "MACHINE-2023", "审核中", 45))
-        elif title == "发放中":
-            card_layout.addWidget(self.create_kanban_card("畜牧养殖补贴", "ANIMAL-2023", "发放中", 70))
-            card_layout.addWidget(self.create_kanban_card("粮食生产补贴", "GRAIN-2023", "发放中", 85))
-        elif title == "已完成":
-            card_layout.addWidget(self.create_kanban_card("有机农业补贴", "ORGANIC-2023", "已完成", 100))
-        elif title == "已归档":
-            card_layout.addWidget(self.create_kanban_card("节水灌溉补贴", "WATER-2022", "已归档", 100))
-        
-        # 添加弹性空间和添加按钮
-        card_layout.addStretch(1)
-        
-        # 滚动区域
-        scroll_widget = QWidget()
-        scroll_layout = QVBoxLayout(scroll_widget)
-        scroll_layout.addWidget(card_container)
-        scroll_layout.addStretch(1)
-        
-        layout.addWidget(scroll_widget)
-        
-        return column
-    
-    def create_kanban_card(self, name, code, status, progress):
-        """创建看板卡片"""
-        card = CardWidget()
-        card.setFixedHeight(150)
-        
-        layout = QVBoxLayout(card)
-        layout.setSpacing(8)
-        layout.setContentsMargins(15, 15, 15, 15)
-        
-        # 补贴名称
-        name_label = QLabel(name)
-        name_label.setStyleSheet("font-weight: bold; font-size: 14px;")
-        name_label.setWordWrap(True)
-        layout.addWidget(name_label)
-        
-        # 补贴编码和年份
-        meta_layout = QHBoxLayout()
-        meta_layout.addWidget(QLabel(f"编码: {code}"))
-        meta_layout.addStretch()
-        meta_layout.addWidget(QLabel(f"2023"))
-        layout.addLayout(meta_layout)
-        
-        # 进度条
-        progress_bar = ProgressBar()
-        progress_bar.setValue(progress)
-        progress_bar.setTextVisible(True)
-        progress_bar.setAlignment(Qt.AlignCenter)
-        progress_bar.setFormat(f"{progress}%")
-        
-        # 根据状态设置颜色
-        if status == "草稿":
-            progress_bar.setStyleSheet("QProgressBar::chunk { background-color: #9e9e9e; }")
-        elif status == "审核中":
-            progress_bar.setStyleSheet("QProgressBar::chunk { background-color: #2196f3; }")
-        elif status == "发放中":
-            progress_bar.setStyleSheet("QProgressBar::chunk { background-color: #ff9800; }")
-        elif status == "已完成" or status == "已归档":
-            progress_bar.setStyleSheet("QProgressBar::chunk { background-color: #4caf50; }")
-        
-        layout.addWidget(progress_bar)
-        
-        # 操作按钮
-        btn_layout = QHBoxLayout()
-        
-        view_btn = ToolButton(FluentIcon.VIEW)
-        view_btn.setToolTip("查看详情")
-        view_btn.setFixedSize(30, 30)
-        btn_layout.addWidget(view_btn)
-        
-        edit_btn = ToolButton(FluentIcon.EDIT)
-        edit_btn.setToolTip("编辑")
-        edit_btn.setFixedSize(30, 30)
-        btn_layout.addWidget(edit_btn)
-        
-        delete_btn = ToolButton(FluentIcon.DELETE)
-        delete_btn.setToolTip("删除")
-        delete_btn.setFixedSize(30, 30)
-        delete_btn.setEnabled(status in ["草稿", "审核中"])  # 只有特定状态可删除
-        delete_btn.clicked.connect(lambda: self.confirm_delete_subsidy(name, code))
-        btn_layout.addWidget(delete_btn)
-        
-        btn_layout.addStretch(1)
-        
-        # 状态标签
-        status_label = QLabel(status)
-        if status == "草稿":
-            status_label.setStyleSheet("color: #9e9e9e; font-weight: bold;")
-        elif status == "审核中":
-            status_label.setStyleSheet("color: #2196f3; font-weight: bold;")
-        elif status == "发放中":
-            status_label.setStyleSheet("color: #ff9800; font-weight: bold;")
-        elif status == "已完成":
-            status_label.setStyleSheet("color: #4caf50; font-weight: bold;")
-        elif status == "已归档":
-            status_label.setStyleSheet("color: #607d8b; font-weight: bold;")
-        btn_layout.addWidget(status_label)
-        
-        layout.addLayout(btn_layout)
-        
-        return card
-    
     def create_kanban_view(self):
-        """创建看板视图"""
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setSpacing(20)
-        layout.setContentsMargins(0, 10, 0, 0)
-        
-        # 状态列
-        statuses = [
-            {"name": "草稿", "color": "#9e9e9e"},
-            {"name": "审核中", "color": "#2196f3"},
-            {"name": "发放中", "color": "#ff9800"},
-            {"name": "已完成", "color": "#4caf50"},
-            {"name": "已归档", "color": "#607d8b"}
-        ]
-        
-        for status in statuses:
-            column = self.create_kanban_column(status["name"], status["color"])
-            layout.addWidget(column)
-        
-        return widget
-    
+        """创建看板视图：卡片由 refresh_kanban 增量同步"""
+        self.kanban_board = KanbanBoard()
+        self.kanban_board.deleteRequested.connect(
+            lambda item: self.confirm_delete_subsidy(item["name"], item["id"]))
+        self.kanban_board.statusRequested.connect(self.change_subsidy_status)
+        return self.kanban_board
+
+    def refresh_kanban(self):
+        """后台查询补贴，完成后只对有变化的卡片增删 / 移动 / 更新"""
+        year = self.year_combo.currentText()
+        self.query_runner.submit(
+            "subsidy_kanban", self.subsidy_service.kanban_items,
+            kwargs={"name": self.search_box.text().strip(),
+                    "year": int(year) if year.isdigit() else None},
+            on_result=self.kanban_board.apply)
+
+    def change_subsidy_status(self, subsidy_id, status):
+        """切换补贴状态：写库后只移动这一张卡片"""
+        if not self.subsidy_service.set_subsidy_status(subsidy_id, status):
+            return
+        card = self.kanban_board.cards.get(subsidy_id)
+        if card is not None:
+            self.kanban_board.update_item({**card.item, "status": status})
+
     def load_sample_data(self):
         """加载示例数据到表格"""
         # 示例数据
@@ -945,8 +860,10 @@ class SubsidyManagementInterface(QWidget):
     
     def filter_subsidies(self):
         """根据筛选条件过滤补贴"""
-        # 在实际应用中，这里会连接数据库进行筛选
-        print(f"筛选条件: 状态={self.status_combo.currentText()}, 年份={self.year_combo.currentText()}, 搜索={self.search_box.text()}")
+        status = self.status_combo.currentText()
+        self.kanban_board.set_visible_statuses(
+            [title for title, _ in STATUSES] if status == "全部" else [status])
+        self.refresh_kanban()
    
     def creation_completed(self):
         """补贴创建完成"""
@@ -956,22 +873,35 @@ class SubsidyManagementInterface(QWidget):
         # 关闭提示
         QTimer.singleShot(1000, self.state_tooltip.close)
         
-        # 刷新数据
-        QTimer.singleShot(1200, self.load_sample_data)
+        # 刷新看板（只插入新建的卡片）
+        self.refresh_kanban()
     
-    def confirm_delete_subsidy(self, name, code):
-        """确认删除补贴"""
+    def confirm_delete_subsidy(self, name, subsidy_id):
+        """确认删除补贴：删除 subsidy_types 行，看板卡片由 subsidiesChanged → refresh_kanban 移除"""
         result = MessageBox.warning(
             self,
             "确认删除补贴",
-            f"确定要永久删除补贴 '{name}' ({code}) 吗?\n此操作不可撤销!",
+            f"确定要永久删除补贴 '{name}' ({subsidy_id}) 吗?\n此操作不可撤销!",
             parent=self,
             buttons=MessageBox.Yes | MessageBox.No
         )
         
         if result == MessageBox.Yes:
-            # 在实际应用中，这里会执行删除操作
-            print(f"删除补贴: {name} ({code})")
+            try:
+                deleted = self.subsidy_service.delete_subsidy(subsidy_id)
+            except Exception as e:
+                deleted, reason = False, str(e)
+            else:
+                reason = "补贴不存在或已被删除"
+            if not deleted:
+                InfoBar.error(
+                    title="删除失败",
+                    content=f"补贴 '{name}' 未删除：{reason}",
+                    parent=self,
+                    position=InfoBarPosition.TOP,
+                    duration=5000
+                )
+                return
             
             # 显示删除成功提示
             InfoBar.success(
@@ -1,18 +1,21 @@
 # ui/subsidy_record_ui.py
 
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QMenu
+from PySide6.QtWidgets import QAbstractItemView, QMenu
 from qfluentwidgets import (
-    SubInterface, TableWidget, PushButton, LineEdit, MessageBox,
+    SubInterface, TableView, PushButton, LineEdit, MessageBox,
     Dialog, ComboBox, PrimaryPushButton, DatePicker
 )
+from engine.qt_query_runner import QueryRunner
 from services.record_service import RecordService
+from ui.table_models import PagedTableModel
 
 
 class SubsidyRecordUI(SubInterface):
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.service = RecordService()
+        self.runner = QueryRunner.default()
         self.setObjectName("SubsidyRecordUI")
 
         self.init_ui()
@@ -41,13 +44,19 @@ class SubsidyRecordUI(SubInterface):
         layout.addLayout(search_layout)
 
         # 表格
-        self.table = TableWidget(self)
+        # 记录按页懒加载；排序由查询的 ORDER BY 决定，表头点击排序会迫使一次读完全部行，不再开启
+        self.model = PagedTableModel([
+            ("ID", "id"),
+            ("家庭", "家庭"),
+            ("补贴类型", "补贴类型"),
+            ("金额", lambda r: f"{r['金额']} 元"),
+            ("发放日期", "发放日期"),
+        ], parent=self)
+        self.table = TableView(self)
         self.table.setWordWrap(False)
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "家庭", "补贴类型", "金额", "发放日期"
-        ])
-        self.table.setSortingEnabled(True)
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setContextMenuPolicy(Qt.CustomContextMenu)
 
         layout.addWidget(self.table)
 
@@ -87,14 +96,13 @@ class SubsidyRecordUI(SubInterface):
             self.subsidy_combo.addItem(s["名称"], s["id"])
 
     def load_data(self, family_id=None, subsidy_id=None):
-        data = self.service.search_records(family_id, subsidy_id)
-        self.table.setRowCount(len(data))
-        for row, item in enumerate(data):
-            self.table.setItem(row, 0, QTableWidgetItem(str(item['id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(item['家庭']))
-            self.table.setItem(row, 2, QTableWidgetItem(item['补贴类型']))
-            self.table.setItem(row, 3, QTableWidgetItem(str(item['金额']) + " 元"))
-            self.table.setItem(row, 4, QTableWidgetItem(item['发放日期']))
+        # 后台查询，连续点击搜索时只保留最后一次
+        self.model.set_source_async(lambda: self.service.iter_records(family_id, subsidy_id),
+                                    self.runner, f"{self.objectName()}.records")
+
+    def selected_record_id(self):
+        rows = self.table.selectionModel().selectedRows()
+        return self.model.row_data(rows[0].row())['id'] if rows else None
 
     def on_search(self):
         family_id = self.family_combo.currentData()
@@ -112,21 +120,19 @@ class SubsidyRecordUI(SubInterface):
             self.load_data()
 
     def show_edit_dialog(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        record_id = self.selected_record_id()
+        if record_id is None:
             MessageBox("提示", "请先选择一行进行编辑", self).exec_()
             return
-        record_id = int(selected[0].text())
         dialog = RecordEditDialog(self, record_id)
         if dialog.exec():
             self.load_data()
 
     def delete_selected_record(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        record_id = self.selected_record_id()
+        if record_id is None:
             MessageBox("提示", "请先选择一行进行删除", self).exec_()
             return
-        record_id = int(selected[0].text())
         reply = MessageBox("确认", "确定要删除该记录？", self)
         if reply.exec_():
             if self.service.delete_record(record_id):
@@ -172,6 +178,7 @@ class RecordEditDialog(Dialog):
         self.cancelButton.setText("取消")
 
     def load_combos(self):
+        # 每次打开都重新查询：家庭表与旧版 subsidies 表的变化没有缓存失效通知
         families = self.service.get_all_families()
         subsidies = self.service.get_all_subsidies()
 
@@ -0,0 +1,245 @@
+# ui/table_models.py
+"""
+大表格的虚拟化模型
+PagedTableModel 从 DAO 的分页游标（iter_* 生成器，每次产出一页字典列表）按需拉取，
+视图滚动到底时才通过 canFetchMore / fetchMore 取下一页；单元格不创建 QTableWidgetItem，
+行内操作按钮由 ButtonDelegate 直接绘制，不为每行创建控件；
+后台查询（set_source_async）得到的游标属于查询线程的只读连接，之后的翻页与关闭也都交给同一个执行器
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from PySide6.QtCore import QAbstractTableModel, QEvent, QModelIndex, QObject, QRect, Qt, QTimer, Signal
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+# 列定义：(表头, 字段名 或 row -> 显示值 的函数)
+Column = Tuple[str, Union[str, Callable[[Dict], Any]]]
+PageSource = Callable[[], Iterator[List[Dict]]]
+
+
+class PagedTableModel(QAbstractTableModel):
+    """按页懒加载的只读表格模型"""
+
+    def __init__(self, columns: Sequence[Column], source: Optional[PageSource] = None, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self._rows: List[Dict] = []
+        self._pages: Optional[Iterator[List[Dict]]] = None
+        self._source = source
+        # 游标来自后台查询时的执行器与请求键
+        self._runner = None
+        self._key = ""
+        self._fetching = False
+        if source is not None:
+            self.set_source(source)
+
+    # ---------------- 数据源 ---------------- #
+    def set_source(self, source: PageSource) -> None:
+        """切换查询（如搜索条件变化），清空已加载的行，首页在视图请求时再拉取"""
+        self.beginResetModel()
+        self._close_pages()
+        self._source = source
+        self._runner = None
+        self._pages = source()
+        self._rows = []
+        self.endResetModel()
+
+    def set_source_async(self, source: PageSource, runner, key: str) -> None:
+        """
+        在后台执行查询并取出首页（通常最慢的一步），完成后再替换模型内容；
+        后续页仍由 fetchMore 按需拉取。runner 为 engine.qt_query_runner.QueryRunner（须为单线程，
+        游标只能在打开它的线程中使用），同一 key 的新请求会作废未完成的旧请求
+        """
+        def prefetch():
+            pages = source()
+            return pages, next(pages, None)
+
+        runner.submit(key, prefetch,
+                      on_result=lambda result: self._apply_prefetched(source, runner, key, *result),
+                      on_discard=lambda result: result[0].close())
+
+    def _apply_prefetched(self, source: PageSource, runner, key: str, pages: Iterator[List[Dict]],
+                          first: Optional[List[Dict]]) -> None:
+        self.beginResetModel()
+        self._close_pages()
+        self._source = source
+        self._runner = runner
+        self._key = key
+        self._rows = list(first or [])
+        self._pages = pages if first else None
+        if not first:
+            runner.post(pages.close)
+        self.endResetModel()
+
+    def set_rows(self, rows: Iterable[Dict]) -> None:
+        """直接使用内存中的行（如 JSON 配置），不分页"""
+        self.beginResetModel()
+        self._close_pages()
+        self._source = None
+        self._runner = None
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def reload(self, runner=None, key: str = "") -> None:
+        """重新执行当前查询，给出 runner 时在后台执行"""
+        if self._source is None:
+            return
+        if runner is not None:
+            self.set_source_async(self._source, runner, key)
+        else:
+            self.set_source(self._source)
+
+    def _close_pages(self) -> None:
+        # 关闭尚未读完的生成器，释放底层游标；后台游标在查询线程中关闭
+        if self._pages is not None and hasattr(self._pages, "close"):
+            if self._runner is not None:
+                self._runner.post(self._pages.close)
+            else:
+                self._pages.close()
+        self._pages = None
+        self._fetching = False
+
+    def row_data(self, row: int) -> Optional[Dict]:
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    # ---------------- 懒加载 ---------------- #
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._pages is not None and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid() or self._pages is None or self._fetching:
+            return
+        if self._runner is not None:
+            # 后台游标：下一页也在查询线程中读取
+            self._fetching = True
+            pages = self._pages
+            self._runner.submit(f"{self._key}.more", next, args=(pages, None),
+                                on_result=lambda page: self._append_page(pages, page),
+                                on_error=lambda _: self._append_page(pages, None))
+            return
+        self._append_page(self._pages, next(self._pages, None))
+
+    def _append_page(self, pages: Iterator[List[Dict]], page: Optional[List[Dict]]) -> None:
+        if pages is not self._pages:
+            # 数据源已切换，旧游标已交给 _close_pages 关闭
+            return
+        self._fetching = False
+        if not page:
+            self._pages = None
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    # ---------------- QAbstractTableModel ---------------- #
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = self._rows[index.row()]
+        field = self.columns[index.column()][1]
+        value = field(row) if callable(field) else row.get(field)
+        return "" if value is None else str(value)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return str(section + 1)
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    在单元格内绘制一排按钮，点击时发出 clicked(行号, 按钮文字)
+    用于替代每行 setCellWidget 创建的 PushButton
+    """
+    clicked = Signal(int, str)
+
+    def __init__(self, labels: Sequence[str], parent=None):
+        super().__init__(parent)
+        self.labels = list(labels)
+        self._pressed: Optional[Tuple[int, int]] = None
+
+    def _button_rects(self, rect: QRect) -> List[QRect]:
+        margin = 4
+        width = (rect.width() - margin * (len(self.labels) + 1)) // max(len(self.labels), 1)
+        return [QRect(rect.left() + margin + i * (width + margin), rect.top() + margin,
+                      width, rect.height() - 2 * margin)
+                for i in range(len(self.labels))]
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+        for i, (label, rect) in enumerate(zip(self.labels, self._button_rects(option.rect))):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.State_Enabled
+            if self._pressed == (index.row(), i):
+                button.state |= QStyle.State_Sunken
+            else:
+                button.state |= QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        hint.setWidth(72 * len(self.labels))
+        return hint
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        pos = event.position().toPoint()
+        hit = next((i for i, rect in enumerate(self._button_rects(option.rect)) if rect.contains(pos)), None)
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = (index.row(), hit) if hit is not None else None
+            return hit is not None
+        pressed, self._pressed = self._pressed, None
+        if hit is not None and pressed == (index.row(), hit):
+            self.clicked.emit(index.row(), self.labels[hit])
+            return True
+        return False
+
+
+class DebouncedRowFilter(QObject):
+    """
+    按键防抖的行筛选：输入停顿 delay 毫秒后才执行一次 RowFilter.match，
+    并且只对显示状态发生变化的行调用 setRowHidden
+    criteria() 返回 (关键字, {字段: 值})
+    """
+
+    def __init__(self, view, row_filter, criteria: Callable[[], Tuple[str, Dict]],
+                 delay: int = 200, parent=None):
+        super().__init__(parent or view)
+        self.view = view
+        self.row_filter = row_filter
+        self.criteria = criteria
+        self._hidden = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.apply)
+
+    def schedule(self) -> None:
+        """关键字输入时调用，重新计时"""
+        self._timer.start()
+
+    def reset(self) -> None:
+        """表格重新填充后（所有行均可见）调用"""
+        self._hidden = set()
+
+    def apply(self) -> None:
+        """立即筛选（下拉框等离散条件变化时直接调用）"""
+        self._timer.stop()
+        keyword, criteria = self.criteria()
+        visible = set(self.row_filter.match(keyword, **criteria))
+        hidden = set(range(len(self.row_filter))) - visible
+        for row in hidden ^ self._hidden:
+            self.view.setRowHidden(row, row in hidden)
+        self._hidden = hidden
+